@@ -0,0 +1,172 @@
+import json
+import re
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from profiles.llm import (
+    GROQ_API_KEY,
+    GROQ_MODEL,
+    LLMError,
+    LLMUnavailable,
+    chat_with_fallback,
+    extract_content,
+)
+from profiles.generation import is_json_output, strip_code_fences
+from profiles.metrics import endpoint, record_json_failure
+from profiles.prompts import normalize_whitespace, truncate_to_tokens
+
+from .models import SavedDraft
+
+
+METADATA_FIELDS = ('job_title', 'company', 'summary_line')
+
+# Title, company and a summary are near the top of a posting.
+METADATA_TOKEN_BUDGET = 500
+
+
+def _slugify_filename(value: str) -> str:
+    slug = re.sub(r'[^a-z0-9]+', '_', value.lower()).strip('_')
+    return slug
+
+
+def _extract_job_metadata(job_description: str) -> dict:
+    if not GROQ_API_KEY:
+        return {}
+
+    prompt = (
+        'Extract job metadata from the job description.\n'
+        'Return STRICT JSON only (no markdown). Use this schema:\n'
+        '{\n'
+        '  "job_title": string,\n'
+        '  "company": string,\n'
+        '  "summary_line": string\n'
+        '}\n'
+        'summary_line should be a single concise sentence under 120 characters.'
+    )
+
+    try:
+        data = chat_with_fallback(
+            [
+                {'role': 'system', 'content': prompt},
+                {
+                    'role': 'user',
+                    'content': truncate_to_tokens(
+                        normalize_whitespace(job_description),
+                        METADATA_TOKEN_BUDGET,
+                    ),
+                },
+            ],
+            model=GROQ_MODEL,
+            timeout=30,
+            validate=is_json_output,
+        )
+    except LLMUnavailable:
+        raise
+    except LLMError:
+        return {}
+
+    content = extract_content(data)
+
+    try:
+        return json.loads(strip_code_fences(content))
+    except json.JSONDecodeError:
+        record_json_failure()
+        return {}
+
+
+def _clean(field: str, value) -> str:
+    max_length = SavedDraft._meta.get_field(field).max_length
+    return str(value or '').strip()[:max_length]
+
+
+def initial_metadata(data) -> dict:
+    '''Job metadata a new draft already carries, from its fields or generated content.'''
+    metadata = {field: str(data.get(field) or '').strip() for field in METADATA_FIELDS}
+    # Generated drafts already carry job metadata; use it before asking the LLM.
+    content = data.get('content')
+    if isinstance(content, dict):
+        for field in METADATA_FIELDS:
+            if not metadata[field]:
+                metadata[field] = _clean(field, content.get(field))
+    return metadata
+
+
+def resume_filename_for(company: str) -> str:
+    base = _slugify_filename(company)
+    return f'{base}_resume' if base else ''
+
+
+def needs_enrichment(job_description: str, metadata: dict) -> bool:
+    return bool(job_description) and not all(metadata.get(field) for field in METADATA_FIELDS)
+
+
+def enrich_draft(draft_id: int) -> str:
+    '''Fill missing job metadata and resume_filename; returns the final status.'''
+    draft = SavedDraft.objects.filter(pk=draft_id).first()
+    if not draft:
+        return ''
+
+    updates = {}
+    metadata = {field: getattr(draft, field) for field in METADATA_FIELDS}
+    status = SavedDraft.EnrichmentStatus.DONE
+    if needs_enrichment(draft.job_description.strip(), metadata):
+        try:
+            with endpoint('draft_enrichment'):
+                extracted = _extract_job_metadata(draft.job_description.strip())
+        except LLMUnavailable:
+            # Leave the draft queued until the upstream recovers.
+            SavedDraft.objects.filter(pk=draft_id).update(
+                enrichment_status=SavedDraft.EnrichmentStatus.PENDING,
+                version=F('version') + 1,
+            )
+            return SavedDraft.EnrichmentStatus.PENDING
+        for field in METADATA_FIELDS:
+            if not metadata[field]:
+                updates[field] = metadata[field] = _clean(field, extracted.get(field))
+        if not extracted:
+            status = SavedDraft.EnrichmentStatus.FAILED
+
+    if (
+        draft.draft_type == SavedDraft.DraftType.RESUME
+        and not draft.resume_filename
+        and metadata['company']
+    ):
+        updates['resume_filename'] = resume_filename_for(metadata['company'])
+
+    # update() leaves updated_at alone, so enrichment does not reorder drafts.
+    SavedDraft.objects.filter(pk=draft_id).update(
+        enrichment_status=status, version=F('version') + 1, **updates
+    )
+    return status
+
+
+def claim_pending_drafts(batch_size: int) -> list[int]:
+    '''Mark up to batch_size pending drafts as running and return their ids.'''
+    ids = list(
+        SavedDraft.objects.filter(enrichment_status=SavedDraft.EnrichmentStatus.PENDING)
+        .order_by('created_at')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    claimed = []
+    for pk in ids:
+        # Compare-and-set so concurrent workers never enrich the same draft twice.
+        if SavedDraft.objects.filter(
+            pk=pk, enrichment_status=SavedDraft.EnrichmentStatus.PENDING
+        ).update(
+            enrichment_status=SavedDraft.EnrichmentStatus.RUNNING,
+            enrichment_started_at=timezone.now(),
+            version=F('version') + 1,
+        ):
+            claimed.append(pk)
+    return claimed
+
+
+def requeue_stale_drafts(stale_after: int) -> int:
+    '''Return drafts stuck in running (crashed worker) to the queue.'''
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    return SavedDraft.objects.filter(
+        enrichment_status=SavedDraft.EnrichmentStatus.RUNNING,
+        enrichment_started_at__lt=cutoff,
+    ).update(enrichment_status=SavedDraft.EnrichmentStatus.PENDING, version=F('version') + 1)
@@ -0,0 +1,64 @@
+'''Fill in job metadata for drafts saved without it.'''
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from drafts.enrichment import claim_pending_drafts, enrich_draft, requeue_stale_drafts
+from drafts.models import SavedDraft
+
+
+class Command(BaseCommand):
+    help = 'Enrich pending saved drafts with job title, company and summary line.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=300,
+            help='Seconds before a running enrichment is considered orphaned.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new drafts instead of exiting once the backlog is drained.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        concurrency = max(1, options['concurrency'])
+        total = 0
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                while True:
+                    requeue_stale_drafts(options['stale_after'])
+                    draft_ids = claim_pending_drafts(batch_size)
+                    if not draft_ids:
+                        if not options['loop']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+
+                    requeued = False
+                    for draft_id, result in zip(draft_ids, executor.map(enrich_draft, draft_ids)):
+                        if result == SavedDraft.EnrichmentStatus.PENDING:
+                            requeued = True
+                            continue
+                        total += 1
+                        self.stdout.write(f'Draft {draft_id} enrichment: {result}')
+
+                    if requeued:
+                        # The LLM upstream is shedding load; retry later.
+                        if not options['loop']:
+                            self.stdout.write('LLM unavailable; leaving remaining drafts pending.')
+                            break
+                        time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping; waiting for in-flight drafts to finish.')
+
+        self.stdout.write(f'Enriched {total} draft(s).')
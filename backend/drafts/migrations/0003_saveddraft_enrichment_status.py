@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drafts', '0002_saveddraft_resume_filename_saveddraft_summary_line'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saveddraft',
+            name='enrichment_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='saveddraft',
+            name='enrichment_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20),
+        ),
+    ]
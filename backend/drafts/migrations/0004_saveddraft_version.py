@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('drafts', '0003_saveddraft_enrichment_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='saveddraft',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
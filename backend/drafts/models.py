@@ -7,6 +7,12 @@ class SavedDraft(models.Model):
         RESUME = 'resume', 'Resume'
         COVER_LETTER = 'cover_letter', 'Cover letter'
 
+    class EnrichmentStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -20,6 +26,16 @@ class SavedDraft(models.Model):
     template_style = models.CharField(max_length=50, default='modern')
     content = models.JSONField()
     resume_filename = models.CharField(max_length=200, blank=True)
+    # Missing job metadata is filled in by the enrich_drafts worker after save.
+    enrichment_status = models.CharField(
+        max_length=20,
+        choices=EnrichmentStatus.choices,
+        default=EnrichmentStatus.PENDING,
+        db_index=True,
+    )
+    enrichment_started_at = models.DateTimeField(blank=True, null=True)
+    # Incremented on every write, including enrichment; used for ETags.
+    version = models.PositiveIntegerField(default=1, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
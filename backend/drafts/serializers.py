@@ -16,7 +16,8 @@ class SavedDraftSerializer(serializers.ModelSerializer):
             'template_style',
             'content',
             'resume_filename',
+            'enrichment_status',
             'created_at',
             'updated_at',
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'enrichment_status', 'created_at', 'updated_at']
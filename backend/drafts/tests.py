@@ -0,0 +1,145 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from profiles.llm import LLMError, LLMUnavailable
+from users.models import UserAccount
+
+from . import enrichment
+from .models import SavedDraft
+
+
+JOB_DESCRIPTION = 'Acme Corp is hiring a Senior Backend Engineer.'
+METADATA = {'job_title': 'Senior Backend Engineer', 'company': 'Acme Corp', 'summary_line': 'Scale APIs.'}
+
+
+def metadata_reply(content: str) -> dict:
+    return {'choices': [{'message': {'content': content}}]}
+
+
+def make_draft(user, **fields) -> SavedDraft:
+    fields = {'draft_type': SavedDraft.DraftType.RESUME, 'job_description': JOB_DESCRIPTION, 'content': {}, **fields}
+    return SavedDraft.objects.create(user=user, **fields)
+
+
+class DraftCreateTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+        self.user = UserAccount.objects.create_user('drafts@example.com', 'password')
+        self.client.force_authenticate(self.user)
+
+    def create(self, **fields):
+        body = {'draft_type': 'resume', 'job_description': JOB_DESCRIPTION, 'content': {}, **fields}
+        return self.client.post('/drafts/drafts/', body, format='json')
+
+    def test_non_object_body_is_rejected_by_the_serializer(self):
+        response = self.client.post('/drafts/drafts/', [], format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_missing_metadata_is_queued_for_enrichment(self):
+        response = self.create()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['enrichment_status'], SavedDraft.EnrichmentStatus.PENDING)
+
+    def test_generated_content_metadata_skips_enrichment(self):
+        response = self.create(content=METADATA)
+        self.assertEqual(response.status_code, 201)
+        draft = SavedDraft.objects.get()
+        self.assertEqual(draft.enrichment_status, SavedDraft.EnrichmentStatus.DONE)
+        self.assertEqual((draft.company, draft.resume_filename), ('Acme Corp', 'acme_corp_resume'))
+
+
+class EnrichDraftTests(APITestCase):
+    def setUp(self):
+        self.user = UserAccount.objects.create_user('enrich@example.com', 'password')
+        patcher = mock.patch.object(enrichment, 'GROQ_API_KEY', 'test-key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def enrich(self, draft, **chat):
+        with mock.patch.object(enrichment, 'chat_with_fallback', **chat):
+            status = enrichment.enrich_draft(draft.pk)
+        draft.refresh_from_db()
+        return status
+
+    def test_extracted_metadata_is_stored(self):
+        draft = make_draft(self.user, company='')
+        reply = metadata_reply(json.dumps(METADATA))
+        status = self.enrich(draft, return_value=reply)
+        self.assertEqual(status, SavedDraft.EnrichmentStatus.DONE)
+        self.assertEqual((draft.job_title, draft.company), ('Senior Backend Engineer', 'Acme Corp'))
+        self.assertEqual(draft.resume_filename, 'acme_corp_resume')
+        self.assertEqual(draft.version, 2)
+
+    def test_upstream_error_marks_the_draft_failed(self):
+        draft = make_draft(self.user)
+        status = self.enrich(draft, side_effect=LLMError('Groq API error.', 400))
+        self.assertEqual(status, SavedDraft.EnrichmentStatus.FAILED)
+        self.assertEqual(draft.enrichment_status, SavedDraft.EnrichmentStatus.FAILED)
+
+    def test_shed_load_requeues_the_draft(self):
+        draft = make_draft(self.user)
+        enrichment.claim_pending_drafts(10)
+        status = self.enrich(draft, side_effect=LLMUnavailable(5))
+        self.assertEqual(status, SavedDraft.EnrichmentStatus.PENDING)
+        self.assertEqual(draft.enrichment_status, SavedDraft.EnrichmentStatus.PENDING)
+        # Claimable again once the upstream recovers.
+        self.assertEqual(enrichment.claim_pending_drafts(10), [draft.pk])
+
+    def test_claim_moves_pending_drafts_to_running_once(self):
+        first, second = make_draft(self.user), make_draft(self.user)
+        make_draft(self.user, enrichment_status=SavedDraft.EnrichmentStatus.DONE)
+        self.assertEqual(enrichment.claim_pending_drafts(1), [first.pk])
+        self.assertEqual(enrichment.claim_pending_drafts(10), [second.pk])
+        self.assertEqual(enrichment.claim_pending_drafts(10), [])
+        first.refresh_from_db()
+        self.assertEqual(first.enrichment_status, SavedDraft.EnrichmentStatus.RUNNING)
+        self.assertIsNotNone(first.enrichment_started_at)
+
+    def test_interleaved_claims_never_share_a_draft(self):
+        drafts = [make_draft(self.user) for _ in range(3)]
+        other_worker = []
+        now = timezone.now
+
+        def claim_in_between():
+            # Runs once another worker has listed candidates but claimed none yet.
+            if not other_worker:
+                other_worker.append(None)
+                other_worker.extend(enrichment.claim_pending_drafts(10))
+            return now()
+
+        with mock.patch.object(enrichment.timezone, 'now', side_effect=claim_in_between):
+            claimed = enrichment.claim_pending_drafts(10)
+        self.assertEqual(claimed, [])
+        self.assertEqual(other_worker[1:], [draft.pk for draft in drafts])
+
+    def test_stale_running_drafts_are_requeued(self):
+        stale, fresh = make_draft(self.user), make_draft(self.user)
+        enrichment.claim_pending_drafts(10)
+        SavedDraft.objects.filter(pk=stale.pk).update(enrichment_started_at=timezone.now() - timedelta(minutes=10))
+        self.assertEqual(enrichment.requeue_stale_drafts(300), 1)
+        self.assertEqual(enrichment.claim_pending_drafts(10), [stale.pk])
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.enrichment_status, SavedDraft.EnrichmentStatus.RUNNING)
+
+
+class EnrichDraftsCommandTests(TransactionTestCase):
+    # The command enriches on its own threads, which need committed rows.
+
+    def test_command_leaves_drafts_pending_while_upstream_sheds_load(self):
+        user = UserAccount.objects.create_user('worker@example.com', 'password')
+        draft = make_draft(user)
+        with (
+            mock.patch.object(enrichment, 'GROQ_API_KEY', 'test-key'),
+            mock.patch.object(enrichment, 'chat_with_fallback', side_effect=LLMUnavailable(5)),
+        ):
+            call_command('enrich_drafts', concurrency=1, stdout=mock.Mock())
+        draft.refresh_from_db()
+        self.assertEqual(draft.enrichment_status, SavedDraft.EnrichmentStatus.PENDING)
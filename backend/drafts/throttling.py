@@ -0,0 +1,18 @@
+from collections.abc import Mapping
+
+from profiles.throttling import SYSTEM_PROMPT_TOKENS, LLMTokenBucketThrottle
+
+from .enrichment import METADATA_TOKEN_BUDGET, initial_metadata, needs_enrichment
+
+
+class DraftEnrichmentThrottle(LLMTokenBucketThrottle):
+    '''Charge draft creation for the metadata extraction it will queue.'''
+
+    def get_cost(self, request, view) -> int:
+        if getattr(view, 'action', None) != 'create' or not isinstance(request.data, Mapping):
+            # Non-object bodies are left for the serializer to reject.
+            return 0
+        job_description = str(request.data.get('job_description') or '').strip()
+        if not needs_enrichment(job_description, initial_metadata(request.data)):
+            return 0
+        return METADATA_TOKEN_BUDGET + SYSTEM_PROMPT_TOKENS
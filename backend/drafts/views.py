@@ -1,112 +1,65 @@
-import json
-import os
-import re
-
+from django.db.models import Count, F, Max, Sum
 from rest_framework import permissions, viewsets
+from rest_framework.response import Response
+
+from profiles.conditional import make_etag, not_modified, with_etag
 
+from .enrichment import initial_metadata, needs_enrichment, resume_filename_for
 from .models import SavedDraft
 from .serializers import SavedDraftSerializer
-
-
-GROQ_API_KEY = os.getenv('GROQ_API_KEY')
-GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama-3.3-70b-versatile')
-
-
-def _slugify_filename(value: str) -> str:
-    slug = re.sub(r'[^a-z0-9]+', '_', value.lower()).strip('_')
-    return slug
-
-
-def _truncate_text(text: str, limit: int = 2000) -> str:
-    if len(text) <= limit:
-        return text
-    return text[:limit].rsplit(' ', 1)[0]
-
-
-def _extract_job_metadata(job_description: str) -> dict:
-    if not GROQ_API_KEY:
-        return {}
-
-    prompt = (
-        'Extract job metadata from the job description.\n'
-        'Return STRICT JSON only (no markdown). Use this schema:\n'
-        '{\n'
-        '  "job_title": string,\n'
-        '  "company": string,\n'
-        '  "summary_line": string\n'
-        '}\n'
-        'summary_line should be a single concise sentence under 120 characters.'
-    )
-
-    payload = {
-        'model': GROQ_MODEL,
-        'temperature': 0.2,
-        'messages': [
-            {'role': 'system', 'content': prompt},
-            {'role': 'user', 'content': _truncate_text(job_description)},
-        ],
-    }
-
-    try:
-        import requests
-
-        response = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
-            headers={
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {GROQ_API_KEY}',
-            },
-            json=payload,
-            timeout=30,
-        )
-    except Exception:
-        return {}
-
-    if response.status_code >= 400:
-        return {}
-
-    data = response.json()
-    content = (
-        data.get('choices', [{}])[0]
-        .get('message', {})
-        .get('content', '')
-    )
-
-    try:
-        return json.loads(content)
-    except json.JSONDecodeError:
-        return {}
+from .throttling import DraftEnrichmentThrottle
 
 
 class SavedDraftViewSet(viewsets.ModelViewSet):
     serializer_class = SavedDraftSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [DraftEnrichmentThrottle]
 
     def get_queryset(self):
         return SavedDraft.objects.filter(user=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        '''List drafts, or 304 if none were added, changed or removed since the client's copy.'''
+        # Versions only grow and a new draft raises the newest created_at, so
+        # any add, edit or delete changes at least one of these.
+        state = self.get_queryset().aggregate(
+            count=Count('id'), newest=Max('created_at'), versions=Sum('version')
+        )
+        etag = make_etag(request, state['count'], state['newest'], state['versions'])
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        return with_etag(super().list(request, *args, **kwargs), etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        draft = self.get_object()
+        etag = make_etag(request, draft.pk, draft.version)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        return with_etag(Response(self.get_serializer(draft).data), etag)
+
     def perform_create(self, serializer):
-        extra = {}
-        job_title = serializer.validated_data.get('job_title', '').strip()
-        company = serializer.validated_data.get('company', '').strip()
-        summary_line = serializer.validated_data.get('summary_line', '').strip()
+        '''Save immediately; missing job metadata is filled in by the enrich_drafts worker.'''
+        metadata = initial_metadata(serializer.validated_data)
+        extra = {
+            field: value
+            for field, value in metadata.items()
+            if value and not serializer.validated_data.get(field, '').strip()
+        }
         job_description = serializer.validated_data.get('job_description', '').strip()
 
-        if job_description and (not job_title or not company or not summary_line):
-            extracted = _extract_job_metadata(job_description)
-            if not job_title:
-                extra['job_title'] = extracted.get('job_title', '').strip()
-            if not company:
-                extra['company'] = extracted.get('company', '').strip()
-            if not summary_line:
-                extra['summary_line'] = extracted.get('summary_line', '').strip()
-
         draft_type = serializer.validated_data.get('draft_type')
         resume_filename = serializer.validated_data.get('resume_filename', '').strip()
-        if draft_type == SavedDraft.DraftType.RESUME and not resume_filename:
-            name_source = extra.get('company') or company
-            if name_source:
-                base = _slugify_filename(name_source)
-                extra['resume_filename'] = f'{base}_resume'
+        if draft_type == SavedDraft.DraftType.RESUME and not resume_filename and metadata['company']:
+            extra['resume_filename'] = resume_filename_for(metadata['company'])
 
+        extra['enrichment_status'] = (
+            SavedDraft.EnrichmentStatus.PENDING
+            if needs_enrichment(job_description, metadata)
+            else SavedDraft.EnrichmentStatus.DONE
+        )
         serializer.save(user=self.request.user, **extra)
+
+    def perform_update(self, serializer):
+        serializer.save(version=F('version') + 1)
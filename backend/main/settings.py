@@ -50,7 +50,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'main.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -157,6 +157,83 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Groq / LLM client configuration.
+GROQ_API_KEY = getenv('GROQ_API_KEY')
+GROQ_MODEL = getenv('GROQ_MODEL', 'llama-3.3-70b-versatile')
+GROQ_BASE_URL = getenv('GROQ_BASE_URL', 'https://api.groq.com/openai/v1')
+LLM_POOL_SIZE = int(getenv('LLM_POOL_SIZE', 10))
+LLM_ASYNC_POOL_SIZE = int(getenv('LLM_ASYNC_POOL_SIZE', 100))
+LLM_MAX_RETRIES = int(getenv('LLM_MAX_RETRIES', 2))
+LLM_RETRY_BACKOFF = float(getenv('LLM_RETRY_BACKOFF', 0.5))
+LLM_CONNECT_TIMEOUT = float(getenv('LLM_CONNECT_TIMEOUT', 5))
+
+# Models tried in order when GROQ_MODEL fails or returns unusable output.
+GROQ_FALLBACK_MODELS = [m.strip() for m in getenv('GROQ_FALLBACK_MODELS', '').split(',') if m.strip()]
+
+# Hedged requests: once a call outlives the model's observed LLM_HEDGE_PERCENTILE
+# latency, send a second one (next fallback model, else the same model) and use
+# whichever answers first. LLM_HEDGE_DEFAULT_DELAY applies until enough calls
+# have been observed. Each call hedges at most once, and at most
+# LLM_HEDGE_MAX_IN_FLIGHT hedges run per process; a hedge spends tokens and a
+# limiter slot, so this is off by default.
+LLM_HEDGE_ENABLED = getenv('LLM_HEDGE_ENABLED', 'False').lower() in ('1', 'true', 'yes', 'on')
+LLM_HEDGE_MAX_IN_FLIGHT = int(getenv('LLM_HEDGE_MAX_IN_FLIGHT', 4))
+LLM_HEDGE_PERCENTILE = float(getenv('LLM_HEDGE_PERCENTILE', 95))
+LLM_HEDGE_MIN_DELAY = float(getenv('LLM_HEDGE_MIN_DELAY', 1))
+LLM_HEDGE_DEFAULT_DELAY = float(getenv('LLM_HEDGE_DEFAULT_DELAY', 10))
+
+# Serve LLM endpoints from native async views (enable when running under ASGI).
+ASYNC_LLM_VIEWS = getenv('ASYNC_LLM_VIEWS', 'False').lower() in ('1', 'true', 'yes', 'on')
+
+# LLM response cache (identical prompts reuse the previous completion).
+LLM_CACHE_ENABLED = getenv('LLM_CACHE_ENABLED', 'True').lower() in ('1', 'true', 'yes', 'on')
+LLM_CACHE_BACKEND = getenv('LLM_CACHE_BACKEND', 'profiles.llm_cache.LocMemLLMCache')
+LLM_CACHE_TTL = int(getenv('LLM_CACHE_TTL', 60 * 60))
+LLM_CACHE_MAX_ENTRIES = int(getenv('LLM_CACHE_MAX_ENTRIES', 1000))
+
+# Identical in-flight LLM requests share one upstream call. Setting a lock
+# directory extends this across worker processes; it only helps when
+# LLM_CACHE_BACKEND is shared (e.g. DjangoLLMCache on Redis/database).
+LLM_SINGLEFLIGHT_ENABLED = getenv('LLM_SINGLEFLIGHT_ENABLED', 'True').lower() in ('1', 'true', 'yes', 'on')
+LLM_SINGLEFLIGHT_LOCK_DIR = getenv('LLM_SINGLEFLIGHT_LOCK_DIR', '')
+LLM_SINGLEFLIGHT_LOCK_TIMEOUT = float(getenv('LLM_SINGLEFLIGHT_LOCK_TIMEOUT', 90))
+
+# Groq load shedding: open the breaker after consecutive upstream failures and
+# cap in-flight calls per process (the cap adapts between MIN and MAX).
+LLM_BREAKER_FAILURE_THRESHOLD = int(getenv('LLM_BREAKER_FAILURE_THRESHOLD', 5))
+LLM_BREAKER_RESET_TIMEOUT = float(getenv('LLM_BREAKER_RESET_TIMEOUT', 30))
+LLM_CONCURRENCY_INITIAL = int(getenv('LLM_CONCURRENCY_INITIAL', 8))
+LLM_CONCURRENCY_MIN = int(getenv('LLM_CONCURRENCY_MIN', 1))
+LLM_CONCURRENCY_MAX = int(getenv('LLM_CONCURRENCY_MAX', 64))
+
+# Input token budgets: profile + job description for generation, resume text for parsing.
+LLM_PROMPT_TOKEN_BUDGET = int(getenv('LLM_PROMPT_TOKEN_BUDGET', 6000))
+RESUME_PARSE_TOKEN_BUDGET = int(getenv('RESUME_PARSE_TOKEN_BUDGET', 3000))
+
+# Compacted profile payloads reused across generations until the profile changes.
+PROFILE_PAYLOAD_CACHE_TTL = int(getenv('PROFILE_PAYLOAD_CACHE_TTL', 60 * 60))
+PROFILE_PAYLOAD_CACHE_MAX_ENTRIES = int(getenv('PROFILE_PAYLOAD_CACHE_MAX_ENTRIES', 1000))
+
+# Bearer token for the /metrics/ scrape endpoint (open only under DEBUG when unset).
+METRICS_TOKEN = getenv('METRICS_TOKEN', '')
+
+# Token-bucket throttles on LLM endpoints, charged by estimated prompt tokens.
+# LLM_THROTTLE_CACHE should name a shared cache when running several processes.
+LLM_THROTTLE_ENABLED = getenv('LLM_THROTTLE_ENABLED', 'True').lower() in ('1', 'true', 'yes', 'on')
+LLM_THROTTLE_CACHE = getenv('LLM_THROTTLE_CACHE', 'default')
+LLM_USER_TOKENS_PER_MINUTE = int(getenv('LLM_USER_TOKENS_PER_MINUTE', 40000))
+LLM_GLOBAL_TOKENS_PER_MINUTE = int(getenv('LLM_GLOBAL_TOKENS_PER_MINUTE', 600000))
+
+# Resume extraction/parse cache keyed by uploaded file hash.
+RESUME_CACHE_TTL = int(getenv('RESUME_CACHE_TTL', 60 * 60 * 24))
+RESUME_CACHE_MAX_ENTRIES = int(getenv('RESUME_CACHE_MAX_ENTRIES', 256))
+
+# Resume text extraction process pool (0 workers extracts on the request thread).
+RESUME_EXTRACT_WORKERS = int(getenv('RESUME_EXTRACT_WORKERS', 2))
+RESUME_EXTRACT_TIMEOUT = float(getenv('RESUME_EXTRACT_TIMEOUT', 15))
+RESUME_MAX_PAGES = int(getenv('RESUME_MAX_PAGES', 20))
+RESUME_PAGES_PER_TASK = int(getenv('RESUME_PAGES_PER_TASK', 4))
+
 REDIRECT_URLS = [u.strip() for u in getenv('REDIRECT_URLS', '').split(',') if u.strip()]
 SEND_ACTIVATION_EMAIL = getenv('SEND_ACTIVATION_EMAIL', 'True').lower() in ('1', 'true', 'yes', 'on')
 SEND_CONFIRMATION_EMAIL = getenv('SEND_CONFIRMATION_EMAIL', 'True').lower() in ('1', 'true', 'yes', 'on')
@@ -4,6 +4,8 @@ from django.contrib import admin
 from django.http import HttpResponse
 from django.urls import path, include
 
+from profiles.metrics import metrics_view
+
 
 def health_check(_request):
     # Lightweight health endpoint with no external dependencies.
@@ -16,6 +18,7 @@ urlpatterns = [
     path('profiles/', include('profiles.urls')),
     path('drafts/', include('drafts.urls')),
     path('health/', health_check),
+    path('metrics/', metrics_view),
 ]
 
 if settings.DEBUG:
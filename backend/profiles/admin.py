@@ -2,7 +2,15 @@
 
 from django.contrib import admin
 
-from .models import Achievement, Certification, Education, Experience, Skill, UserProfile
+from .models import (
+    Achievement,
+    Certification,
+    Education,
+    Experience,
+    GenerationJob,
+    Skill,
+    UserProfile,
+)
 
 
 @admin.register(UserProfile)
@@ -45,3 +53,11 @@ class AchievementAdmin(admin.ModelAdmin):
     # Admin list view for achievement entries.
     list_display = ('profile', 'title', 'date')
     search_fields = ('profile__user__email', 'title')
+
+
+@admin.register(GenerationJob)
+class GenerationJobAdmin(admin.ModelAdmin):
+    # Admin list view for queued generation jobs.
+    list_display = ('user', 'kind', 'status', 'attempts', 'created_at', 'finished_at')
+    search_fields = ('user__email',)
+    list_filter = ('kind', 'status')
@@ -0,0 +1,247 @@
+'''Native async variants of the LLM endpoints, routed first when ASYNC_LLM_VIEWS is on.'''
+
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.settings import api_settings
+
+from .generation import (
+    BUNDLE,
+    COVER_LETTER,
+    RESUME,
+    agenerate_bundle,
+    agenerate_document,
+    generation_params,
+    is_json_output,
+)
+from .jobs import enqueue_generation
+from .llm import (
+    GROQ_API_KEY,
+    GROQ_MODEL,
+    LLMError,
+    achat_with_fallback,
+    extract_content,
+    retry_after_headers,
+)
+from .metrics import endpoint
+from .models import UserProfile
+from .resume_parser import (
+    build_resume_messages,
+    extract_resume_text_cached,
+    extraction_error_response,
+    llm_error_response,
+    parse_resume_output,
+    parsed_cache_key,
+    resume_cache,
+    resume_digest,
+    validate_resume_upload,
+)
+from .serializers import GenerationJobSerializer
+from .singleflight import async_llm_flights
+from .throttling import action_cost, consume_llm_tokens
+from .upload_handlers import install_resume_upload_handler
+
+
+def _authenticate(request):
+    # Run the configured DRF authenticators against the plain Django request.
+    for auth_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = auth_class().authenticate(request)
+        if result is not None:
+            return result[0]
+    return None
+
+
+async def _get_user(request):
+    user = await sync_to_async(_authenticate)(request)
+    if user is None or not user.is_active:
+        return None
+    return user
+
+
+def _unauthorized() -> JsonResponse:
+    return JsonResponse(
+        {'detail': 'Authentication credentials were not provided.'},
+        status=status.HTTP_401_UNAUTHORIZED,
+    )
+
+
+def _throttled(wait: float) -> JsonResponse:
+    # Same body and header as DRF's Throttled exception.
+    seconds = math.ceil(wait)
+    return JsonResponse(
+        {'detail': f'Request was throttled. Expected available in {seconds} seconds.'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(seconds)},
+    )
+
+
+def _request_data(request) -> dict | list | None:
+    # Reads and parses the body; call through sync_to_async.
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except json.JSONDecodeError:
+            return None
+    return request.POST
+
+
+def _resume_file(request):
+    # Parses the multipart body; call through sync_to_async.
+    return request.FILES.get('resume_file')
+
+
+async def _generate(request, kind):
+    # Same order as UserProfileViewSet: authenticate, charge the throttle, then validate.
+    action = f'generate_{kind}'
+    user = await _get_user(request)
+    if user is None:
+        return _unauthorized()
+
+    data = await sync_to_async(_request_data)(request)
+    if data is None:
+        return JsonResponse({'detail': 'Malformed JSON body.'}, status=400)
+
+    wait = await sync_to_async(consume_llm_tokens)(user.pk, action_cost(action, data))
+    if wait:
+        return _throttled(wait)
+
+    profile = await UserProfile.objects.filter(user=user).afirst()
+    if not profile:
+        return JsonResponse({'detail': 'Profile not found.'}, status=404)
+
+    params, error = generation_params(data)
+    if error:
+        body, http_status = error
+        return JsonResponse(body, status=http_status)
+
+    jd_text = params['job_description']
+    template_style = params['template_style']
+    regenerate = params['regenerate']
+
+    if params['async']:
+        job = await sync_to_async(enqueue_generation)(
+            user,
+            kind,
+            {
+                'job_description': jd_text,
+                'template_style': template_style,
+                'regenerate': regenerate,
+            },
+        )
+        return JsonResponse(
+            GenerationJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    if kind == BUNDLE:
+        body, http_status = await agenerate_bundle(
+            profile, jd_text, template_style, use_cache=not regenerate
+        )
+    else:
+        body, http_status = await agenerate_document(
+            kind, profile, jd_text, template_style, use_cache=not regenerate
+        )
+    return JsonResponse(body, status=http_status, headers=retry_after_headers(body))
+
+
+@csrf_exempt
+@require_POST
+async def generate_resume(request):
+    '''Generate a structured resume draft from profile + job description.'''
+    with endpoint('generate_resume'):
+        return await _generate(request, RESUME)
+
+
+@csrf_exempt
+@require_POST
+async def generate_cover_letter(request):
+    '''Generate a structured cover letter draft from profile + job description.'''
+    with endpoint('generate_cover_letter'):
+        return await _generate(request, COVER_LETTER)
+
+
+@csrf_exempt
+@require_POST
+async def generate_bundle(request):
+    '''Generate a resume and cover letter together for one job description.'''
+    with endpoint('generate_bundle'):
+        return await _generate(request, BUNDLE)
+
+
+@csrf_exempt
+@require_POST
+async def parse_resume(request):
+    '''Accept a resume file and return parsed fields.'''
+    with endpoint('parse_resume'):
+        return await _parse_resume(request)
+
+
+async def _parse_resume(request):
+    user = await _get_user(request)
+    if user is None:
+        return _unauthorized()
+
+    wait = await sync_to_async(consume_llm_tokens)(user.pk, action_cost('parse_resume'))
+    if wait:
+        return _throttled(wait)
+
+    upload_handler = install_resume_upload_handler(request)
+    resume_file = await sync_to_async(_resume_file)(request)
+    if upload_handler.exceeded:
+        return JsonResponse({'detail': 'Resume file exceeds 5MB limit.'}, status=400)
+    if not resume_file:
+        return JsonResponse({'detail': 'resume_file is required.'}, status=400)
+
+    if not GROQ_API_KEY:
+        return JsonResponse(
+            {'detail': 'GROQ_API_KEY is not configured.'},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    error = validate_resume_upload(resume_file)
+    if error:
+        return JsonResponse({'detail': error}, status=400)
+
+    # Hashing and text extraction are CPU-bound; keep them off the event loop.
+    digest = await sync_to_async(resume_digest, thread_sensitive=False)(resume_file)
+    cached = resume_cache.get(parsed_cache_key(digest))
+    if cached is not None:
+        return JsonResponse(cached, status=status.HTTP_200_OK, safe=False)
+
+    async def parse():
+        try:
+            resume_text = await sync_to_async(extract_resume_text_cached, thread_sensitive=False)(
+                resume_file, resume_file.content_type, digest
+            )
+        except Exception as exc:
+            return extraction_error_response(exc)
+
+        if not resume_text:
+            return (
+                {'detail': 'Resume text could not be extracted.'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            data = await achat_with_fallback(
+                build_resume_messages(resume_text),
+                model=GROQ_MODEL,
+                timeout=60,
+                validate=is_json_output,
+            )
+        except LLMError as exc:
+            return llm_error_response(exc)
+
+        body, http_status = parse_resume_output(extract_content(data))
+        if http_status == status.HTTP_200_OK:
+            resume_cache.set(parsed_cache_key(digest), body)
+        return body, http_status
+
+    # Concurrent uploads of the same file share one extraction and LLM call.
+    body, http_status = await async_llm_flights.do(parsed_cache_key(digest), parse)
+    return JsonResponse(body, status=http_status, safe=False, headers=retry_after_headers(body))
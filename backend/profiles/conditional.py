@@ -0,0 +1,40 @@
+'''Strong ETags and If-None-Match handling for read endpoints.'''
+
+import hashlib
+
+from django.utils.cache import parse_etags, patch_cache_control
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(request, *parts) -> str:
+    '''Strong ETag over `parts`, scoped to the user and the negotiated format.'''
+    renderer = getattr(request, 'accepted_renderer', None)
+    key = ':'.join(str(part) for part in (request.user.pk, getattr(renderer, 'format', ''), *parts))
+    return '"%s"' % hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def _finish(response, etag: str):
+    response['ETag'] = etag
+    # Per-user data: clients may keep a copy but must revalidate before reuse.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def not_modified(request, etag: str) -> Response | None:
+    '''Return a 304 if the client's If-None-Match already holds `etag`, else None.'''
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return None
+    # If-None-Match uses weak comparison, so a proxy's W/ prefix still matches.
+    tags = {tag.removeprefix('W/') for tag in parse_etags(header)}
+    if '*' in tags or etag in tags:
+        return _finish(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+    return None
+
+
+def with_etag(response, etag: str):
+    '''Attach `etag` to a successful read response.'''
+    if response.status_code == status.HTTP_200_OK:
+        _finish(response, etag)
+    return response
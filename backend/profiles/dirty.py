@@ -0,0 +1,119 @@
+'''Coalesced follow-up writes after a profile or its sections change.'''
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import UserProfile
+
+
+_batch = ContextVar('profile_write_batch', default=None)
+
+
+class DirtyProfile:
+    '''Follow-ups owed to one profile.'''
+
+    def __init__(self, profile_id: int):
+        self.profile_id = profile_id
+        self.content_changed = False
+        self.profile = None
+        # Section name -> non-empty after the writes, or None if unknown.
+        self.sections = None
+        self.previous_field_points = None
+
+    def merge(self, content_changed=False, profile=None, sections=None, previous_field_points=None) -> None:
+        self.content_changed = self.content_changed or content_changed
+        if profile is not None:
+            self.profile = profile
+        if sections is not None:
+            self.sections = {**(self.sections or {}), **sections}
+        if self.previous_field_points is None:
+            self.previous_field_points = previous_field_points
+
+    def forget_hints(self) -> None:
+        # After a failed block, only trust what the database says.
+        if self.sections is not None:
+            self.sections = {}
+
+    def apply(self) -> None:
+        # Version bump and new score go out as a single UPDATE of the row.
+        updates = {}
+        if self.content_changed:
+            updates['content_version'] = F('content_version') + 1
+        profile = self.profile
+        score = None
+        if profile is not None and self.sections is not None:
+            known = {name: present for name, present in self.sections.items() if present is not None}
+            score = profile.completeness_score(known)
+        elif profile is not None and self.previous_field_points is not None:
+            # Recomputed rather than adjusted: the stored score may predate a
+            # concurrent section write. Field edits worth no points change nothing.
+            if profile.field_points() != self.previous_field_points:
+                score = profile.completeness_score()
+        if score is not None and score != profile.profile_completeness:
+            updates['profile_completeness'] = score
+        if updates:
+            # update() skips post_save, so this never marks the profile dirty again.
+            UserProfile.objects.filter(pk=self.profile_id).update(**updates)
+        if 'profile_completeness' in updates:
+            profile.profile_completeness = score
+
+
+def _mark(profile_id: int | None, **changes) -> None:
+    if profile_id is None:
+        return
+    batch = _batch.get()
+    if batch is None:
+        dirty = DirtyProfile(profile_id)
+        dirty.merge(**changes)
+        # Outside a batch this runs at once in autocommit mode, or at commit.
+        transaction.on_commit(dirty.apply)
+        return
+    dirty = batch.get(profile_id)
+    if dirty is None:
+        dirty = batch[profile_id] = DirtyProfile(profile_id)
+    dirty.merge(**changes)
+
+
+def mark_content_changed(profile_id: int | None) -> None:
+    '''Invalidate the profile's cached prompt payloads once the write commits.'''
+    _mark(profile_id, content_changed=True)
+
+
+def mark_sections_changed(profile, sections: dict) -> None:
+    '''Recompute completeness after section writes.
+
+    `sections` maps section names to whether they are now non-empty, or to
+    None when the caller cannot tell (e.g. after deleting one item).
+    '''
+    _mark(profile.pk, profile=profile, sections=sections)
+
+
+def mark_fields_changed(profile, previous_field_points: int) -> None:
+    '''Recompute completeness after a change to the profile's own fields.'''
+    _mark(profile.pk, profile=profile, previous_field_points=previous_field_points)
+
+
+@contextmanager
+def profile_writes():
+    '''Merge follow-ups from the enclosed writes into one per profile.
+
+    Nested blocks join the outermost one.
+    '''
+    if _batch.get() is not None:
+        yield
+        return
+    batch = {}
+    token = _batch.set(batch)
+    try:
+        yield
+    except BaseException:
+        for dirty in batch.values():
+            dirty.forget_hints()
+        raise
+    finally:
+        _batch.reset(token)
+        for dirty in batch.values():
+            transaction.on_commit(dirty.apply)
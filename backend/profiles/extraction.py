@@ -0,0 +1,184 @@
+'''Resume text extraction in a bounded process pool.'''
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from django.conf import settings
+
+
+PDF_CONTENT_TYPE = 'application/pdf'
+
+
+class ExtractionError(Exception):
+    '''Raised when a resume cannot be extracted within the configured limits.'''
+
+
+class ExtractionTimeout(ExtractionError):
+    '''The file was not extracted within RESUME_EXTRACT_TIMEOUT.'''
+
+
+class ExtractionCrashed(ExtractionError):
+    '''Extraction workers kept dying on the file.'''
+
+
+def _open_source(source: str | bytes):
+    # Paths are opened and read lazily by the parser instead of being copied
+    # into memory; raw bytes are only used for in-memory uploads.
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BytesIO(source)
+    return open(source, 'rb')
+
+
+def _extract_pdf_range(source: str | bytes, start: int, end: int) -> tuple[str, int]:
+    # Runs in a worker process; returns (text for pages [start, end), page count).
+    from pypdf import PdfReader
+
+    with _open_source(source) as stream:
+        reader = PdfReader(stream)
+        total = len(reader.pages)
+        parts = [
+            reader.pages[index].extract_text() or ''
+            for index in range(start, min(end, total))
+        ]
+    return '\n'.join(parts), total
+
+
+def _extract_docx(source: str | bytes) -> str:
+    # Runs in a worker process.
+    from docx import Document
+
+    with _open_source(source) as stream:
+        doc = Document(stream)
+    return '\n'.join(para.text for para in doc.paragraphs if para.text)
+
+
+# Times a call resubmits its tasks after the shared pool was torn down under it.
+MAX_POOL_ATTEMPTS = 3
+
+_pool = None
+_pool_generation = 0
+_pool_lock = threading.Lock()
+
+
+class _PoolLost(Exception):
+    '''The pool died under this call's tasks; they can be resubmitted to a new one.'''
+
+
+def _get_pool() -> tuple[ProcessPoolExecutor, int]:
+    global _pool, _pool_generation
+    with _pool_lock:
+        if _pool is None:
+            # spawn avoids forking a threaded web worker with open DB sockets.
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.RESUME_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            _pool_generation += 1
+        return _pool, _pool_generation
+
+
+def _reset_pool(generation: int) -> None:
+    '''Kill every worker (including stuck ones) of pool `generation` and drop it.'''
+    global _pool
+    with _pool_lock:
+        if _pool_generation != generation:
+            # Already replaced by another caller; never kill the new pool.
+            return
+        pool, _pool = _pool, None
+    if pool is None:
+        return
+    processes = list((getattr(pool, '_processes', None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+def _wait_all(futures: list, deadline: float, generation: int) -> list:
+    done, not_done = wait(
+        futures,
+        timeout=max(0, deadline - time.monotonic()),
+        return_when=FIRST_EXCEPTION,
+    )
+    for future in done:
+        # Cancelled: another caller shut the pool down before this task started.
+        exc = BrokenProcessPool() if future.cancelled() else future.exception()
+        if exc is None:
+            continue
+        for pending in not_done:
+            pending.cancel()
+        if isinstance(exc, BrokenProcessPool):
+            # A worker died (this file, or a pool killed over another upload).
+            _reset_pool(generation)
+            raise _PoolLost from exc
+        raise exc
+    if not_done:
+        # Only this call's deadline passed; callers sharing the pool resubmit.
+        _reset_pool(generation)
+        raise ExtractionTimeout('Resume extraction timed out.')
+    return [future.result() for future in futures]
+
+
+def _run_tasks(tasks: list[tuple], deadline: float) -> list:
+    '''Run (fn, *args) tasks in the shared pool and return their results in order.
+
+    Tasks lost to a pool torn down on behalf of another upload are
+    resubmitted; a file that keeps crashing workers raises ExtractionCrashed.
+    '''
+    for _attempt in range(MAX_POOL_ATTEMPTS):
+        pool, generation = _get_pool()
+        try:
+            futures = [pool.submit(*task) for task in tasks]
+        except (BrokenProcessPool, RuntimeError):
+            # Shut down between _get_pool() and submit().
+            _reset_pool(generation)
+            continue
+        try:
+            return _wait_all(futures, deadline, generation)
+        except _PoolLost:
+            if time.monotonic() >= deadline:
+                raise ExtractionTimeout('Resume extraction timed out.') from None
+    raise ExtractionCrashed('Resume extraction worker crashed.')
+
+
+def _extract_inline(source: str | bytes, content_type: str, max_pages: int) -> str:
+    if content_type == PDF_CONTENT_TYPE:
+        text, _total = _extract_pdf_range(source, 0, max_pages)
+        return text
+    return _extract_docx(source)
+
+
+def extract_text(source: str | bytes, content_type: str) -> str:
+    '''Extract plain text from a PDF/DOCX file path or bytes within the configured limits.
+
+    Prefer passing a path: workers open the file themselves, so the upload
+    is never pickled across the process boundary.
+    '''
+    max_pages = settings.RESUME_MAX_PAGES
+    if settings.RESUME_EXTRACT_WORKERS <= 0:
+        # Pool disabled (e.g. local development): extract on the calling thread.
+        return _extract_inline(source, content_type, max_pages).strip()
+
+    deadline = time.monotonic() + settings.RESUME_EXTRACT_TIMEOUT
+
+    if content_type != PDF_CONTENT_TYPE:
+        (text,) = _run_tasks([(_extract_docx, source)], deadline)
+        return text.strip()
+
+    # The first range also reports the page count; remaining ranges fan out.
+    pages_per_task = max(1, settings.RESUME_PAGES_PER_TASK)
+    first_text, total = _run_tasks(
+        [(_extract_pdf_range, source, 0, min(pages_per_task, max_pages))],
+        deadline,
+    )[0]
+    last_page = min(total, max_pages)
+    tasks = [
+        (_extract_pdf_range, source, start, min(start + pages_per_task, last_page))
+        for start in range(pages_per_task, last_page, pages_per_task)
+    ]
+    rest = [text for text, _total in _run_tasks(tasks, deadline)] if tasks else []
+    return '\n'.join([first_text, *rest]).strip()
@@ -0,0 +1,297 @@
+'''Prompt building and LLM generation shared by request handlers and workers.'''
+
+import asyncio
+import contextvars
+import json
+from collections.abc import Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import prefetch_related_objects
+from rest_framework import status
+
+from .llm import GROQ_API_KEY, GROQ_MODEL, LLMError, acall_groq, call_groq, llm_error_result, stream_groq
+from .metrics import record_json_failure
+from .models import PROFILE_SECTIONS, UserProfile
+from .payload_cache import cached_profile_payload
+from .prompts import compact, dumps, fit_to_budget
+from .serializers import UserProfileDetailSerializer
+from .streaming import IncrementalJSONParser
+
+
+RESUME = 'resume'
+COVER_LETTER = 'cover_letter'
+BUNDLE = 'bundle'
+BUNDLE_KINDS = (RESUME, COVER_LETTER)
+
+
+# Job metadata returned alongside every generated document, so saving a draft
+# never needs a second LLM call to fill job_title/company/summary_line.
+JOB_METADATA_SCHEMA = (
+    '  "job_title": string,\n'
+    '  "company": string,\n'
+    '  "summary_line": string\n'
+)
+JOB_METADATA_RULES = (
+    'job_title and company describe the role in the job description. '
+    'summary_line should be a single concise sentence under 120 characters.\n'
+)
+
+
+def parse_bool(value) -> bool:
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+def generation_params(data) -> tuple[dict | None, tuple[dict, int] | None]:
+    '''Validate a generation request body; returns (params, None) or (None, (body, status)).'''
+    # Non-object bodies are treated as empty and fail on the missing job description.
+    data = data if isinstance(data, Mapping) else {}
+    jd_text = (data.get('job_description') or '').strip()
+    if not jd_text:
+        return None, ({'detail': 'job_description is required.'}, status.HTTP_400_BAD_REQUEST)
+
+    if not GROQ_API_KEY:
+        return None, (
+            {'detail': 'GROQ_API_KEY is not configured.'},
+            status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    return {
+        'job_description': jd_text,
+        'template_style': (data.get('template_style') or 'modern').strip(),
+        'regenerate': parse_bool(data.get('regenerate')),
+        'async': parse_bool(data.get('async')),
+    }, None
+
+def strip_code_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        # remove first line (``` or ```json)
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+    if text.endswith("```"):
+        text = text.rsplit("```", 1)[0]
+    return text.strip()
+
+def is_json_output(text: str) -> bool:
+    '''Whether model output decodes as JSON once code fences are stripped.'''
+    try:
+        json.loads(strip_code_fences(text))
+    except json.JSONDecodeError:
+        return False
+    return True
+
+def build_profile_payload(profile: UserProfile) -> dict:
+    # Loads each section in one query; skips any the caller already prefetched.
+    prefetch_related_objects([profile], *PROFILE_SECTIONS)
+    data = UserProfileDetailSerializer(profile).data
+    # Remove fields not needed for generation.
+    data.pop('profile_completeness', None)
+    data.pop('updated_at', None)
+    data.pop('resume_file', None)
+    # Ids, ordering keys and empty values only cost tokens.
+    return compact(data)
+
+def resume_system_prompt(template_style: str) -> str:
+    return (
+        'You are a resume writer and evaluator. Use the profile data and job description to craft a tailored resume.\n'
+        'Return STRICT JSON only (no markdown). Use this schema:\n'
+        '{\n'
+        '  "headline": string,\n'
+        '  "summary": string,\n'
+        '  "skills": [string],\n'
+        '  "experiences": [\n'
+        '    {\n'
+        '      "company": string,\n'
+        '      "title": string,\n'
+        '      "location": string,\n'
+        '      "start_date": string,\n'
+        '      "end_date": string|null,\n'
+        '      "is_current": boolean,\n'
+        '      "bullets": [string]\n'
+        '    }\n'
+        '  ],\n'
+        '  "education": [\n'
+        '    {"school": string, "degree": string, "field_of_study": string, "start_date": string|null, "end_date": string|null}\n'
+        '  ],\n'
+        '  "certifications": [string],\n'
+        '  "achievements": [string],\n'
+        '  "fit_score": number,\n'
+        '  "strengths": [string],\n'
+        '  "weaknesses": [string],\n'
+        f'{JOB_METADATA_SCHEMA}'
+        '}\n'
+        'fit_score must be 0-100. strengths/weaknesses should each be at most 2 items.\n'
+        f'{JOB_METADATA_RULES}'
+        f'Template style: {template_style}. Prioritize relevance to the job description.'
+    )
+
+def cover_letter_system_prompt(template_style: str) -> str:
+    return (
+        'You are a cover letter writer. Use the profile data and job description to craft a tailored letter.\n'
+        'Return STRICT JSON only (no markdown). Use this schema:\n'
+        '{\n'
+        '  "subject": string,\n'
+        '  "greeting": string,\n'
+        '  "body_paragraphs": [string],\n'
+        '  "closing": string,\n'
+        '  "signature": string,\n'
+        f'{JOB_METADATA_SCHEMA}'
+        '}\n'
+        f'{JOB_METADATA_RULES}'
+        f'Template style: {template_style}. Keep it concise and role-specific.'
+    )
+
+SYSTEM_PROMPTS = {
+    RESUME: resume_system_prompt,
+    COVER_LETTER: cover_letter_system_prompt,
+}
+
+def build_user_content(profile: UserProfile, job_description: str) -> str:
+    '''Serialize the budgeted profile + job description sent with every generation.'''
+    payload, payload_json, payload_tokens = cached_profile_payload(profile, build_profile_payload)
+    profile_payload, jd_text = fit_to_budget(
+        payload,
+        job_description,
+        settings.LLM_PROMPT_TOKEN_BUDGET,
+        profile_tokens=payload_tokens,
+    )
+    if profile_payload is not payload:
+        payload_json = dumps(profile_payload)
+    # Same bytes as dumps({'profile': ..., 'job_description': ...}).
+    return f'{{"profile":{payload_json},"job_description":{dumps(jd_text)}}}'
+
+def build_generation_request(kind: str, profile: UserProfile, job_description: str, template_style: str) -> tuple[str, str]:
+    '''Return the (system_prompt, user_content) pair for a generation kind.'''
+    return SYSTEM_PROMPTS[kind](template_style), build_user_content(profile, job_description)
+
+def parse_model_output(result: dict) -> tuple[dict, int]:
+    '''Turn a call_groq result into a response body and HTTP status.'''
+    if 'error' in result:
+        body = {'detail': result['error']}
+        if 'retry_after' in result:
+            body['retry_after'] = result['retry_after']
+        return body, result['status']
+
+    text = strip_code_fences(result.get('content', ''))
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        record_json_failure()
+        return (
+            {'detail': 'Model output was not valid JSON.', 'raw_output': text},
+            status.HTTP_502_BAD_GATEWAY,
+        )
+    return parsed, status.HTTP_200_OK
+
+def generate_document(
+    kind: str,
+    profile: UserProfile,
+    job_description: str,
+    template_style: str,
+    use_cache: bool = True,
+) -> tuple[dict, int]:
+    '''Generate a resume or cover letter and return (body, http_status).'''
+    system_prompt, user_content = build_generation_request(
+        kind, profile, job_description, template_style
+    )
+    result = call_groq(
+        system_prompt, user_content, GROQ_MODEL, use_cache=use_cache, validate=is_json_output
+    )
+    return parse_model_output(result)
+
+async def agenerate_document(
+    kind: str,
+    profile: UserProfile,
+    job_description: str,
+    template_style: str,
+    use_cache: bool = True,
+) -> tuple[dict, int]:
+    '''Async generate_document: serializes the profile in a thread, awaits Groq.'''
+    system_prompt, user_content = await sync_to_async(build_generation_request)(
+        kind, profile, job_description, template_style
+    )
+    result = await acall_groq(
+        system_prompt, user_content, GROQ_MODEL, use_cache=use_cache, validate=is_json_output
+    )
+    return parse_model_output(result)
+
+def merge_bundle(results: dict) -> tuple[dict, int]:
+    '''Combine per-kind (body, status) pairs; the first failure wins.'''
+    # Successful halves are already in the response cache, so a retry after a
+    # partial failure only pays for the document that failed.
+    for kind in BUNDLE_KINDS:
+        body, http_status = results[kind]
+        if http_status >= 400:
+            return {**body, 'failed': kind}, http_status
+    return {kind: results[kind][0] for kind in BUNDLE_KINDS}, status.HTTP_200_OK
+
+def generate_bundle(
+    profile: UserProfile,
+    job_description: str,
+    template_style: str,
+    use_cache: bool = True,
+) -> tuple[dict, int]:
+    '''Generate resume and cover letter concurrently from one prepared payload.'''
+    user_content = build_user_content(profile, job_description)
+
+    def generate(kind):
+        result = call_groq(
+            SYSTEM_PROMPTS[kind](template_style),
+            user_content,
+            GROQ_MODEL,
+            use_cache=use_cache,
+            validate=is_json_output,
+        )
+        return parse_model_output(result)
+
+    # Each thread runs in a copy of this context so metrics keep the endpoint label.
+    contexts = [contextvars.copy_context() for _kind in BUNDLE_KINDS]
+    with ThreadPoolExecutor(max_workers=len(BUNDLE_KINDS)) as executor:
+        outputs = executor.map(lambda context, kind: context.run(generate, kind), contexts, BUNDLE_KINDS)
+        results = dict(zip(BUNDLE_KINDS, outputs))
+    return merge_bundle(results)
+
+async def agenerate_bundle(
+    profile: UserProfile,
+    job_description: str,
+    template_style: str,
+    use_cache: bool = True,
+) -> tuple[dict, int]:
+    '''Async generate_bundle: both Groq calls are awaited concurrently.'''
+    user_content = await sync_to_async(build_user_content)(profile, job_description)
+    outputs = await asyncio.gather(*[
+        acall_groq(
+            SYSTEM_PROMPTS[kind](template_style),
+            user_content,
+            GROQ_MODEL,
+            use_cache=use_cache,
+            validate=is_json_output,
+        )
+        for kind in BUNDLE_KINDS
+    ])
+    return merge_bundle({
+        kind: parse_model_output(result) for kind, result in zip(BUNDLE_KINDS, outputs)
+    })
+
+def stream_generation(system_prompt: str, user_content: str, use_cache: bool = True) -> Iterator[tuple[str, object]]:
+    '''Yield (event, data) pairs: a "field" per completed value, then "done" or "error".'''
+    parser = IncrementalJSONParser()
+    parts = []
+    try:
+        for delta in stream_groq(
+            system_prompt, user_content, GROQ_MODEL, use_cache=use_cache, validate=is_json_output
+        ):
+            parts.append(delta)
+            for path, value in parser.feed(delta):
+                yield 'field', {'path': list(path), 'value': value}
+    except LLMError as exc:
+        result = llm_error_result(exc)
+        body, http_status = parse_model_output(result)
+        yield 'error', {**body, 'status': http_status}
+        return
+
+    body, http_status = parse_model_output({'content': ''.join(parts)})
+    if http_status >= 400:
+        yield 'error', {**body, 'status': http_status}
+    else:
+        yield 'done', body
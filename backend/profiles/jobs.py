@@ -0,0 +1,120 @@
+'''Durable job queue (generation and resume imports) backed by the GenerationJob table.'''
+
+import logging
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework import status
+
+from .generation import BUNDLE, generate_bundle, generate_document
+from .metrics import endpoint
+from .models import GenerationJob, UserProfile
+from .onboarding import import_stored_resume
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+
+# Delay before a job requeued after a 503 is claimable again; doubles per attempt.
+RETRY_BASE_DELAY = 5
+RETRY_MAX_DELAY = 300
+
+
+def enqueue_generation(user, kind: str, payload: dict) -> GenerationJob:
+    '''Persist a pending job; a worker process picks it up later.'''
+    return GenerationJob.objects.create(user=user, kind=kind, payload=payload)
+
+
+def claim_next_job() -> GenerationJob | None:
+    '''Atomically move the oldest available pending job to running and return it.'''
+    candidates = (
+        GenerationJob.objects.filter(status=GenerationJob.Status.PENDING)
+        .filter(Q(available_at__isnull=True) | Q(available_at__lte=timezone.now()))
+        .order_by('created_at')
+        .values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        # Compare-and-set so concurrent workers never run the same job twice.
+        claimed = GenerationJob.objects.filter(
+            pk=pk, status=GenerationJob.Status.PENDING
+        ).update(
+            status=GenerationJob.Status.RUNNING,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return GenerationJob.objects.get(pk=pk)
+    return None
+
+
+def retry_delay(attempts: int, retry_after: float | None = None) -> float:
+    '''Seconds before a job requeued after its `attempts`-th try may run again.'''
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** max(0, attempts - 1))
+    return max(delay, retry_after or 0)
+
+
+def run_job(job: GenerationJob, max_attempts: int = MAX_ATTEMPTS) -> GenerationJob:
+    '''Execute a claimed job and store its result or failure.'''
+    with endpoint(f'job_{job.kind}'):
+        try:
+            profile = UserProfile.objects.filter(user_id=job.user_id).first()
+            if not profile:
+                body, http_status = {'detail': 'Profile not found.'}, 404
+            elif job.kind == GenerationJob.Kind.RESUME_IMPORT:
+                body, http_status = import_stored_resume(profile, job.payload)
+            else:
+                args = (
+                    profile,
+                    job.payload.get('job_description', ''),
+                    job.payload.get('template_style', 'modern'),
+                )
+                use_cache = not job.payload.get('regenerate', False)
+                if job.kind == BUNDLE:
+                    body, http_status = generate_bundle(*args, use_cache=use_cache)
+                else:
+                    body, http_status = generate_document(job.kind, *args, use_cache=use_cache)
+        except Exception:
+            # Clients poll the stored error, so keep exception details in the log.
+            logger.exception('Generation job %s failed', job.pk)
+            body, http_status = {'detail': 'Generation failed.'}, 500
+
+    if http_status == status.HTTP_503_SERVICE_UNAVAILABLE and job.attempts < max_attempts:
+        # Groq is shedding load; put the job back, out of reach until it may have recovered.
+        delay = retry_delay(job.attempts, body.get('retry_after'))
+        job.status = GenerationJob.Status.PENDING
+        job.started_at = None
+        job.available_at = timezone.now() + timedelta(seconds=delay)
+        job.save(update_fields=['status', 'started_at', 'available_at'])
+        close_old_connections()
+        return job
+
+    job.finished_at = timezone.now()
+    if http_status < 400:
+        job.status = GenerationJob.Status.DONE
+        job.result = body
+        job.error = ''
+    else:
+        job.status = GenerationJob.Status.FAILED
+        job.result = body
+        job.error = body.get('detail', '')
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    close_old_connections()
+    return job
+
+
+def requeue_stale_jobs(stale_after: int, max_attempts: int) -> int:
+    '''Return jobs orphaned by a crashed worker to the queue (or fail them).'''
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    stale = GenerationJob.objects.filter(
+        status=GenerationJob.Status.RUNNING, started_at__lt=cutoff
+    )
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=GenerationJob.Status.FAILED,
+        error='Job exceeded the maximum number of attempts.',
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=GenerationJob.Status.PENDING, started_at=None)
+    return failed + requeued
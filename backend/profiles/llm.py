@@ -0,0 +1,801 @@
+'''Shared Groq client used by every LLM call site.'''
+
+import asyncio
+import contextvars
+import json
+import math
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from rest_framework import status
+from urllib3.util.retry import Retry
+
+from .llm_cache import llm_cache, make_cache_key
+from .metrics import CallTimer, record_fallback, record_hedge, record_rejected
+from .resilience import hedge_delay, latency_tracker, retry_after_seconds, upstream_guard
+from .singleflight import async_llm_flights, llm_flights, llm_key_lock
+
+
+GROQ_API_KEY = settings.GROQ_API_KEY
+GROQ_MODEL = settings.GROQ_MODEL
+
+# Upstream statuses worth retrying: throttling and transient gateway errors.
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+class LLMError(Exception):
+    '''Raised when the upstream chat-completions call fails.'''
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class LLMTimeout(LLMError):
+    '''Raised when Groq does not answer within the client timeout.'''
+
+
+class LLMUnavailable(LLMError):
+    '''Raised without calling Groq while the breaker is open or the process is saturated.'''
+
+    def __init__(self, retry_after: float):
+        super().__init__('LLM service is temporarily unavailable. Please retry shortly.')
+        self.retry_after = retry_after_seconds(retry_after)
+
+
+def is_upstream_failure(exc: LLMError) -> bool:
+    # Network errors, timeouts, throttling and 5xx signal an unhealthy upstream;
+    # other 4xx responses are our own request's fault.
+    return exc.status_code is None or exc.status_code == 429 or exc.status_code >= 500
+
+
+@contextmanager
+def upstream_slot(model: str, messages: list[dict]):
+    '''Admit one call through the breaker/limiter, then time and report it.
+
+    Yields a CallTimer; set its `usage` from the response before leaving.
+    '''
+    retry_after, ticket = upstream_guard.admit()
+    if retry_after is not None:
+        record_rejected()
+        raise LLMUnavailable(retry_after)
+    call = CallTimer(model, messages)
+    call.usage = None
+    try:
+        yield call
+    except LLMError as exc:
+        call.record('timeout' if isinstance(exc, LLMTimeout) else 'error')
+        upstream_guard.release(is_upstream_failure(exc), ticket)
+        raise
+    except BaseException:
+        # Client went away mid-stream or a losing hedge was cancelled: says
+        # nothing about upstream health, so neither close the breaker nor grow the cap.
+        call.record('cancelled')
+        upstream_guard.cancel(ticket)
+        raise
+    else:
+        call.record('ok', call.usage)
+        upstream_guard.release(False, ticket)
+
+
+def llm_error_result(exc: LLMError) -> dict:
+    '''call_groq-style error dict: 503 + retry_after when shedding load, else 502.'''
+    if isinstance(exc, LLMUnavailable):
+        return {
+            'error': str(exc),
+            'status': status.HTTP_503_SERVICE_UNAVAILABLE,
+            'retry_after': exc.retry_after,
+        }
+    return {'error': str(exc), 'status': status.HTTP_502_BAD_GATEWAY}
+
+
+def retry_after_headers(body) -> dict:
+    '''Retry-After header for a response body carrying retry_after, else none.'''
+    if isinstance(body, dict) and body.get('retry_after'):
+        return {'Retry-After': str(body['retry_after'])}
+    return {}
+
+
+class LLMClient:
+    '''Connection-pooled, keep-alive client for the chat-completions API.'''
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None,
+        pool_size: int = 10,
+        max_retries: int = 2,
+        backoff_factor: float = 0.5,
+        connect_timeout: float = 5,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.connect_timeout = connect_timeout
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        # Build the session lazily so forked workers never share sockets.
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self) -> requests.Session:
+        # Retry connection failures and throttling/gateway errors only; a read
+        # timeout means Groq is already working on the request, so never replay it.
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'POST'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.api_key}',
+            'Connection': 'keep-alive',
+        })
+        return session
+
+    def chat(
+        self,
+        messages: list[dict],
+        model: str,
+        temperature: float = 0.2,
+        timeout: float = 60,
+    ) -> dict:
+        '''Send a chat-completions request and return the decoded response body.'''
+        with upstream_slot(model, messages) as call:
+            try:
+                response = self.session.post(
+                    f'{self.base_url}/chat/completions',
+                    json={
+                        'model': model,
+                        'temperature': temperature,
+                        'messages': messages,
+                    },
+                    timeout=(self.connect_timeout, timeout),
+                )
+            except requests.Timeout as exc:
+                raise LLMTimeout(f'Groq request timed out: {exc}') from exc
+            except requests.RequestException as exc:
+                raise LLMError(f'Groq request failed: {exc}') from exc
+
+            if response.status_code >= 400:
+                raise LLMError('Groq API error.', status_code=response.status_code)
+
+            try:
+                data = response.json()
+            except ValueError as exc:
+                raise LLMError(f'Groq returned an invalid response: {exc}') from exc
+            call.usage = data.get('usage')
+            return data
+
+    def stream_chat(
+        self,
+        messages: list[dict],
+        model: str,
+        temperature: float = 0.2,
+        timeout: float = 60,
+    ) -> Iterator[str]:
+        '''Request a streamed completion and yield content deltas as they arrive.'''
+        with upstream_slot(model, messages) as call:
+            try:
+                response = self.session.post(
+                    f'{self.base_url}/chat/completions',
+                    json={
+                        'model': model,
+                        'temperature': temperature,
+                        'messages': messages,
+                        'stream': True,
+                    },
+                    timeout=(self.connect_timeout, timeout),
+                    stream=True,
+                )
+            except requests.Timeout as exc:
+                raise LLMTimeout(f'Groq request timed out: {exc}') from exc
+            except requests.RequestException as exc:
+                raise LLMError(f'Groq request failed: {exc}') from exc
+
+            with response:
+                if response.status_code >= 400:
+                    raise LLMError('Groq API error.', status_code=response.status_code)
+                try:
+                    for line in response.iter_lines(decode_unicode=True):
+                        # Server-sent events: "data: {...}" lines, terminated by [DONE].
+                        if not line or not line.startswith('data:'):
+                            continue
+                        data = line[len('data:'):].strip()
+                        if data == '[DONE]':
+                            break
+                        try:
+                            chunk = json.loads(data)
+                        except json.JSONDecodeError:
+                            continue
+                        # Groq reports usage on the final chunk under x_groq.
+                        usage = chunk.get('usage') or (chunk.get('x_groq') or {}).get('usage')
+                        if usage:
+                            call.usage = usage
+                        delta = (
+                            chunk.get('choices', [{}])[0]
+                            .get('delta', {})
+                            .get('content')
+                        )
+                        if delta:
+                            yield delta
+                except requests.Timeout as exc:
+                    raise LLMTimeout(f'Groq stream timed out: {exc}') from exc
+                except requests.RequestException as exc:
+                    raise LLMError(f'Groq stream interrupted: {exc}') from exc
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class AsyncLLMClient:
+    '''httpx-based async counterpart of LLMClient for ASGI deployments.'''
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str | None,
+        pool_size: int = 100,
+        max_retries: int = 2,
+        backoff_factor: float = 0.5,
+        connect_timeout: float = 5,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.connect_timeout = connect_timeout
+        # One pooled client per event loop; httpx clients cannot cross loops.
+        self._clients = weakref.WeakKeyDictionary()
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                headers={
+                    'Content-Type': 'application/json',
+                    'Authorization': f'Bearer {self.api_key}',
+                },
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                ),
+            )
+            self._clients[loop] = client
+        return client
+
+    def _retry_delay(self, attempt: int, response: httpx.Response | None) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff_factor * (2 ** attempt)
+
+    async def chat(
+        self,
+        messages: list[dict],
+        model: str,
+        temperature: float = 0.2,
+        timeout: float = 60,
+    ) -> dict:
+        '''Send a chat-completions request and return the decoded response body.'''
+        with upstream_slot(model, messages) as call:
+            client = self._client()
+            attempt = 0
+            while True:
+                response = None
+                try:
+                    response = await client.post(
+                        f'{self.base_url}/chat/completions',
+                        json={
+                            'model': model,
+                            'temperature': temperature,
+                            'messages': messages,
+                        },
+                        timeout=httpx.Timeout(timeout, connect=self.connect_timeout),
+                    )
+                except (httpx.ConnectError, httpx.ConnectTimeout) as exc:
+                    # Same policy as the sync client: only retry before the request was sent.
+                    if attempt >= self.max_retries:
+                        raise LLMError(f'Groq request failed: {exc}') from exc
+                except httpx.TimeoutException as exc:
+                    raise LLMTimeout(f'Groq request timed out: {exc}') from exc
+                except httpx.HTTPError as exc:
+                    raise LLMError(f'Groq request failed: {exc}') from exc
+                else:
+                    if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                        pass
+                    elif response.status_code >= 400:
+                        raise LLMError('Groq API error.', status_code=response.status_code)
+                    else:
+                        try:
+                            data = response.json()
+                        except ValueError as exc:
+                            raise LLMError(f'Groq returned an invalid response: {exc}') from exc
+                        call.usage = data.get('usage')
+                        return data
+
+                await asyncio.sleep(self._retry_delay(attempt, response))
+                attempt += 1
+
+
+def extract_content(data: dict) -> str:
+    '''Return the first message content from a chat-completions response.'''
+    return (
+        data.get('choices', [{}])[0]
+        .get('message', {})
+        .get('content', '')
+    )
+
+
+llm_client = LLMClient(
+    base_url=settings.GROQ_BASE_URL,
+    api_key=GROQ_API_KEY,
+    pool_size=settings.LLM_POOL_SIZE,
+    max_retries=settings.LLM_MAX_RETRIES,
+    backoff_factor=settings.LLM_RETRY_BACKOFF,
+    connect_timeout=settings.LLM_CONNECT_TIMEOUT,
+)
+
+async_llm_client = AsyncLLMClient(
+    base_url=settings.GROQ_BASE_URL,
+    api_key=GROQ_API_KEY,
+    pool_size=settings.LLM_ASYNC_POOL_SIZE,
+    max_retries=settings.LLM_MAX_RETRIES,
+    backoff_factor=settings.LLM_RETRY_BACKOFF,
+    connect_timeout=settings.LLM_CONNECT_TIMEOUT,
+)
+
+
+# Runs primary and hedged attempts so the caller can take whichever finishes
+# first; sized for every admitted call plus its hedge.
+_attempt_executor = ThreadPoolExecutor(
+    max_workers=settings.LLM_CONCURRENCY_MAX * 2,
+    thread_name_prefix='llm-attempt',
+)
+
+# Hedges in flight across the process, including losers left to finish.
+_hedge_slots = threading.BoundedSemaphore(max(1, settings.LLM_HEDGE_MAX_IN_FLIGHT))
+
+
+# Set on responses answered by a fallback rather than the requested model.
+FALLBACK_MODEL = 'fallback_model'
+
+
+def model_chain(model: str) -> list[str]:
+    '''The requested model followed by the configured fallbacks.'''
+    return [model] + [fallback for fallback in settings.GROQ_FALLBACK_MODELS if fallback != model]
+
+
+class _Attempts:
+    '''Bookkeeping shared by chat_with_fallback and achat_with_fallback.'''
+
+    def __init__(self, model: str, timeout: float, validate: Callable[[str], bool] | None):
+        self.chain = model_chain(model)
+        self.validate = validate
+        self.deadline = time.monotonic() + timeout
+        self.hedging = settings.LLM_HEDGE_ENABLED
+        self.hedge_at = math.inf
+        self.next_index = 0
+        self.error = None
+        self.unusable = None
+        self.give_up = False
+
+    def next_model(self, hedge: bool) -> str | None:
+        '''Model for the next attempt, or None; a hedge holds one of _hedge_slots.'''
+        if hedge:
+            # At most one hedge per request.
+            self.hedging = False
+            self.hedge_at = math.inf
+        if self.give_up or self.remaining() <= 0:
+            return None
+        if hedge and not _hedge_slots.acquire(blocking=False):
+            # Enough hedges in flight already; let the primary run on.
+            record_hedge('skipped')
+            return None
+        if self.next_index < len(self.chain):
+            model = self.chain[self.next_index]
+            self.next_index += 1
+        elif hedge:
+            # No fallback left to hedge with; race a second call to the same model.
+            model = self.chain[-1]
+        else:
+            return None
+        if hedge:
+            record_hedge('fired')
+        elif self.next_index > 1:
+            record_fallback(model)
+        if self.hedging:
+            self.hedge_at = time.monotonic() + hedge_delay(model)
+        return model
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def wait_time(self) -> float:
+        return max(0, min(self.deadline, self.hedge_at) - time.monotonic())
+
+    def settle(self, data: dict | None, exc: BaseException | None, hedge: bool, model: str) -> dict | None:
+        '''Record one finished attempt by `model`; returns its response if it is usable.'''
+        if exc is not None:
+            if not isinstance(exc, LLMError):
+                raise exc
+            self.error = exc
+            # The guard is shared by every model, so a rejection applies to all of them.
+            self.give_up = self.give_up or isinstance(exc, LLMUnavailable)
+            return None
+        if self.validate is None or self.validate(extract_content(data)):
+            if hedge:
+                record_hedge('won')
+            if model != self.chain[0]:
+                data[FALLBACK_MODEL] = model
+            return data
+        self.unusable = data
+        return None
+
+    def outcome(self) -> dict:
+        '''Result once every attempt has finished without a usable answer.'''
+        if self.unusable is not None:
+            # Let the caller report the invalid output as it always has.
+            return self.unusable
+        if self.error is not None:
+            raise self.error
+        raise LLMTimeout('Groq did not answer within the deadline.')
+
+
+def _timed_chat(messages: list[dict], model: str, temperature: float, timeout: float) -> dict:
+    started = time.monotonic()
+    data = llm_client.chat(messages, model=model, temperature=temperature, timeout=timeout)
+    latency_tracker.record(model, time.monotonic() - started)
+    return data
+
+
+async def _atimed_chat(messages: list[dict], model: str, temperature: float, timeout: float) -> dict:
+    started = time.monotonic()
+    data = await async_llm_client.chat(messages, model=model, temperature=temperature, timeout=timeout)
+    latency_tracker.record(model, time.monotonic() - started)
+    return data
+
+
+def _chat_in_turn(attempts: _Attempts, messages: list[dict], temperature: float) -> dict:
+    # Without hedging, try each model in turn on the calling thread, so no
+    # attempt outlives the call.
+    while True:
+        next_model = attempts.next_model(hedge=False)
+        if next_model is None:
+            return attempts.outcome()
+        try:
+            data = _timed_chat(messages, next_model, temperature, attempts.remaining())
+        except LLMError as exc:
+            data = attempts.settle(None, exc, False, next_model)
+        else:
+            data = attempts.settle(data, None, False, next_model)
+        if data is not None:
+            return data
+
+
+async def _achat_in_turn(attempts: _Attempts, messages: list[dict], temperature: float) -> dict:
+    while True:
+        next_model = attempts.next_model(hedge=False)
+        if next_model is None:
+            return attempts.outcome()
+        try:
+            data = await _atimed_chat(messages, next_model, temperature, attempts.remaining())
+        except LLMError as exc:
+            data = attempts.settle(None, exc, False, next_model)
+        else:
+            data = attempts.settle(data, None, False, next_model)
+        if data is not None:
+            return data
+
+
+def chat_with_fallback(
+    messages: list[dict],
+    model: str,
+    temperature: float = 0.2,
+    timeout: float = 60,
+    validate: Callable[[str], bool] | None = None,
+) -> dict:
+    '''Chat within a `timeout` deadline, hedging slow calls and falling back on failure.
+
+    A failed attempt, or one whose content `validate` rejects, moves on to
+    the next model in GROQ_FALLBACK_MODELS with whatever time is left. With
+    LLM_HEDGE_ENABLED, an attempt still running after the model's observed
+    tail latency gets one hedged request (while fewer than
+    LLM_HEDGE_MAX_IN_FLIGHT are running) and the first usable answer wins.
+    An answer from a fallback model names it under FALLBACK_MODEL.
+    '''
+    attempts = _Attempts(model, timeout, validate)
+    if not attempts.hedging:
+        return _chat_in_turn(attempts, messages, temperature)
+
+    pending = {}
+
+    def launch(hedge: bool) -> None:
+        next_model = attempts.next_model(hedge)
+        if next_model is not None:
+            # Run in a copy of this context so metrics keep the endpoint label.
+            context = contextvars.copy_context()
+            future = _attempt_executor.submit(
+                context.run, _timed_chat, messages, next_model, temperature, attempts.remaining()
+            )
+            if hedge:
+                future.add_done_callback(lambda _future: _hedge_slots.release())
+            pending[future] = (hedge, next_model)
+
+    launch(hedge=False)
+    while pending:
+        done, _running = wait(pending, timeout=attempts.wait_time(), return_when=FIRST_COMPLETED)
+        if not done:
+            if attempts.remaining() <= 0:
+                # Abandoned attempts finish on their own within their read timeout.
+                break
+            launch(hedge=True)
+            continue
+        for future in done:
+            hedge, attempt_model = pending.pop(future)
+            exc = future.exception()
+            data = attempts.settle(None if exc else future.result(), exc, hedge, attempt_model)
+            if data is not None:
+                return data
+        if not pending:
+            launch(hedge=False)
+    return attempts.outcome()
+
+
+async def achat_with_fallback(
+    messages: list[dict],
+    model: str,
+    temperature: float = 0.2,
+    timeout: float = 60,
+    validate: Callable[[str], bool] | None = None,
+) -> dict:
+    '''Async chat_with_fallback; losing attempts are cancelled rather than abandoned.'''
+    attempts = _Attempts(model, timeout, validate)
+    if not attempts.hedging:
+        return await _achat_in_turn(attempts, messages, temperature)
+
+    pending = {}
+
+    def launch(hedge: bool) -> None:
+        next_model = attempts.next_model(hedge)
+        if next_model is not None:
+            task = asyncio.ensure_future(
+                _atimed_chat(messages, next_model, temperature, attempts.remaining())
+            )
+            if hedge:
+                task.add_done_callback(lambda _task: _hedge_slots.release())
+            pending[task] = (hedge, next_model)
+
+    try:
+        launch(hedge=False)
+        while pending:
+            done, _running = await asyncio.wait(
+                pending, timeout=attempts.wait_time(), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                if attempts.remaining() <= 0:
+                    break
+                launch(hedge=True)
+                continue
+            for task in done:
+                hedge, attempt_model = pending.pop(task)
+                exc = task.exception()
+                data = attempts.settle(None if exc else task.result(), exc, hedge, attempt_model)
+                if data is not None:
+                    return data
+            if not pending:
+                launch(hedge=False)
+        return attempts.outcome()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _cached_content(cache_key: str, use_cache: bool) -> str | None:
+    if llm_cache is None or not use_cache:
+        return None
+    return llm_cache.get(cache_key)
+
+
+def _store_content(
+    cache_key: str,
+    content: str,
+    validate: Callable[[str], bool] | None = None,
+    fallback: bool = False,
+) -> None:
+    # Output the caller would reject is never cached, or it would be replayed until
+    # the TTL; neither is a fallback's answer, which the key would pass off as the
+    # requested model's.
+    if llm_cache is None or not content or fallback:
+        return
+    if validate is None or validate(content):
+        llm_cache.set(cache_key, content)
+
+
+def call_groq(
+    system_prompt: str,
+    user_content: str,
+    model: str,
+    timeout: float = 60,
+    temperature: float = 0.2,
+    use_cache: bool = True,
+    validate: Callable[[str], bool] | None = None,
+) -> dict:
+    # use_cache=False skips the lookup ("regenerate") but still refreshes the entry.
+    cache_key = make_cache_key(model, system_prompt, user_content, temperature)
+    cached = _cached_content(cache_key, use_cache)
+    if cached is not None:
+        return {'content': cached, 'cached': True}
+
+    def fetch() -> str:
+        handle = llm_key_lock.acquire(cache_key) if llm_key_lock is not None else None
+        try:
+            # Another process may have finished the same request while we waited.
+            if handle is not None:
+                cached = _cached_content(cache_key, use_cache)
+                if cached is not None:
+                    return cached
+            data = chat_with_fallback(
+                [
+                    {'role': 'system', 'content': system_prompt},
+                    {'role': 'user', 'content': user_content},
+                ],
+                model=model,
+                temperature=temperature,
+                timeout=timeout,
+                validate=validate,
+            )
+            content = extract_content(data)
+            _store_content(cache_key, content, validate, fallback=FALLBACK_MODEL in data)
+            return content
+        finally:
+            if llm_key_lock is not None:
+                llm_key_lock.release(cache_key, handle)
+
+    try:
+        if settings.LLM_SINGLEFLIGHT_ENABLED:
+            content = llm_flights.do(cache_key, fetch)
+        else:
+            content = fetch()
+    except LLMError as exc:
+        return llm_error_result(exc)
+    return {'content': content}
+
+
+async def acall_groq(
+    system_prompt: str,
+    user_content: str,
+    model: str,
+    timeout: float = 60,
+    temperature: float = 0.2,
+    use_cache: bool = True,
+    validate: Callable[[str], bool] | None = None,
+) -> dict:
+    '''Async counterpart of call_groq sharing the same response cache.'''
+    cache_key = make_cache_key(model, system_prompt, user_content, temperature)
+    cached = _cached_content(cache_key, use_cache)
+    if cached is not None:
+        return {'content': cached, 'cached': True}
+
+    async def fetch() -> str:
+        handle = None
+        if llm_key_lock is not None:
+            # flock() blocks; wait for it off the event loop.
+            handle = await sync_to_async(llm_key_lock.acquire, thread_sensitive=False)(cache_key)
+        try:
+            if handle is not None:
+                cached = _cached_content(cache_key, use_cache)
+                if cached is not None:
+                    return cached
+            data = await achat_with_fallback(
+                [
+                    {'role': 'system', 'content': system_prompt},
+                    {'role': 'user', 'content': user_content},
+                ],
+                model=model,
+                temperature=temperature,
+                timeout=timeout,
+                validate=validate,
+            )
+            content = extract_content(data)
+            _store_content(cache_key, content, validate, fallback=FALLBACK_MODEL in data)
+            return content
+        finally:
+            if llm_key_lock is not None:
+                llm_key_lock.release(cache_key, handle)
+
+    try:
+        if settings.LLM_SINGLEFLIGHT_ENABLED:
+            content = await async_llm_flights.do(cache_key, fetch)
+        else:
+            content = await fetch()
+    except LLMError as exc:
+        return llm_error_result(exc)
+    return {'content': content}
+
+
+def stream_groq(
+    system_prompt: str,
+    user_content: str,
+    model: str,
+    timeout: float = 60,
+    temperature: float = 0.2,
+    use_cache: bool = True,
+    validate: Callable[[str], bool] | None = None,
+) -> Iterator[str]:
+    '''Streaming counterpart of call_groq; raises LLMError on upstream failure.
+
+    Deltas cannot be taken back, so `validate` only decides whether the
+    completed output is cached.
+    '''
+    cache_key = make_cache_key(model, system_prompt, user_content, temperature)
+    cached = _cached_content(cache_key, use_cache)
+    if cached is not None:
+        yield cached
+        return
+
+    # Streams are not hedged, but a model that fails before sending anything
+    # falls back to the next one.
+    parts = []
+    chain = model_chain(model)
+    for index, attempt_model in enumerate(chain):
+        if index:
+            record_fallback(attempt_model)
+        try:
+            for delta in llm_client.stream_chat(
+                [
+                    {'role': 'system', 'content': system_prompt},
+                    {'role': 'user', 'content': user_content},
+                ],
+                model=attempt_model,
+                temperature=temperature,
+                timeout=timeout,
+            ):
+                parts.append(delta)
+                yield delta
+        except LLMError as exc:
+            if parts or isinstance(exc, LLMUnavailable) or index == len(chain) - 1:
+                raise
+            continue
+        break
+
+    _store_content(cache_key, ''.join(parts), validate, fallback=attempt_model != model)
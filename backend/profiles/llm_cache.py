@@ -0,0 +1,136 @@
+'''Content-addressed response cache for LLM calls.'''
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+def make_cache_key(model: str, system_prompt: str, user_content: str, temperature: float) -> str:
+    '''Hash the full request so any change to prompt, model or sampling misses.'''
+    raw = json.dumps(
+        [model, system_prompt, user_content, temperature],
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class BaseLLMCache:
+    '''Interface for LLM response caches; subclasses implement _get/_set.'''
+
+    def __init__(self, ttl: int = 3600, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self._set(key, value)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def _get(self, key: str) -> str | None:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+
+class LocMemLLMCache(BaseLLMCache):
+    '''Per-process LRU cache with TTL expiry.'''
+
+    def __init__(self, ttl: int = 3600, max_entries: int = 1000):
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DjangoLLMCache(BaseLLMCache):
+    '''Cache backed by a Django cache alias, shared across processes.'''
+
+    key_prefix = 'llm:'
+    # Bumped by clear() so LLM entries are dropped without flushing the shared alias.
+    namespace_key = 'llm-namespace'
+
+    def __init__(self, ttl: int = 3600, max_entries: int = 1000, alias: str = 'default'):
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        from django.core.cache import caches
+
+        # Eviction is delegated to the configured backend (e.g. MAX_ENTRIES).
+        self._cache = caches[alias]
+
+    def _namespace(self) -> int:
+        return self._cache.get(self.namespace_key) or 1
+
+    def _get(self, key: str) -> str | None:
+        return self._cache.get(f'{self.key_prefix}{key}', version=self._namespace())
+
+    def _set(self, key: str, value: str) -> None:
+        self._cache.set(f'{self.key_prefix}{key}', value, timeout=self.ttl, version=self._namespace())
+
+    def clear(self) -> None:
+        '''Orphan every LLM entry; they age out through the TTL.'''
+        try:
+            self._cache.incr(self.namespace_key)
+        except ValueError:
+            self._cache.set(self.namespace_key, 2, timeout=None)
+
+
+def build_llm_cache() -> BaseLLMCache | None:
+    '''Instantiate the configured cache backend, or None when disabled.'''
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    backend = import_string(settings.LLM_CACHE_BACKEND)
+    return backend(
+        ttl=settings.LLM_CACHE_TTL,
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    )
+
+
+llm_cache = build_llm_cache()
@@ -0,0 +1,290 @@
+'''Local OpenAI-compatible stand-in for the Groq API, for load and failure testing.'''
+
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+JOB_METADATA = {
+    'job_title': 'Senior Backend Engineer',
+    'company': 'Acme Corp',
+    'summary_line': 'Backend role building Python APIs at Acme Corp.',
+}
+
+# (system prompt substring, response body), checked in order.
+CANNED_RESPONSES = [
+    ('resume parser', {
+        'profile': {
+            'headline': 'Backend Engineer',
+            'summary': 'Engineer with six years of Python and Django experience.',
+            'location': 'Remote',
+            'phone': '',
+            'email': 'jane@example.com',
+        },
+        'skills': [
+            {'name': 'Python', 'proficiency': 'expert', 'order': 0},
+            {'name': 'Django', 'proficiency': 'advanced', 'order': 1},
+        ],
+        'experiences': [{
+            'company': 'Initech',
+            'title': 'Software Engineer',
+            'location': 'Remote',
+            'start_date': '2019-01-01',
+            'end_date': None,
+            'is_current': True,
+            'description': 'Built and scaled REST APIs.',
+            'order': 0,
+        }],
+        'educations': [],
+        'certifications': [],
+        'achievements': [],
+    }),
+    ('cover letter writer', {
+        'subject': 'Application for Senior Backend Engineer',
+        'greeting': 'Dear Hiring Manager,',
+        'body_paragraphs': [
+            'I am excited to apply for the Senior Backend Engineer role.',
+            'I have spent six years building Python services at scale.',
+        ],
+        'closing': 'Sincerely,',
+        'signature': 'Jane Doe',
+        **JOB_METADATA,
+    }),
+    ('resume writer', {
+        'headline': 'Senior Backend Engineer',
+        'summary': 'Backend engineer focused on reliable Python APIs.',
+        'skills': ['Python', 'Django', 'PostgreSQL'],
+        'experiences': [{
+            'company': 'Initech',
+            'title': 'Software Engineer',
+            'location': 'Remote',
+            'start_date': '2019-01',
+            'end_date': None,
+            'is_current': True,
+            'bullets': ['Cut p95 API latency by 40%.', 'Led the move to async workers.'],
+        }],
+        'education': [],
+        'certifications': [],
+        'achievements': [],
+        'fit_score': 82,
+        'strengths': ['Python depth'],
+        'weaknesses': ['Limited frontend work'],
+        **JOB_METADATA,
+    }),
+    ('job metadata', JOB_METADATA),
+]
+
+
+class LatencyModel:
+    '''Samples response latency in seconds from a named distribution.'''
+
+    def __init__(self, distribution: str, mean_ms: float, jitter_ms: float):
+        self.distribution = distribution
+        self.mean = mean_ms / 1000
+        self.jitter = jitter_ms / 1000
+
+    def sample(self) -> float:
+        if self.distribution == 'fixed':
+            return self.mean
+        if self.distribution == 'uniform':
+            return max(0.0, random.uniform(self.mean - self.jitter, self.mean + self.jitter))
+        if self.distribution == 'normal':
+            return max(0.0, random.gauss(self.mean, self.jitter))
+        # lognormal: `mean` is the median, `jitter` widens the tail.
+        sigma = self.jitter / self.mean if self.mean else 0
+        return self.mean * math.exp(random.gauss(0, sigma))
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, options, canned):
+        super().__init__(address, FakeGroqHandler)
+        self.options = options
+        self.canned = canned
+        self.latency = LatencyModel(
+            options['latency'], options['latency_ms'], options['jitter_ms']
+        )
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'hangs': 0, 'in_flight': 0, 'max_in_flight': 0}
+
+    def track(self, key: str, delta: int = 1) -> None:
+        with self.lock:
+            self.stats[key] += delta
+            if key == 'in_flight':
+                self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+
+    def pick_response(self, system_prompt: str) -> dict:
+        for needle, body in self.canned:
+            if needle in system_prompt:
+                return body
+        return self.canned[-1][1]
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.options['verbosity'] > 1:
+            super().log_message(format, *args)
+
+    def _send_json(self, http_status: int, body: dict, headers: dict | None = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(http_status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip('/').endswith('/stats'):
+            with self.server.lock:
+                self._send_json(200, dict(self.server.stats))
+            return
+        self._send_json(404, {'error': {'message': 'Not found.'}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'Not found.'}})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._send_json(400, {'error': {'message': 'Invalid JSON body.'}})
+            return
+
+        server = self.server
+        options = server.options
+        server.track('requests')
+        server.track('in_flight')
+        try:
+            self._respond(request, options)
+        finally:
+            server.track('in_flight', -1)
+
+    def _respond(self, request: dict, options: dict) -> None:
+        server = self.server
+        roll = random.random()
+        if roll < options['timeout_rate']:
+            # Accept the request and never answer, like a stuck upstream.
+            server.track('hangs')
+            time.sleep(options['hang_seconds'])
+            self.close_connection = True
+            return
+        latency = server.latency.sample()
+        if roll < options['timeout_rate'] + options['error_rate']:
+            server.track('errors')
+            time.sleep(latency)
+            self._send_json(
+                options['error_status'],
+                {'error': {'message': 'Injected upstream error.'}},
+                headers={'Retry-After': '1'} if options['error_status'] == 429 else None,
+            )
+            return
+
+        messages = request.get('messages') or [{}]
+        system_prompt = str(messages[0].get('content', ''))
+        content = json.dumps(server.pick_response(system_prompt))
+        prompt_chars = sum(len(str(message.get('content', ''))) for message in messages)
+        usage = {
+            'prompt_tokens': prompt_chars // 4,
+            'completion_tokens': len(content) // 4,
+            'total_tokens': (prompt_chars + len(content)) // 4,
+        }
+
+        if not request.get('stream'):
+            time.sleep(latency)
+            self._send_json(200, {
+                'id': 'chatcmpl-fake',
+                'object': 'chat.completion',
+                'model': request.get('model', ''),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop',
+                }],
+                'usage': usage,
+            })
+            return
+
+        # Time to first token is a fraction of the total; the rest is spread
+        # across chunks.
+        chunk_size = max(1, options['stream_chunk_chars'])
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+        first_token = latency * options['ttft_fraction']
+        per_chunk = (latency - first_token) / max(1, len(chunks))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        time.sleep(first_token)
+        for piece in chunks:
+            event = {'choices': [{'index': 0, 'delta': {'content': piece}}]}
+            self._write_chunk(f'data: {json.dumps(event)}\n\n'.encode())
+            time.sleep(per_chunk)
+        final = {'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}], 'x_groq': {'usage': usage}}
+        self._write_chunk(f'data: {json.dumps(final)}\n\n'.encode())
+        self._write_chunk(b'data: [DONE]\n\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+
+class Command(BaseCommand):
+    help = (
+        'Run a local OpenAI-compatible Groq stand-in with canned responses; point '
+        'GROQ_BASE_URL at it. GET /stats reports request counts and peak concurrency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--latency',
+            choices=['fixed', 'uniform', 'normal', 'lognormal'],
+            default='lognormal',
+        )
+        parser.add_argument('--latency-ms', type=float, default=1500, help='Mean (median for lognormal).')
+        parser.add_argument('--jitter-ms', type=float, default=500, help='Spread around the mean.')
+        parser.add_argument('--ttft-fraction', type=float, default=0.2, help='Share of latency before the first streamed token.')
+        parser.add_argument('--stream-chunk-chars', type=int, default=12)
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with --error-status.')
+        parser.add_argument('--error-status', type=int, default=503)
+        parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of requests that hang.')
+        parser.add_argument('--hang-seconds', type=float, default=120)
+        parser.add_argument(
+            '--canned',
+            help='JSON file of [[system prompt substring, response object], ...] checked before the built-ins.',
+        )
+
+    def handle(self, *args, **options):
+        canned = list(CANNED_RESPONSES)
+        if options['canned']:
+            try:
+                with open(options['canned'], encoding='utf-8') as handle:
+                    canned = [tuple(entry) for entry in json.load(handle)] + canned
+            except (OSError, ValueError, TypeError) as exc:
+                raise CommandError(f'Could not load canned responses: {exc}') from exc
+
+        server = FakeGroqServer((options['host'], options['port']), options, canned)
+        self.stdout.write(
+            f'Fake Groq listening on http://{options["host"]}:{options["port"]} '
+            f'({options["latency"]} {options["latency_ms"]:.0f}ms, '
+            f'errors {options["error_rate"]:.0%}, hangs {options["timeout_rate"]:.0%}).'
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping.')
+        finally:
+            server.server_close()
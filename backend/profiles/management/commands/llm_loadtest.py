@@ -0,0 +1,255 @@
+'''Drive the LLM-backed endpoints of a running server at a target request rate.'''
+
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from requests.adapters import HTTPAdapter
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+ENDPOINTS = {
+    'generate_resume': '/profiles/profile/generate_resume/',
+    'generate_cover_letter': '/profiles/profile/generate_cover_letter/',
+    'generate_bundle': '/profiles/profile/generate_bundle/',
+    'parse_resume': '/profiles/profile/parse_resume/',
+    'create_draft': '/drafts/drafts/',
+}
+
+SAMPLE_JOB_DESCRIPTION = (
+    'Acme Corp is hiring a Senior Backend Engineer to design and scale Python '
+    'APIs. You will own Django services, PostgreSQL schemas and background '
+    'workers, and partner with product on performance and reliability.'
+)
+
+
+# Server gauges sampled from /metrics/ while the test runs.
+SERVER_GAUGES = ('llm_in_flight', 'llm_concurrency_limit', 'llm_circuit_open')
+
+
+def parse_metrics(text: str, names=SERVER_GAUGES) -> dict[str, float]:
+    '''Unlabelled sample values for `names` from a Prometheus text exposition.'''
+    values = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        name, _sep, value = line.rpartition(' ')
+        if name in names:
+            values[name] = float(value)
+    return values
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test LLM endpoints at a target RPS and report latency percentiles and '
+        'server saturation. Tokens are minted locally, so run with the server\'s '
+        'DJANGO_SECRET_KEY and database; pair with fake_groq to avoid the real API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='generate_resume')
+        parser.add_argument('--email', required=True, help='Existing user the requests run as.')
+        parser.add_argument('--rps', type=float, default=5)
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to keep issuing requests.')
+        parser.add_argument('--max-in-flight', type=int, default=200, help='Client-side concurrency cap.')
+        parser.add_argument('--timeout', type=float, default=90)
+        parser.add_argument('--job-description-file', help='Defaults to a short built-in posting.')
+        parser.add_argument('--resume-file', help='PDF or DOCX upload for parse_resume.')
+        parser.add_argument(
+            '--unique',
+            action='store_true',
+            help='Make every payload distinct so response caching and coalescing cannot help.',
+        )
+        parser.add_argument('--groq-stats-url', help='e.g. http://127.0.0.1:8765/stats from fake_groq.')
+        parser.add_argument(
+            '--metrics-url',
+            help='Server metrics to scrape during the run; defaults to <base-url>/metrics/.',
+        )
+        parser.add_argument('--metrics-interval', type=float, default=1, help='Seconds between scrapes.')
+        parser.add_argument('--no-metrics', action='store_true', help='Skip scraping server metrics.')
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(email=options['email']).first()
+        if user is None:
+            raise CommandError(f'No user with email {options["email"]}.')
+        if options['endpoint'] == 'parse_resume' and not options['resume_file']:
+            raise CommandError('--resume-file is required for parse_resume.')
+
+        job_description = SAMPLE_JOB_DESCRIPTION
+        if options['job_description_file']:
+            with open(options['job_description_file'], encoding='utf-8') as handle:
+                job_description = handle.read()
+        resume_bytes = None
+        if options['resume_file']:
+            with open(options['resume_file'], 'rb') as handle:
+                resume_bytes = handle.read()
+
+        url = options['base_url'].rstrip('/') + ENDPOINTS[options['endpoint']]
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=options['max_in_flight'],
+            pool_maxsize=options['max_in_flight'],
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['Authorization'] = f'Bearer {AccessToken.for_user(user)}'
+
+        def send():
+            marker = f'\n\nRef: {uuid.uuid4()}' if options['unique'] else ''
+            if options['endpoint'] == 'parse_resume':
+                name = options['resume_file'].rsplit('/', 1)[-1]
+                content_type = (
+                    'application/pdf'
+                    if name.lower().endswith('.pdf')
+                    else 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+                )
+                body = resume_bytes + marker.encode() if marker else resume_bytes
+                return session.post(
+                    url,
+                    files={'resume_file': (name, body, content_type)},
+                    timeout=options['timeout'],
+                )
+            if options['endpoint'] == 'create_draft':
+                payload = {
+                    'draft_type': 'resume',
+                    'job_description': job_description + marker,
+                    'content': {},
+                }
+            else:
+                payload = {'job_description': job_description + marker}
+            return session.post(url, json=payload, timeout=options['timeout'])
+
+        results = []
+        lags = []
+        lock = threading.Lock()
+        in_flight = 0
+        peak_in_flight = 0
+
+        def run(scheduled_at: float):
+            nonlocal in_flight, peak_in_flight
+            started = time.monotonic()
+            with lock:
+                in_flight += 1
+                peak_in_flight = max(peak_in_flight, in_flight)
+                lags.append(started - scheduled_at)
+            try:
+                response = send()
+                outcome = str(response.status_code)
+            except requests.Timeout:
+                outcome = 'timeout'
+            except requests.RequestException:
+                outcome = 'connection_error'
+            elapsed = time.monotonic() - started
+            with lock:
+                in_flight -= 1
+                results.append((outcome, elapsed))
+
+        samples = []
+        scrape_errors = []
+        stop_scraping = threading.Event()
+
+        def scrape():
+            metrics_url = options['metrics_url'] or options['base_url'].rstrip('/') + '/metrics/'
+            headers = {'Authorization': f'Bearer {settings.METRICS_TOKEN}'} if settings.METRICS_TOKEN else {}
+            # A separate session, so scrapes never queue behind load-test requests.
+            with requests.Session() as scraper:
+                while not stop_scraping.is_set():
+                    try:
+                        response = scraper.get(metrics_url, headers=headers, timeout=5)
+                        response.raise_for_status()
+                    except requests.RequestException as exc:
+                        scrape_errors.append(str(exc))
+                    else:
+                        samples.append(parse_metrics(response.text))
+                    stop_scraping.wait(options['metrics_interval'])
+
+        scraper = None
+        if not options['no_metrics']:
+            scraper = threading.Thread(target=scrape, name='metrics-scraper', daemon=True)
+            scraper.start()
+
+        interval = 1 / options['rps']
+        total = int(options['rps'] * options['duration'])
+        self.stdout.write(f'Sending {total} requests to {url} at {options["rps"]} rps.')
+        started = time.monotonic()
+        # Open loop: requests go out on schedule however long earlier ones take,
+        # so saturation shows up as latency and errors rather than a lower rate.
+        with ThreadPoolExecutor(max_workers=options['max_in_flight']) as executor:
+            for index in range(total):
+                scheduled_at = started + index * interval
+                delay = scheduled_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(run, scheduled_at)
+        wall = time.monotonic() - started
+        if scraper is not None:
+            stop_scraping.set()
+            scraper.join()
+
+        self._report(results, lags, peak_in_flight, wall, options)
+        if scraper is not None:
+            self._report_server(samples, scrape_errors)
+
+    def _report(self, results, lags, peak_in_flight, wall, options):
+        outcomes = Counter(outcome for outcome, _elapsed in results)
+        ok = sorted(elapsed for outcome, elapsed in results if outcome.startswith('2'))
+        every = sorted(elapsed for _outcome, elapsed in results)
+        lags = sorted(lags)
+
+        self.stdout.write(f'Completed {len(results)} requests in {wall:.1f}s ({len(results) / wall:.2f} rps achieved).')
+        self.stdout.write('Status: ' + ', '.join(f'{key}={value}' for key, value in sorted(outcomes.items())))
+        for label, values in (('2xx', ok), ('all', every)):
+            if values:
+                self.stdout.write(
+                    f'Latency {label} (s): p50={percentile(values, 50):.3f} '
+                    f'p95={percentile(values, 95):.3f} p99={percentile(values, 99):.3f} '
+                    f'max={values[-1]:.3f}'
+                )
+        shed = outcomes.get('503', 0) + outcomes.get('429', 0)
+        self.stdout.write(
+            f'Client saturation: peak in-flight={peak_in_flight}/{options["max_in_flight"]}, '
+            f'start lag p95={percentile(lags, 95) * 1000:.0f}ms, '
+            f'shed (429/503)={shed / max(1, len(results)):.1%}'
+        )
+        if options['groq_stats_url']:
+            try:
+                stats = requests.get(options['groq_stats_url'], timeout=5).json()
+            except (requests.RequestException, ValueError) as exc:
+                self.stdout.write(f'Upstream stats unavailable: {exc}')
+            else:
+                self.stdout.write('Upstream: ' + json.dumps(stats))
+
+    def _report_server(self, samples, errors):
+        if not samples:
+            reason = errors[-1] if errors else 'no scrapes completed'
+            self.stdout.write(f'Server saturation unavailable: {reason}')
+            return
+        # Each scrape reaches one worker process, so these describe whichever answered.
+        in_flight = sorted(sample.get('llm_in_flight', 0) for sample in samples)
+        at_cap = sum(
+            1 for sample in samples
+            if sample.get('llm_concurrency_limit') and sample.get('llm_in_flight', 0) >= sample['llm_concurrency_limit']
+        )
+        limits = [sample['llm_concurrency_limit'] for sample in samples if 'llm_concurrency_limit' in sample]
+        open_scrapes = sum(1 for sample in samples if sample.get('llm_circuit_open'))
+        self.stdout.write(
+            f'Server saturation ({len(samples)} scrapes): '
+            f'in-flight p50={percentile(in_flight, 50):.0f} max={in_flight[-1]:.0f}, '
+            f'concurrency limit min={min(limits, default=0):.0f} max={max(limits, default=0):.0f}, '
+            f'at limit={at_cap / len(samples):.0%}, breaker open={open_scrapes / len(samples):.0%}'
+        )
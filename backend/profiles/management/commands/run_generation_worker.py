@@ -0,0 +1,68 @@
+'''Process queued generation jobs with a local thread pool.'''
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from profiles.jobs import MAX_ATTEMPTS, claim_next_job, requeue_stale_jobs, run_job
+from profiles.models import GenerationJob
+
+
+class Command(BaseCommand):
+    help = 'Run the background worker that executes queued resume/cover letter jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=300,
+            help='Seconds before a running job is considered orphaned.',
+        )
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling forever; '
+            'jobs requeued for a later retry are left for the next run.',
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        poll_interval = options['poll_interval']
+        self.stdout.write(f'Generation worker started (concurrency={concurrency}).')
+
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                while True:
+                    requeue_stale_jobs(options['stale_after'], options['max_attempts'])
+
+                    # Fill free slots; each claim is atomic across worker processes.
+                    while len(in_flight) < concurrency:
+                        job = claim_next_job()
+                        if job is None:
+                            break
+                        in_flight.add(executor.submit(run_job, job, options['max_attempts']))
+
+                    if not in_flight:
+                        if options['once']:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+
+                    done, in_flight = wait(
+                        in_flight, timeout=poll_interval, return_when=FIRST_COMPLETED
+                    )
+                    backoff = False
+                    for future in done:
+                        job = future.result()
+                        self.stdout.write(f'Job {job.pk} finished: {job.status}')
+                        backoff = backoff or job.status == GenerationJob.Status.PENDING
+                    if backoff:
+                        # The LLM upstream is unavailable; don't spin on requeued jobs.
+                        time.sleep(poll_interval)
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping; waiting for in-flight jobs to finish.')
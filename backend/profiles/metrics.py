@@ -0,0 +1,267 @@
+'''In-process LLM metrics exported in the Prometheus text format.'''
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotFound
+
+
+current_endpoint = ContextVar('llm_endpoint', default='unknown')
+
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+@contextmanager
+def endpoint(name: str):
+    '''Label LLM calls made inside the block (request, job, thread).'''
+    token = current_endpoint.set(name)
+    try:
+        yield
+    finally:
+        current_endpoint.reset(token)
+
+
+def labelled(iterator: Iterator, name: str) -> Iterator:
+    '''Run each step of `iterator` under the endpoint label `name`.
+
+    For response bodies streamed after the view (and its label) has returned.
+    '''
+    try:
+        while True:
+            with endpoint(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        with endpoint(name):
+            iterator.close()
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key: tuple, value) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_value(self, key, value):
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {value}']
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def _render_value(self, key, value):
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.buckets, '+Inf'), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f'{self.name}_sum{labels} {total}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+llm_request_seconds = Histogram(
+    'llm_request_duration_seconds',
+    'Wall-clock time of Groq chat-completions calls.',
+    ('endpoint', 'model', 'outcome'),
+)
+llm_prompt_size_tokens = Histogram(
+    'llm_prompt_size_tokens',
+    'Estimated tokens in each prompt sent to Groq.',
+    ('endpoint', 'model'),
+    buckets=TOKEN_BUCKETS,
+)
+llm_prompt_tokens = Counter(
+    'llm_prompt_tokens_total',
+    'Prompt tokens billed by Groq (response usage).',
+    ('endpoint', 'model'),
+)
+llm_completion_tokens = Counter(
+    'llm_completion_tokens_total',
+    'Completion tokens billed by Groq (response usage).',
+    ('endpoint', 'model'),
+)
+llm_timeouts = Counter(
+    'llm_timeouts_total',
+    'Groq calls that hit the client timeout.',
+    ('endpoint', 'model'),
+)
+llm_rejected = Counter(
+    'llm_rejected_total',
+    'Calls shed by the circuit breaker or concurrency limiter.',
+    ('endpoint',),
+)
+llm_json_failures = Counter(
+    'llm_json_parse_failures_total',
+    'Model outputs that were not valid JSON.',
+    ('endpoint',),
+)
+
+llm_hedges = Counter(
+    'llm_hedges_total',
+    'Hedged requests sent after a slow call (fired), refused at the process cap (skipped) and those that answered first (won).',
+    ('endpoint', 'outcome'),
+)
+llm_fallbacks = Counter(
+    'llm_fallbacks_total',
+    'Calls retried on a fallback model after the previous model failed.',
+    ('endpoint', 'model'),
+)
+
+REGISTRY = (
+    llm_request_seconds,
+    llm_prompt_size_tokens,
+    llm_prompt_tokens,
+    llm_completion_tokens,
+    llm_timeouts,
+    llm_rejected,
+    llm_json_failures,
+    llm_hedges,
+    llm_fallbacks,
+)
+
+
+class CallTimer:
+    '''Records one LLM call; use record() once the outcome is known.'''
+
+    def __init__(self, model: str, messages: list[dict]):
+        self.model = model
+        self.endpoint = current_endpoint.get()
+        self.started = time.monotonic()
+        prompt_chars = sum(len(str(message.get('content', ''))) for message in messages)
+        # Rough 4 characters per token, matching prompts.estimate_tokens.
+        llm_prompt_size_tokens.observe(prompt_chars / 4, endpoint=self.endpoint, model=model)
+
+    def record(self, outcome: str, usage: dict | None = None) -> None:
+        labels = {'endpoint': self.endpoint, 'model': self.model}
+        llm_request_seconds.observe(time.monotonic() - self.started, outcome=outcome, **labels)
+        if outcome == 'timeout':
+            llm_timeouts.inc(**labels)
+        if usage:
+            llm_prompt_tokens.inc(usage.get('prompt_tokens') or 0, **labels)
+            llm_completion_tokens.inc(usage.get('completion_tokens') or 0, **labels)
+
+
+def record_rejected() -> None:
+    llm_rejected.inc(endpoint=current_endpoint.get())
+
+
+def record_json_failure() -> None:
+    llm_json_failures.inc(endpoint=current_endpoint.get())
+
+
+def record_hedge(outcome: str) -> None:
+    llm_hedges.inc(endpoint=current_endpoint.get(), outcome=outcome)
+
+
+def record_fallback(model: str) -> None:
+    llm_fallbacks.inc(endpoint=current_endpoint.get(), model=model)
+
+
+def _sample(kind: str, name: str, documentation: str, value: float, labels: str = '') -> list[str]:
+    return [f'# HELP {name} {documentation}', f'# TYPE {name} {kind}', f'{name}{labels} {value}']
+
+
+def _gauge(name: str, documentation: str, value: float, labels: str = '') -> list[str]:
+    return _sample('gauge', name, documentation, value, labels)
+
+
+def _counter(name: str, documentation: str, value: float, labels: str = '') -> list[str]:
+    # For totals kept outside the registry (e.g. by the cache itself).
+    return _sample('counter', name, documentation, value, labels)
+
+
+def render_metrics() -> str:
+    # Imported lazily: both modules import this one for instrumentation.
+    from .llm_cache import llm_cache
+    from .resilience import upstream_guard
+
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    guard = upstream_guard.stats()
+    lines += _gauge('llm_circuit_open', 'Whether the Groq circuit breaker is rejecting calls.', int(guard['state'] != 'closed'))
+    lines += _gauge('llm_concurrency_limit', 'Current adaptive cap on in-flight Groq calls.', guard['limit'])
+    lines += _gauge('llm_in_flight', 'Groq calls currently in flight in this process.', guard['in_flight'])
+    if llm_cache is not None:
+        cache = llm_cache.stats()
+        lines += _counter('llm_cache_hits_total', 'LLM response cache hits since start.', cache['hits'])
+        lines += _counter('llm_cache_misses_total', 'LLM response cache misses since start.', cache['misses'])
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    '''Prometheus scrape endpoint; requires METRICS_TOKEN when one is set.'''
+    token = settings.METRICS_TOKEN
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponseNotFound()
+    elif not settings.DEBUG:
+        return HttpResponseNotFound()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4')
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_generationjob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='generationjob',
+            name='kind',
+            field=models.CharField(choices=[('resume', 'Resume'), ('cover_letter', 'Cover letter'), ('bundle', 'Resume + cover letter')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 10:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0005_alter_generationjob_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0006_userprofile_content_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='generationjob',
+            name='kind',
+            field=models.CharField(choices=[('resume', 'Resume'), ('cover_letter', 'Cover letter'), ('bundle', 'Resume + cover letter'), ('resume_import', 'Resume import')], max_length=30),
+        ),
+    ]
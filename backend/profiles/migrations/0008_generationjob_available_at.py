@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0007_generationjob_resume_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='generationjob',
+            name='available_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,18 +1,45 @@
 '''Profile data models for user resumes and onboarding details.'''
 
+import uuid
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Exists, OuterRef
 
 
 # Max upload size for resumes (in bytes).
 MAX_RESUME_SIZE = 5 * 1024 * 1024
 
+# Completeness weights: filled-in profile fields, then non-empty sections.
+# Certifications and achievements share one allowance.
+COMPLETENESS_FIELD_POINTS = (
+    ('headline', 10),
+    ('summary', 10),
+    ('location', 10),
+    ('resume_file', 15),
+)
+COMPLETENESS_SECTION_POINTS = (
+    (('skills',), 15),
+    (('experiences',), 20),
+    (('educations',), 10),
+    (('certifications', 'achievements'), 10),
+)
+
+# Related collections serialized with a full profile.
+PROFILE_SECTIONS = ('skills', 'experiences', 'educations', 'certifications', 'achievements')
+
 def validate_resume_size(value):
     # Enforce a hard size limit on uploaded resume files.
     if value and value.size > MAX_RESUME_SIZE:
         raise ValidationError('Resume file size must be 5MB or less.')
 
+class UserProfileQuerySet(models.QuerySet):
+    def with_sections(self):
+        '''Prefetch every section: one query each, however many rows they hold.'''
+        return self.prefetch_related(*PROFILE_SECTIONS)
+
+
 class UserProfile(models.Model):
     '''Primary profile record for each user.'''
     user = models.OneToOneField(
@@ -38,32 +65,43 @@ class UserProfile(models.Model):
         null=True,
         validators=[validate_resume_size],
     )
+    # Bumped on any write to the profile or its sections; keys cached prompt payloads.
+    content_version = models.PositiveIntegerField(default=0, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
-    def update_profile_completeness(self) -> int:
-        '''Recompute and persist a simple weighted completeness score.'''
-        score = 0
-        if self.headline:
-            score += 10
-        if self.summary:
-            score += 10
-        if self.location:
-            score += 10
-        if self.resume_file:
-            score += 15
-        if self.skills.exists():
-            score += 15
-        if self.experiences.exists():
-            score += 20
-        if self.educations.exists():
-            score += 10
-        if self.certifications.exists() or self.achievements.exists():
-            score += 10
-
-        self.profile_completeness = min(score, 100)
-        self.save(update_fields=['profile_completeness'])
-        return self.profile_completeness
+    objects = UserProfileQuerySet.as_manager()
+
+    def field_points(self) -> int:
+        '''Completeness points earned by the profile's own fields.'''
+        return sum(points for field, points in COMPLETENESS_FIELD_POINTS if getattr(self, field))
+
+    def completeness_score(self, known_sections: dict | None = None) -> int:
+        '''Weighted completeness score from fields and non-empty sections.
+
+        `known_sections` maps section names (e.g. 'skills') to whether the
+        caller just left them non-empty. Other sections are checked with one
+        query of EXISTS subqueries.
+        '''
+        present = dict(known_sections or {})
+        unknown = {
+            # Aliased: annotations may not reuse the reverse relation names.
+            f'has_{name}': Exists(
+                self._meta.get_field(name).related_model.objects.filter(profile=OuterRef('pk'))
+            )
+            for names, _points in COMPLETENESS_SECTION_POINTS
+            for name in names
+            if name not in present
+        }
+        if unknown:
+            row = UserProfile.objects.filter(pk=self.pk).values(**unknown).get()
+            present.update({alias.removeprefix('has_'): value for alias, value in row.items()})
+        score = self.field_points() + sum(
+            points
+            for names, points in COMPLETENESS_SECTION_POINTS
+            if any(present[name] for name in names)
+        )
+        return min(score, 100)
 
     def __str__(self) -> str:
         email = getattr(self.user, 'email', None) or 'unknown'
@@ -202,3 +240,49 @@ class Achievement(models.Model):
         email = getattr(getattr(self.profile, 'user', None), 'email', None) or 'unknown'
         title = self.title or 'untitled'
         return f'{email} - {title}'
+
+
+class GenerationJob(models.Model):
+    '''Queued LLM generation processed by the background worker.'''
+    class Kind(models.TextChoices):
+        RESUME = 'resume', 'Resume'
+        COVER_LETTER = 'cover_letter', 'Cover letter'
+        BUNDLE = 'bundle', 'Resume + cover letter'
+        RESUME_IMPORT = 'resume_import', 'Resume import'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='generation_jobs',
+    )
+    kind = models.CharField(max_length=30, choices=Kind.choices)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    # Request inputs (job_description, template_style, regenerate, ...).
+    payload = models.JSONField(default=dict)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when a job is put back after a 503; workers skip it until then.
+    available_at = models.DateTimeField(blank=True, null=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [models.Index(fields=['status', 'created_at'])]
+
+    def __str__(self) -> str:
+        email = getattr(self.user, 'email', None) or 'unknown'
+        return f'{email} - {self.kind} ({self.status})'
@@ -0,0 +1,253 @@
+'''Writing onboarding payloads (profile fields plus sections) to a profile.'''
+
+import json
+import re
+
+from django.db import models, transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from .dirty import mark_content_changed, mark_sections_changed, profile_writes
+from .models import (
+    Achievement,
+    Certification,
+    Education,
+    Experience,
+    Skill,
+    UserProfile,
+)
+from .resume_parser import parse_resume_file, resume_digest
+from .serializers import (
+    AchievementSerializer,
+    CertificationSerializer,
+    EducationSerializer,
+    ExperienceSerializer,
+    SkillSerializer,
+    UserProfileSerializer,
+)
+
+
+# Payload key -> (model, serializer), in the order sections are written.
+SECTIONS = {
+    'skills': (Skill, SkillSerializer),
+    'experiences': (Experience, ExperienceSerializer),
+    'educations': (Education, EducationSerializer),
+    'certifications': (Certification, CertificationSerializer),
+    'achievements': (Achievement, AchievementSerializer),
+}
+
+# Profile fields a parsed resume may fill in.
+PARSED_PROFILE_FIELDS = ('headline', 'summary', 'location', 'phone')
+
+MONTHS = {
+    name: index
+    for index, name in enumerate(
+        ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'),
+        start=1,
+    )
+}
+MONTH_YEAR_RE = re.compile(r'([A-Za-z]{3,9})\.?\s+(\d{4})')
+
+
+def parse_payload(value):
+    # Accept JSON strings or Python structures from multipart requests.
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return None
+    return value
+
+
+def normalize_skill_proficiency(value):
+    if value is None:
+        return ''
+    normalized = str(value).strip().lower()
+    if not normalized:
+        return ''
+    alias_map = {
+        'basic': 'beginner',
+        'beginner': 'beginner',
+        'intermediate': 'intermediate',
+        'advanced': 'advanced',
+        'expert': 'expert',
+    }
+    if normalized in alias_map:
+        return alias_map[normalized]
+    return value
+
+
+def normalize_skills(payload):
+    if payload is None:
+        return None
+    if not isinstance(payload, list):
+        return payload
+    normalized_payload = []
+    for item in payload:
+        if not isinstance(item, dict):
+            normalized_payload.append(item)
+            continue
+        cleaned = dict(item)
+        cleaned['proficiency'] = normalize_skill_proficiency(item.get('proficiency'))
+        normalized_payload.append(cleaned)
+    return normalized_payload
+
+
+def normalize_date(value) -> str | None:
+    '''Coerce resume dates ("2021", "2021-03", "Mar 2021") to ISO; None if unknown.'''
+    if not value:
+        return None
+    value = str(value).strip()
+    if re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+        return value
+    if re.fullmatch(r'\d{4}-\d{2}', value):
+        return f'{value}-01'
+    if re.fullmatch(r'\d{4}', value):
+        return f'{value}-01-01'
+    match = MONTH_YEAR_RE.fullmatch(value)
+    if match:
+        month = MONTHS.get(match.group(1)[:3].lower())
+        if month:
+            return f'{match.group(2)}-{month:02d}-01'
+    return None
+
+
+def _clean_parsed_item(model, item: dict, index: int) -> dict:
+    # Coerce one LLM-parsed row into values the section serializer accepts.
+    cleaned = {}
+    for field in model._meta.concrete_fields:
+        if field.name not in item or field.name in ('id', 'profile'):
+            continue
+        value = item[field.name]
+        if isinstance(field, models.DateField):
+            value = normalize_date(value)
+        elif isinstance(field, models.URLField):
+            value = value if str(value or '').startswith(('http://', 'https://')) else ''
+        elif isinstance(field, models.CharField) and value is not None:
+            value = str(value).strip()[:field.max_length]
+        cleaned[field.name] = value
+    if model is Skill:
+        proficiency = normalize_skill_proficiency(cleaned.get('proficiency'))
+        cleaned['proficiency'] = proficiency if proficiency in Skill.Proficiency.values else ''
+    if model is Experience and cleaned.get('is_current'):
+        cleaned['end_date'] = None
+    if cleaned.get('order') is None:
+        cleaned['order'] = index
+    return cleaned
+
+
+def parsed_resume_payload(parsed: dict) -> dict:
+    '''Turn parse_resume output into an onboarding payload.
+
+    Only non-empty profile fields and sections are included, so anything the
+    resume does not mention is left as it is on the profile.
+    '''
+    profile = parsed.get('profile') if isinstance(parsed.get('profile'), dict) else {}
+    payload = {
+        'profile': {
+            field: str(profile[field]).strip()[:UserProfile._meta.get_field(field).max_length or None]
+            for field in PARSED_PROFILE_FIELDS
+            if str(profile.get(field) or '').strip()
+        },
+    }
+    for key, (model, _serializer_class) in SECTIONS.items():
+        items = [item for item in parsed.get(key) or [] if isinstance(item, dict)]
+        payload[key] = (
+            [_clean_parsed_item(model, item, index) for index, item in enumerate(items)]
+            if items
+            else None
+        )
+    return payload
+
+
+def replace_section(profile: UserProfile, model, items: list[dict]) -> list:
+    '''Replace a section's rows with validated items: one DELETE, one INSERT.
+
+    Call inside profile_writes() and a transaction. bulk_create sends no
+    post_save, so the content change is marked here instead.
+    '''
+    model.objects.filter(profile=profile).delete()
+    created = model.objects.bulk_create([model(profile=profile, **item) for item in items])
+    mark_content_changed(profile.pk)
+    return created
+
+
+def apply_onboarding(profile: UserProfile, payload: dict) -> dict[str, int]:
+    '''Write a profile payload and replace the given sections in one transaction.
+
+    Sections that are missing or None in the payload are left untouched.
+    Everything is validated before the first write; a ValidationError leaves
+    the profile as it was. The version bump and completeness recompute run
+    once, after commit. Returns the item count of each replaced section.
+    '''
+    # Only update sections present in the request to avoid accidental data loss.
+    profile_serializer = None
+    if payload.get('profile') is not None:
+        profile_serializer = UserProfileSerializer(profile, data=payload['profile'], partial=True)
+        profile_serializer.is_valid(raise_exception=True)
+
+    sections = {}
+    for key, (_model, serializer_class) in SECTIONS.items():
+        if payload.get(key) is None:
+            continue
+        serializer = serializer_class(data=payload[key], many=True)
+        serializer.is_valid(raise_exception=True)
+        sections[key] = serializer.validated_data
+
+    with profile_writes(), transaction.atomic():
+        if profile_serializer is not None:
+            profile_serializer.save()
+        for key, items in sections.items():
+            replace_section(profile, SECTIONS[key][0], items)
+        mark_sections_changed(profile, {key: bool(items) for key, items in sections.items()})
+    return {key: len(items) for key, items in sections.items()}
+
+
+def onboarding_summary(profile: UserProfile, counts: dict[str, int] | None = None) -> dict:
+    '''Profile plus item counts per section; `counts` supplies those already known.'''
+    counts = counts or {}
+    summary = {'profile': UserProfileSerializer(profile).data}
+    for key, (model, _serializer_class) in SECTIONS.items():
+        count = counts.get(key)
+        if count is None:
+            count = model.objects.filter(profile=profile).count()
+        summary[f'{key}_count'] = count
+    return summary
+
+
+def apply_parsed_resume(profile: UserProfile, parsed: dict, resume_file=None) -> tuple[dict, int]:
+    '''Write parse_resume output to the profile; returns (body, http_status).'''
+    payload = parsed_resume_payload(parsed)
+    if resume_file is not None:
+        payload['profile']['resume_file'] = resume_file
+    try:
+        counts = apply_onboarding(profile, payload)
+    except ValidationError as exc:
+        # Hand the parse back so the client can fix it up and use onboarding_submit.
+        return (
+            {
+                'detail': 'Parsed resume did not pass validation.',
+                'errors': exc.detail,
+                'parsed': parsed,
+            },
+            status.HTTP_400_BAD_REQUEST,
+        )
+    return onboarding_summary(profile, counts), status.HTTP_200_OK
+
+
+def import_stored_resume(profile: UserProfile, payload: dict) -> tuple[dict, int]:
+    '''Background half of parse_and_apply: parse the stored upload and apply it.'''
+    name = payload.get('resume_file')
+    if not name or profile.resume_file.name != name:
+        return (
+            {'detail': 'The resume was replaced before it could be imported.'},
+            status.HTTP_409_CONFLICT,
+        )
+    with profile.resume_file.open('rb') as resume_file:
+        digest = resume_digest(resume_file)
+        body, http_status = parse_resume_file(resume_file, payload.get('content_type', ''), digest)
+    if http_status != status.HTTP_200_OK:
+        return body, http_status
+    return apply_parsed_resume(profile, body)
@@ -0,0 +1,29 @@
+'''Per-profile cache of the compacted LLM prompt payload, keyed on content_version.'''
+
+from django.conf import settings
+
+from .llm_cache import LocMemLLMCache
+from .models import UserProfile
+from .prompts import dumps, estimate_tokens
+
+
+profile_payload_cache = LocMemLLMCache(
+    ttl=settings.PROFILE_PAYLOAD_CACHE_TTL,
+    max_entries=settings.PROFILE_PAYLOAD_CACHE_MAX_ENTRIES,
+)
+
+
+def payload_cache_key(profile: UserProfile) -> str:
+    return f'profile:{profile.pk}:{profile.content_version}'
+
+
+def cached_profile_payload(profile: UserProfile, build) -> tuple[dict, str, int]:
+    '''Return (payload, payload JSON, estimated tokens), building on a miss.'''
+    key = payload_cache_key(profile)
+    entry = profile_payload_cache.get(key)
+    if entry is None:
+        payload = build(profile)
+        payload_json = dumps(payload)
+        entry = (payload, payload_json, estimate_tokens(payload_json))
+        profile_payload_cache.set(key, entry)
+    return entry
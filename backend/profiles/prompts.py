@@ -0,0 +1,118 @@
+'''Token-budgeted prompt inputs.'''
+
+import json
+import math
+import re
+
+
+# Rough average for English prose and JSON under Llama-style tokenizers.
+CHARS_PER_TOKEN = 4
+
+# Keys stripped from the profile payload at any depth.
+DROPPED_KEYS = frozenset({'id', 'order'})
+
+# Profile collections, most important first, with how many leading entries
+# survive the first trimming pass. Trimming drops entries from the end of
+# the lowest-priority section; protected entries only go in a second pass.
+SECTION_PRIORITY = (
+    ('experiences', 3),
+    ('skills', 15),
+    ('educations', 2),
+    ('certifications', 0),
+    ('achievements', 0),
+)
+
+# Fraction of the budget the job description may always claim.
+JD_MIN_SHARE = 0.4
+
+_INLINE_SPACE = re.compile(r'[ \t\f\v]+')
+_BLANK_LINES = re.compile(r'\n\s*\n+')
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def dumps(value) -> str:
+    '''Compact JSON as sent to the model.'''
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def normalize_whitespace(text: str) -> str:
+    '''Collapse runs of spaces and blank lines; keep single line breaks.'''
+    text = _INLINE_SPACE.sub(' ', text or '')
+    text = '\n'.join(line.strip() for line in text.splitlines())
+    return _BLANK_LINES.sub('\n\n', text).strip()
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    '''Cut text to roughly max_tokens, preferring a word boundary.'''
+    max_chars = max(0, max_tokens) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    head = cut.rsplit(None, 1)[0] if ' ' in cut or '\n' in cut else cut
+    return head.rstrip()
+
+
+def compact(value):
+    '''Recursively drop null/empty values and DROPPED_KEYS; normalize strings.'''
+    if isinstance(value, dict):
+        result = {}
+        for key, item in value.items():
+            if key in DROPPED_KEYS:
+                continue
+            item = compact(item)
+            if item is None or item == '' or item == [] or item == {}:
+                continue
+            result[key] = item
+        return result
+    if isinstance(value, list):
+        items = [compact(item) for item in value]
+        return [item for item in items if item not in (None, '', [], {})]
+    if isinstance(value, str):
+        return normalize_whitespace(value)
+    return value
+
+
+def fit_to_budget(
+    profile: dict,
+    job_description: str,
+    budget: int,
+    profile_tokens: int | None = None,
+) -> tuple[dict, str]:
+    '''Return (profile, job_description) whose combined JSON fits `budget` tokens.
+
+    `profile` should already be compacted; pass `profile_tokens` when it is
+    known to skip re-serializing. Overhead for the wrapping JSON is small
+    and absorbed by the estimate's slack. The profile is returned as-is
+    when nothing had to be trimmed.
+    '''
+    jd_text = normalize_whitespace(job_description)
+    jd_tokens = estimate_tokens(jd_text)
+    if profile_tokens is None:
+        profile_tokens = estimate_tokens(dumps(profile))
+    if jd_tokens + profile_tokens <= budget:
+        return profile, jd_text
+
+    # The JD gets whatever the profile leaves, but never less than its share.
+    jd_budget = max(budget - profile_tokens, int(budget * JD_MIN_SHARE))
+    jd_text = truncate_to_tokens(jd_text, jd_budget)
+    profile_budget = budget - estimate_tokens(jd_text)
+
+    profile = {
+        key: list(value) if isinstance(value, list) else value
+        for key, value in profile.items()
+    }
+    for protect in (True, False):
+        for section, protected in reversed(SECTION_PRIORITY):
+            entries = profile.get(section)
+            keep = protected if protect else 0
+            while entries and len(entries) > keep and profile_tokens > profile_budget:
+                # Comma plus the entry itself.
+                profile_tokens -= estimate_tokens(dumps(entries.pop())) + 1
+            if entries == []:
+                profile.pop(section)
+            if profile_tokens <= profile_budget:
+                return profile, jd_text
+    return profile, jd_text
@@ -0,0 +1,200 @@
+'''Load shedding for the Groq upstream: circuit breaker plus AIMD concurrency cap.'''
+
+import math
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+from django.conf import settings
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class Ticket(NamedTuple):
+    '''An admitted call: the breaker generation it entered in, and whether it is the probe.'''
+    generation: int
+    probe: bool = False
+
+
+class CircuitBreaker:
+    '''Consecutive-failure breaker with a single half-open probe.'''
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        # Bumped on every trip, so outcomes of calls admitted earlier are ignored.
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def admit(self) -> tuple[float | None, Ticket | None]:
+        '''Return (None, ticket) if the call may proceed, else (seconds until the next probe, None).'''
+        with self._lock:
+            if self.state == CLOSED:
+                return None, Ticket(self._generation)
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return None, Ticket(self._generation, probe=True)
+            return max(remaining, 1), None
+
+    def cancel_probe(self, ticket: Ticket) -> None:
+        with self._lock:
+            if ticket.probe and ticket.generation == self._generation:
+                self._probing = False
+
+    def record(self, failed: bool, ticket: Ticket) -> None:
+        with self._lock:
+            if ticket.generation != self._generation:
+                # Admitted before the last trip: says nothing about recovery.
+                return
+            if ticket.probe:
+                self._probing = False
+            if not failed:
+                self.state = CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if ticket.probe or self._failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._generation += 1
+
+
+class AIMDLimiter:
+    '''Adaptive cap on in-flight calls: +1/limit per success, x backoff per failure.'''
+
+    def __init__(
+        self,
+        initial: int = 8,
+        minimum: int = 1,
+        maximum: int = 64,
+        backoff: float = 0.5,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, failed: bool | None) -> None:
+        # None frees the slot without adjusting the cap (no outcome to learn from).
+        with self._lock:
+            self.in_flight -= 1
+            if failed is None:
+                return
+            if failed:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+            else:
+                # Roughly +1 per window of `limit` successful calls.
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+
+class UpstreamGuard:
+    '''Admission control for one upstream, combining breaker and limiter.'''
+
+    def __init__(self, breaker: CircuitBreaker, limiter: AIMDLimiter, saturated_retry_after: float = 1):
+        self.breaker = breaker
+        self.limiter = limiter
+        self.saturated_retry_after = saturated_retry_after
+        self.rejected = 0
+
+    def admit(self) -> tuple[float | None, Ticket | None]:
+        '''Reserve an in-flight slot and return (None, ticket), or (Retry-After delay, None) when shedding load.'''
+        retry_after, ticket = self.breaker.admit()
+        if retry_after is None:
+            if self.limiter.acquire():
+                return None, ticket
+            # Hand back a half-open probe we were granted but cannot use.
+            self.breaker.cancel_probe(ticket)
+            retry_after = self.saturated_retry_after
+        self.rejected += 1
+        return retry_after, None
+
+    def release(self, failed: bool, ticket: Ticket) -> None:
+        '''Report the outcome of the call admitted with `ticket`.'''
+        self.limiter.release(failed)
+        self.breaker.record(failed, ticket)
+
+    def cancel(self, ticket: Ticket) -> None:
+        '''Free an admitted call's slot without an outcome, e.g. after cancellation.'''
+        self.limiter.release(None)
+        self.breaker.cancel_probe(ticket)
+
+    def stats(self) -> dict:
+        return {
+            'state': self.breaker.state,
+            'limit': int(self.limiter.limit),
+            'in_flight': self.limiter.in_flight,
+            'rejected': self.rejected,
+        }
+
+
+class LatencyTracker:
+    '''Rolling window of successful call latencies, per model.'''
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(model)
+            if samples is None:
+                samples = self._samples[model] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, model: str, pct: float) -> float | None:
+        '''Observed latency at `pct`, or None until enough calls have been seen.'''
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(pct / 100 * len(samples)) - 1))
+        return samples[index]
+
+
+def hedge_delay(model: str) -> float:
+    '''Seconds to wait on a call to `model` before sending a hedged request.'''
+    observed = latency_tracker.percentile(model, settings.LLM_HEDGE_PERCENTILE)
+    if observed is None:
+        return settings.LLM_HEDGE_DEFAULT_DELAY
+    return max(settings.LLM_HEDGE_MIN_DELAY, observed)
+
+
+def retry_after_seconds(delay: float) -> int:
+    return max(1, math.ceil(delay))
+
+
+upstream_guard = UpstreamGuard(
+    CircuitBreaker(
+        failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.LLM_BREAKER_RESET_TIMEOUT,
+    ),
+    AIMDLimiter(
+        initial=settings.LLM_CONCURRENCY_INITIAL,
+        minimum=settings.LLM_CONCURRENCY_MIN,
+        maximum=settings.LLM_CONCURRENCY_MAX,
+    ),
+)
+
+latency_tracker = LatencyTracker()
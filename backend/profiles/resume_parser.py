@@ -0,0 +1,204 @@
+'''Resume upload validation, text extraction and LLM parsing helpers.'''
+
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from rest_framework import status
+
+from .extraction import ExtractionError, extract_text
+from .generation import is_json_output, strip_code_fences
+from .llm import (
+    GROQ_MODEL,
+    LLMError,
+    LLMUnavailable,
+    chat_with_fallback,
+    extract_content,
+)
+from .llm_cache import LocMemLLMCache
+from .metrics import record_json_failure
+from .models import MAX_RESUME_SIZE
+from .prompts import normalize_whitespace, truncate_to_tokens
+from .singleflight import llm_flights
+
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_RESUME_TYPES = {
+    'application/pdf',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+# Bump when extraction or the parser prompt changes so stale cache entries miss.
+EXTRACTOR_VERSION = 3
+
+RESUME_PARSER_PROMPT = (
+    'You are a resume parser. Extract structured data from the resume.\n'
+    'Return STRICT JSON only (no markdown). Keys:\n'
+    'profile, skills, experiences, educations, certifications, achievements.\n'
+    'Use this schema:\n'
+    'profile: {headline, summary, location, phone, email}\n'
+    'skills: [{name, proficiency, order}]\n'
+    'experiences: [{company, title, location, start_date, end_date, is_current, description, order}]\n'
+    'educations: [{school, degree, field_of_study, start_date, end_date, description, order}]\n'
+    'certifications: [{name, issuer, issue_date, expiration_date, credential_url, order}]\n'
+    'achievements: [{title, description, date, order}]\n'
+    'If a field is missing, use empty string, null, or empty list.'
+)
+
+
+# Extracted text and parsed JSON keyed by file content hash; uploads of the
+# same file (onboarding, then re-parse) skip extraction and the LLM call.
+resume_cache = LocMemLLMCache(
+    ttl=settings.RESUME_CACHE_TTL,
+    max_entries=settings.RESUME_CACHE_MAX_ENTRIES,
+)
+
+
+def resume_digest(resume_file) -> str:
+    '''SHA-256 of the upload, streamed in chunks; leaves the file rewound.'''
+    digest = hashlib.sha256()
+    for chunk in resume_file.chunks():
+        digest.update(chunk)
+    resume_file.seek(0)
+    return digest.hexdigest()
+
+
+def _text_cache_key(digest: str) -> str:
+    return f'text:{EXTRACTOR_VERSION}:{digest}'
+
+
+def parsed_cache_key(digest: str) -> str:
+    return f'parsed:{EXTRACTOR_VERSION}:{GROQ_MODEL}:{digest}'
+
+
+def validate_resume_upload(resume_file) -> str | None:
+    '''Return an error message if the upload is too large or of the wrong type.'''
+    if resume_file.size > MAX_RESUME_SIZE:
+        return 'Resume file exceeds 5MB limit.'
+    if resume_file.content_type not in ALLOWED_RESUME_TYPES:
+        return 'Unsupported resume file type.'
+    return None
+
+
+def extract_resume_text(resume_file, content_type: str) -> str:
+    '''Extract plain text from a PDF/DOCX upload; raises on unreadable files.'''
+    # Disk-backed uploads are handed over by path, avoiding an in-memory copy.
+    if hasattr(resume_file, 'temporary_file_path'):
+        return extract_text(resume_file.temporary_file_path(), content_type)
+    return extract_text(resume_file.read(), content_type)
+
+
+def extract_resume_text_cached(resume_file, content_type: str, digest: str) -> str:
+    '''extract_resume_text, memoized on the file's content hash.'''
+    key = _text_cache_key(digest)
+    text = resume_cache.get(key)
+    if text is None:
+        text = extract_resume_text(resume_file, content_type)
+        if text:
+            resume_cache.set(key, text)
+    return text
+
+
+def build_resume_messages(resume_text: str) -> list[dict]:
+    return [
+        {'role': 'system', 'content': RESUME_PARSER_PROMPT},
+        {
+            'role': 'user',
+            'content': truncate_to_tokens(
+                normalize_whitespace(resume_text),
+                settings.RESUME_PARSE_TOKEN_BUDGET,
+            ),
+        },
+    ]
+
+
+def llm_error_response(exc: LLMError) -> tuple[dict, int]:
+    '''Map an LLM failure to (body, http_status); 503 + retry_after when shedding load.'''
+    if isinstance(exc, LLMUnavailable):
+        return (
+            {'detail': str(exc), 'retry_after': exc.retry_after},
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    if exc.status_code is not None:
+        return (
+            {
+                'detail': 'Groq API error.',
+                'status_code': exc.status_code,
+            },
+            status.HTTP_502_BAD_GATEWAY,
+        )
+    return {'detail': str(exc)}, status.HTTP_502_BAD_GATEWAY
+
+
+def extraction_error_response(exc: Exception) -> tuple[dict, int]:
+    '''Map a failed extraction to (body, http_status) without echoing internals.'''
+    if isinstance(exc, ExtractionError):
+        # Timeouts and dead workers are a server-side condition, not a bad upload.
+        return (
+            {'detail': 'Resume extraction is temporarily unavailable. Please retry shortly.'},
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    logger.warning('Resume extraction failed', exc_info=exc)
+    return {'detail': 'Unable to read resume file.'}, status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def parse_resume_output(text: str) -> tuple[dict, int]:
+    '''Decode the model's JSON; returns (body, http_status).'''
+    try:
+        clean = strip_code_fences(text)
+        parsed = json.loads(clean)
+    except json.JSONDecodeError:
+        record_json_failure()
+        return (
+            {
+                'detail': 'Model output was not valid JSON.',
+                'raw_output': text,
+            },
+            status.HTTP_502_BAD_GATEWAY,
+        )
+    return parsed, status.HTTP_200_OK
+
+
+def parse_resume_file(resume_file, content_type: str, digest: str) -> tuple[dict, int]:
+    '''Extract and LLM-parse a resume; returns (body, http_status).
+
+    Results are cached on the file hash, and concurrent parses of the same
+    file share one extraction and LLM call.
+    '''
+    key = parsed_cache_key(digest)
+    cached = resume_cache.get(key)
+    if cached is not None:
+        return cached, status.HTTP_200_OK
+
+    def parse():
+        # Extract plain text from the resume before sending to the LLM.
+        try:
+            resume_text = extract_resume_text_cached(resume_file, content_type, digest)
+        except Exception as exc:
+            return extraction_error_response(exc)
+
+        if not resume_text:
+            return (
+                {'detail': 'Resume text could not be extracted.'},
+                status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            # Call Groq API to parse resume content into structured JSON.
+            data = chat_with_fallback(
+                build_resume_messages(resume_text),
+                model=GROQ_MODEL,
+                timeout=60,
+                validate=is_json_output,
+            )
+        except LLMError as exc:
+            return llm_error_response(exc)
+
+        body, http_status = parse_resume_output(extract_content(data))
+        if http_status == status.HTTP_200_OK:
+            resume_cache.set(key, body)
+        return body, http_status
+
+    return llm_flights.do(key, parse)
@@ -2,7 +2,15 @@
 
 from rest_framework import serializers
 
-from .models import Achievement, Certification, Education, Experience, Skill, UserProfile
+from .models import (
+    Achievement,
+    Certification,
+    Education,
+    Experience,
+    GenerationJob,
+    Skill,
+    UserProfile,
+)
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -167,3 +175,13 @@ class UserProfileDetailSerializer(UserProfileSerializer):
             'certifications',
             'achievements',
         ]
+
+
+class GenerationJobSerializer(serializers.ModelSerializer):
+    '''Read-only view of a queued generation job.'''
+    job_id = serializers.UUIDField(source='id', read_only=True)
+
+    class Meta:
+        model = GenerationJob
+        fields = ['job_id', 'kind', 'status', 'result', 'error', 'created_at', 'finished_at']
+        read_only_fields = fields
@@ -1,10 +1,18 @@
-'''Signals for profile creation on user signup.'''
+'''Signals for profile creation on user signup and payload cache invalidation.'''
 
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import UserProfile
+from .models import (
+    Achievement,
+    Certification,
+    Education,
+    Experience,
+    Skill,
+    UserProfile,
+)
+from .dirty import mark_content_changed
 
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
@@ -13,3 +21,27 @@ def create_user_profile(sender, instance, created, **kwargs):
     # Only create a profile when a new user record is created.
     if created:
         UserProfile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def bump_profile_version(sender, instance, update_fields=None, **kwargs):
+    '''Invalidate cached prompt payloads when profile fields change.'''
+    # Completeness and version updates do not change the prompt payload.
+    if update_fields and set(update_fields) <= {'profile_completeness', 'content_version'}:
+        return
+    mark_content_changed(instance.pk)
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_save, sender=Experience)
+@receiver(post_save, sender=Education)
+@receiver(post_save, sender=Certification)
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Skill)
+@receiver(post_delete, sender=Experience)
+@receiver(post_delete, sender=Education)
+@receiver(post_delete, sender=Certification)
+@receiver(post_delete, sender=Achievement)
+def bump_section_version(sender, instance, **kwargs):
+    '''Invalidate the owning profile's cached prompt payload.'''
+    mark_content_changed(instance.profile_id)
@@ -0,0 +1,146 @@
+'''Coalesce identical concurrent LLM requests into a single upstream call.'''
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    '''Thread-safe: concurrent do() calls with the same key share one fn() run.'''
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], object]):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    '''Coroutine counterpart of SingleFlight; flights are scoped to an event loop.'''
+
+    def __init__(self):
+        self._tasks = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = loop.create_task(fn())
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda _task: self._finish(task_key, _task))
+        else:
+            self.coalesced += 1
+        # Shielded so one client disconnecting does not cancel the shared call.
+        return await asyncio.shield(task)
+
+    def _finish(self, task_key, task: asyncio.Task) -> None:
+        self._tasks.pop(task_key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter went away.
+            task.exception()
+
+
+class KeyLock:
+    '''Cross-process advisory lock per key, backed by flock() on a lock file.'''
+
+    def __init__(self, directory: str, timeout: float = 90, poll_interval: float = 0.05):
+        self.directory = directory
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.lock')
+
+    def acquire(self, key: str) -> int | None:
+        '''Block until the key is free; returns a handle, or None on timeout.'''
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                if time.monotonic() >= deadline:
+                    return None
+                time.sleep(self.poll_interval)
+                continue
+            # The previous holder may have unlinked the file while we waited
+            # on it; only a lock on the file currently at `path` counts.
+            try:
+                current = os.stat(path)
+            except FileNotFoundError:
+                current = None
+            if current is not None and current.st_ino == os.fstat(fd).st_ino:
+                return fd
+            os.close(fd)
+
+    def release(self, key: str, handle: int | None) -> None:
+        if handle is None:
+            return
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+        os.close(handle)
+
+
+def build_key_lock() -> KeyLock | None:
+    '''Cross-process lock when a lock directory is configured, else None.'''
+    if not settings.LLM_SINGLEFLIGHT_LOCK_DIR or fcntl is None:
+        return None
+    return KeyLock(
+        settings.LLM_SINGLEFLIGHT_LOCK_DIR,
+        timeout=settings.LLM_SINGLEFLIGHT_LOCK_TIMEOUT,
+    )
+
+
+llm_flights = SingleFlight()
+async_llm_flights = AsyncSingleFlight()
+llm_key_lock = build_key_lock()
@@ -0,0 +1,148 @@
+'''Incremental JSON parsing and server-sent event helpers for streamed generation.'''
+
+import json
+from collections.abc import Iterable, Iterator
+
+from rest_framework.renderers import BaseRenderer
+
+
+# Paths whose values are emitted as soon as they close. '*' matches any key/index:
+# top-level fields, each item of top-level lists, and bullets per experience.
+DEFAULT_EMIT_PATHS = (
+    ('*',),
+    ('*', '*'),
+    ('experiences', '*', 'bullets'),
+)
+
+
+def _path_matches(path: tuple, pattern: tuple) -> bool:
+    return len(path) == len(pattern) and all(
+        expected == '*' or expected == actual for actual, expected in zip(path, pattern)
+    )
+
+
+class IncrementalJSONParser:
+    '''Scan a JSON object chunk by chunk and report values as they complete.
+
+    Text before the first opening brace (e.g. a ```json fence) is ignored.
+    feed() returns a list of (path, value) tuples, where path is a tuple of
+    object keys and list indexes leading to the completed value.
+    '''
+
+    def __init__(self, emit_paths: tuple = DEFAULT_EMIT_PATHS):
+        self.emit_paths = emit_paths
+        self.buffer = ''
+        self.done = False
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._scalar_start = None
+
+    def _current_path(self) -> tuple:
+        return tuple(
+            frame['key'] if frame['type'] == 'object' else frame['index']
+            for frame in self._stack
+        )
+
+    def _value_closed(self, start: int, end: int, path: tuple, events: list) -> None:
+        if not any(_path_matches(path, pattern) for pattern in self.emit_paths):
+            return
+        try:
+            value = json.loads(self.buffer[start:end])
+        except json.JSONDecodeError:
+            return
+        events.append((path, value))
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        events = []
+        while self._pos < len(self.buffer) and not self.done:
+            index = self._pos
+            char = self.buffer[index]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    frame = self._stack[-1]
+                    if frame['type'] == 'object' and frame['expect'] == 'key':
+                        frame['key'] = json.loads(self.buffer[self._string_start:index + 1])
+                    else:
+                        self._value_closed(
+                            self._string_start, index + 1, self._current_path(), events
+                        )
+                continue
+
+            if not self._stack:
+                if char in '{[':
+                    self._push(char, index)
+                continue
+
+            if self._scalar_start is not None and (char in ',}]' or char.isspace()):
+                self._value_closed(self._scalar_start, index, self._current_path(), events)
+                self._scalar_start = None
+
+            frame = self._stack[-1]
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in '{[':
+                self._push(char, index)
+            elif char in '}]':
+                closed = self._stack.pop()
+                if not self._stack:
+                    self.done = True
+                    continue
+                self._value_closed(closed['start'], index + 1, closed['path'], events)
+            elif char == ':':
+                frame['expect'] = 'value'
+            elif char == ',':
+                if frame['type'] == 'object':
+                    frame['expect'] = 'key'
+                    frame['key'] = None
+                else:
+                    frame['index'] += 1
+            elif not char.isspace() and self._scalar_start is None:
+                self._scalar_start = index
+        return events
+
+    def _push(self, char: str, index: int) -> None:
+        self._stack.append({
+            'type': 'object' if char == '{' else 'array',
+            'start': index,
+            'path': self._current_path(),
+            'key': None,
+            'index': 0,
+            'expect': 'key',
+        })
+
+
+def format_sse(event: str, data) -> str:
+    '''Encode one server-sent event.'''
+    payload = json.dumps(data, ensure_ascii=False)
+    return f'event: {event}\ndata: {payload}\n\n'
+
+
+def sse_stream(events: Iterable[tuple[str, object]]) -> Iterator[str]:
+    for event, data in events:
+        yield format_sse(event, data)
+
+
+class EventStreamRenderer(BaseRenderer):
+    '''Lets text/event-stream clients through content negotiation.
+
+    Streaming actions return a StreamingHttpResponse directly; this renderer
+    only handles early error responses, which are sent as a single error event.
+    '''
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_sse('error', data).encode(self.charset)
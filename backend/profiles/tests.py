@@ -1,3 +1,1109 @@
-from django.test import TestCase
+import asyncio
+import io
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http.multipartparser import MultiPartParser
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import UserAccount
+
+from . import async_views, extraction, jobs
+from .dirty import mark_fields_changed, mark_sections_changed, profile_writes
+from .generation import build_profile_payload, is_json_output
+from .llm import (
+    LLMError,
+    LLMUnavailable,
+    async_llm_client,
+    call_groq,
+    chat_with_fallback,
+    extract_content,
+    llm_client,
+    upstream_slot,
+)
+from .llm_cache import DjangoLLMCache, LocMemLLMCache, llm_cache, make_cache_key
+from .management.commands.llm_loadtest import parse_metrics
+from .metrics import current_endpoint, labelled, render_metrics
+from .payload_cache import profile_payload_cache
+from .prompts import compact, dumps, estimate_tokens, fit_to_budget, normalize_whitespace, truncate_to_tokens
+from .resilience import CLOSED, HALF_OPEN, OPEN, AIMDLimiter, CircuitBreaker, UpstreamGuard
+from .resume_parser import extraction_error_response
+from .singleflight import AsyncSingleFlight, KeyLock, SingleFlight
+from .streaming import IncrementalJSONParser, format_sse
+from .throttling import TokenBucket, consume_llm_tokens, generation_cost
+from .upload_handlers import BoundedResumeUploadHandler
+from .models import (
+    MAX_RESUME_SIZE,
+    PROFILE_SECTIONS,
+    Achievement,
+    Certification,
+    Education,
+    Experience,
+    GenerationJob,
+    Skill,
+    UserProfile,
+)
+
+
+class ProfileDetailQueryCountTests(APITestCase):
+    '''Full-profile reads must cost the same number of queries at any size.'''
+
+    # Profile row plus one query per prefetched section.
+    EXPECTED_QUERIES = 1 + len(PROFILE_SECTIONS)
+
+    def setUp(self):
+        self.user = UserAccount.objects.create_user('detail@example.com', 'password')
+        self.profile = self.user.profile
+        self.client.force_authenticate(self.user)
+
+    def add_rows(self, count: int) -> None:
+        offset = Skill.objects.filter(profile=self.profile).count()
+        for index in range(offset, offset + count):
+            Skill.objects.create(profile=self.profile, name=f'Skill {index}')
+            Experience.objects.create(
+                profile=self.profile,
+                company=f'Company {index}',
+                title='Engineer',
+                start_date=date(2020, 1, 1),
+            )
+            Education.objects.create(profile=self.profile, school=f'School {index}')
+            Certification.objects.create(profile=self.profile, name=f'Cert {index}')
+            Achievement.objects.create(profile=self.profile, title=f'Award {index}')
+
+    def test_me_query_count_is_constant(self):
+        for rows in (1, 10):
+            self.add_rows(rows)
+            with self.assertNumQueries(self.EXPECTED_QUERIES):
+                response = self.client.get('/profiles/profile/me/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                len(response.data['skills']),
+                Skill.objects.filter(profile=self.profile).count(),
+            )
+
+    def test_build_profile_payload_query_count_is_constant(self):
+        counts = []
+        for rows in (1, 10):
+            self.add_rows(rows)
+            profile = UserProfile.objects.get(pk=self.profile.pk)
+            with CaptureQueriesContext(connection) as queries:
+                build_profile_payload(profile)
+            counts.append(len(queries))
+        self.assertEqual(counts, [len(PROFILE_SECTIONS)] * 2)
+
+    def test_build_profile_payload_reuses_prefetched_sections(self):
+        self.add_rows(3)
+        profile = UserProfile.objects.with_sections().get(pk=self.profile.pk)
+        with self.assertNumQueries(0):
+            build_profile_payload(profile)
+
+
+class ProfileConditionalGetTests(APITestCase):
+    '''Unchanged profile reads are answered with 304 before serialization.'''
+
+    def setUp(self):
+        self.user = UserAccount.objects.create_user('etag@example.com', 'password')
+        self.client.force_authenticate(self.user)
+
+    def test_me_not_modified_until_profile_changes(self):
+        etag = self.client.get('/profiles/profile/me/')['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/profiles/profile/me/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/profiles/profile/update_me/', {'headline': 'Engineer'}, format='json')
+        response = self.client.get('/profiles/profile/me/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_section_list_etag_follows_section_writes(self):
+        etag = self.client.get('/profiles/skills/')['ETag']
+        response = self.client.get('/profiles/skills/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/profiles/skills/', {'name': 'Python'}, format='json')
+        response = self.client.get('/profiles/skills/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+
+
+class BulkSectionWriteTests(APITestCase):
+    '''Section replaces are bulk inserts, so their cost does not grow per row.'''
+
+    def setUp(self):
+        self.user = UserAccount.objects.create_user('bulk@example.com', 'password')
+        self.client.force_authenticate(self.user)
+
+    def skills(self, count: int) -> list[dict]:
+        return [{'name': f'Skill {index}', 'proficiency': 'basic'} for index in range(count)]
+
+    def test_bulk_replace_query_count_is_constant(self):
+        # Start from a non-empty section so each replace also deletes rows.
+        self.client.post('/profiles/skills/bulk/', self.skills(1), format='json')
+        counts = []
+        for size in (3, 30):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/profiles/skills/bulk/', self.skills(size), format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(len(response.data), size)
+            self.assertTrue(all(item['id'] for item in response.data))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_onboarding_submit_counts_and_version(self):
+        version = self.user.profile.content_version
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/profiles/profile/onboarding_submit/',
+                {'profile': {'headline': 'Engineer'}, 'skills': self.skills(30)},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['skills_count'], 30)
+        self.assertEqual(response.data['experiences_count'], 0)
+        self.assertEqual(Skill.objects.filter(profile=self.user.profile).count(), 30)
+        profile = UserProfile.objects.get(pk=self.user.profile.pk)
+        self.assertEqual(profile.content_version, version + 1)
+        self.assertEqual(profile.skills.first().proficiency, Skill.Proficiency.BEGINNER)
+
+
+def chat_response(content: str) -> dict:
+    return {'choices': [{'message': {'content': content}}]}
+
+
+class LocMemLLMCacheTests(SimpleTestCase):
+    def test_entries_expire_after_ttl(self):
+        cache = LocMemLLMCache(ttl=10)
+        with mock.patch('profiles.llm_cache.time.monotonic', return_value=100):
+            cache.set('key', 'value')
+        with mock.patch('profiles.llm_cache.time.monotonic', return_value=109):
+            self.assertEqual(cache.get('key'), 'value')
+        with mock.patch('profiles.llm_cache.time.monotonic', return_value=111):
+            self.assertIsNone(cache.get('key'))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LocMemLLMCache(max_entries=2)
+        cache.set('a', '1')
+        cache.set('b', '2')
+        cache.get('a')
+        cache.set('c', '3')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.get('c')), ('1', '3'))
+
+    def test_key_covers_the_whole_request(self):
+        key = make_cache_key('model-a', 'system', 'user', 0.2)
+        self.assertEqual(key, make_cache_key('model-a', 'system', 'user', 0.2))
+        self.assertNotEqual(key, make_cache_key('model-b', 'system', 'user', 0.2))
+        self.assertNotEqual(key, make_cache_key('model-a', 'system', 'user', 0.7))
+        self.assertNotEqual(key, make_cache_key('model-a', 'system', 'user!', 0.2))
+
+
+class DjangoLLMCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+
+    def test_clear_keeps_other_entries_in_the_alias(self):
+        cache = DjangoLLMCache()
+        cache.set('key', 'value')
+        caches['default'].set('llm-bucket:user:1', (10, 0))
+        self.assertEqual(cache.get('key'), 'value')
+        cache.clear()
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(caches['default'].get('llm-bucket:user:1'), (10, 0))
+        # Entries written after a clear are readable again.
+        cache.set('key', 'fresh')
+        cache.clear()
+        cache.set('key', 'newer')
+        self.assertEqual(cache.get('key'), 'newer')
+
+
+class LLMResponseCacheTests(SimpleTestCase):
+    '''call_groq serves repeats from the cache, but only for usable output.'''
+
+    def setUp(self):
+        llm_cache.clear()
+        self.addCleanup(llm_cache.clear)
+
+    def test_valid_output_is_cached(self):
+        with mock.patch.object(llm_client, 'chat', return_value=chat_response('{"a": 1}')) as chat:
+            first = call_groq('system', 'user', 'model-a', validate=is_json_output)
+            second = call_groq('system', 'user', 'model-a', validate=is_json_output)
+        self.assertEqual(first, {'content': '{"a": 1}'})
+        self.assertEqual(second, {'content': '{"a": 1}', 'cached': True})
+        self.assertEqual(chat.call_count, 1)
+
+    def test_invalid_output_is_not_cached(self):
+        with mock.patch.object(llm_client, 'chat', return_value=chat_response('not json')) as chat:
+            call_groq('system', 'user', 'model-a', validate=is_json_output)
+            second = call_groq('system', 'user', 'model-a', validate=is_json_output)
+        self.assertNotIn('cached', second)
+        self.assertEqual(chat.call_count, 2)
+
+
+@override_settings(RESUME_EXTRACT_WORKERS=2)
+class ExtractionPoolTests(SimpleTestCase):
+    '''A timed-out file takes the shared pool down without failing other uploads.'''
+
+    def tearDown(self):
+        extraction._reset_pool(extraction._pool_generation)
+
+    def test_other_uploads_survive_a_timeout(self):
+        # Warm the pool so both calls below start on the same one.
+        extraction._run_tasks([(abs, -1)], time.monotonic() + 30)
+        results = {}
+
+        def survivor():
+            results['survivor'] = extraction._run_tasks([(time.sleep, 1)], time.monotonic() + 30)
+
+        thread = threading.Thread(target=survivor)
+        thread.start()
+        time.sleep(0.2)
+        with self.assertRaises(extraction.ExtractionTimeout):
+            extraction._run_tasks([(time.sleep, 30)], time.monotonic() + 0.3)
+        thread.join()
+        self.assertEqual(results['survivor'], [None])
+
+    def test_failures_are_not_reported_as_bad_requests(self):
+        body, http_status = extraction_error_response(extraction.ExtractionTimeout('timed out'))
+        self.assertEqual(http_status, 503)
+        with self.assertLogs('profiles.resume_parser', 'WARNING'):
+            body, http_status = extraction_error_response(ValueError('/tmp/secret path'))
+        self.assertEqual(http_status, 422)
+        self.assertNotIn('secret', body['detail'])
+
+
+class UpstreamGuardTests(SimpleTestCase):
+    '''Breaker and limiter transitions, and which call outcomes drive them.'''
+
+    def make_guard(self, **breaker) -> UpstreamGuard:
+        breaker = {'failure_threshold': 2, 'reset_timeout': 0, **breaker}
+        return UpstreamGuard(CircuitBreaker(**breaker), AIMDLimiter(initial=8, maximum=16))
+
+    def admit(self, guard: UpstreamGuard):
+        retry_after, ticket = guard.admit()
+        self.assertIsNone(retry_after)
+        return ticket
+
+    def open_half(self, guard: UpstreamGuard):
+        # Trip the breaker, then take the half-open probe.
+        for ticket in [self.admit(guard), self.admit(guard)]:
+            guard.release(True, ticket)
+        self.assertEqual(guard.breaker.state, OPEN)
+        probe = self.admit(guard)
+        self.assertEqual(guard.breaker.state, HALF_OPEN)
+        return probe
+
+    def test_breaker_opens_and_recovers_through_one_probe(self):
+        guard = self.make_guard(reset_timeout=30)
+        for _ in range(2):
+            guard.release(True, self.admit(guard))
+        self.assertEqual(guard.breaker.state, OPEN)
+        self.assertGreater(guard.admit()[0], 0)
+
+        guard = self.make_guard()
+        probe = self.open_half(guard)
+        # Only one probe at a time.
+        self.assertEqual(guard.admit(), (1, None))
+        guard.release(False, probe)
+        self.assertEqual(guard.breaker.state, CLOSED)
+
+    def test_failed_probe_reopens(self):
+        guard = self.make_guard()
+        guard.release(True, self.open_half(guard))
+        self.assertEqual(guard.breaker.state, OPEN)
+
+    def test_stragglers_from_before_the_trip_are_ignored(self):
+        guard = self.make_guard(reset_timeout=30)
+        straggler, late_failure = self.admit(guard), self.admit(guard)
+        for _ in range(2):
+            guard.release(True, self.admit(guard))
+        self.assertEqual(guard.breaker.state, OPEN)
+        guard.release(False, straggler)
+        self.assertEqual(guard.breaker.state, OPEN)
+        self.assertIsNotNone(guard.admit()[0])
+
+        guard.breaker.reset_timeout = 0
+        probe = self.admit(guard)
+        guard.release(True, late_failure)
+        self.assertEqual(guard.breaker.state, HALF_OPEN)
+        guard.release(False, probe)
+        self.assertEqual(guard.breaker.state, CLOSED)
+        self.assertEqual(guard.limiter.in_flight, 0)
+
+    def test_limiter_grows_additively_and_halves_on_failure(self):
+        limiter = AIMDLimiter(initial=4, maximum=16)
+        self.assertTrue(all(limiter.acquire() for _ in range(4)))
+        self.assertFalse(limiter.acquire())
+        limiter.release(False)
+        self.assertAlmostEqual(limiter.limit, 4.25)
+        limiter.release(True)
+        self.assertAlmostEqual(limiter.limit, 2.125)
+        self.assertEqual(limiter.in_flight, 2)
+
+    def test_cancelled_probe_records_no_outcome(self):
+        guard = self.make_guard()
+        guard.cancel(self.open_half(guard))
+        limit = guard.limiter.limit
+        with mock.patch('profiles.llm.upstream_guard', guard):
+            # The probe is free again and goes to the next caller.
+            with self.assertRaises(asyncio.CancelledError):
+                with upstream_slot('model-a', []):
+                    raise asyncio.CancelledError
+        self.assertEqual(guard.breaker.state, HALF_OPEN)
+        self.assertEqual(guard.limiter.limit, limit)
+        self.assertEqual(guard.limiter.in_flight, 0)
+        self.admit(guard)
+
+    def test_dropped_stream_records_no_outcome(self):
+        guard = self.make_guard()
+
+        def stream():
+            with upstream_slot('model-a', []):
+                yield 'delta'
+                yield 'delta'
+
+        with mock.patch('profiles.llm.upstream_guard', guard):
+            deltas = stream()
+            next(deltas)
+            deltas.close()
+            with self.assertRaises(LLMError):
+                with upstream_slot('model-a', []):
+                    raise LLMError('Groq API error.', status_code=503)
+        self.assertEqual(guard.limiter.limit, 4.0)
+        self.assertEqual(guard.limiter.in_flight, 0)
+
+
+class MetricsTests(APITestCase):
+    '''Endpoint labels stay scoped to their request; cache totals export as counters.'''
+
+    def test_endpoint_label_does_not_outlive_the_request(self):
+        user = UserAccount.objects.create_user('metrics@example.com', 'password')
+        self.client.force_authenticate(user)
+        self.client.get('/profiles/profile/me/')
+        self.assertEqual(current_endpoint.get(), 'unknown')
+
+    def test_streamed_body_keeps_its_label(self):
+        def body():
+            yield current_endpoint.get()
+            yield current_endpoint.get()
+
+        self.assertEqual(list(labelled(body(), 'generate_resume_stream')), ['generate_resume_stream'] * 2)
+        self.assertEqual(current_endpoint.get(), 'unknown')
+
+    def test_cache_totals_are_counters(self):
+        text = render_metrics()
+        self.assertIn('# TYPE llm_cache_hits_total counter', text)
+        self.assertIn('# TYPE llm_cache_misses_total counter', text)
+
+    def test_loadtest_reads_server_gauges(self):
+        gauges = parse_metrics(render_metrics())
+        self.assertEqual(set(gauges), {'llm_in_flight', 'llm_concurrency_limit', 'llm_circuit_open'})
+        self.assertEqual(gauges['llm_in_flight'], 0)
+
+
+@override_settings(GROQ_FALLBACK_MODELS=['model-b'], LLM_HEDGE_DEFAULT_DELAY=0.05)
+class FallbackAndHedgeTests(SimpleTestCase):
+    '''Which models chat_with_fallback tries, in what order, and when it hedges.'''
+
+    messages = [{'role': 'user', 'content': 'hi'}]
+
+    def fake_chat(self, replies: dict, delays: dict | None = None):
+        self.calls = []
+
+        def chat(messages, model, temperature, timeout):
+            self.calls.append((model, threading.current_thread()))
+            time.sleep((delays or {}).get(model, 0))
+            reply = replies[model]
+            if isinstance(reply, Exception):
+                raise reply
+            return chat_response(reply)
+
+        return mock.patch.object(llm_client, 'chat', side_effect=chat)
+
+    def test_failed_model_falls_back_on_the_calling_thread(self):
+        with self.fake_chat({'model-a': LLMError('Groq API error.', 503), 'model-b': '{}'}):
+            data = chat_with_fallback(self.messages, 'model-a', validate=is_json_output)
+        self.assertEqual(extract_content(data), '{}')
+        self.assertEqual([model for model, _thread in self.calls], ['model-a', 'model-b'])
+        self.assertTrue(all(thread is threading.current_thread() for _model, thread in self.calls))
+
+    def test_invalid_output_falls_back_and_is_returned_if_nothing_better(self):
+        with self.fake_chat({'model-a': 'not json', 'model-b': '{}'}):
+            data = chat_with_fallback(self.messages, 'model-a', validate=is_json_output)
+        self.assertEqual(extract_content(data), '{}')
+        with self.fake_chat({'model-a': 'not json', 'model-b': LLMError('Groq API error.', 503)}):
+            data = chat_with_fallback(self.messages, 'model-a', validate=is_json_output)
+        self.assertEqual(extract_content(data), 'not json')
+
+    def test_fallback_answers_are_not_cached(self):
+        llm_cache.clear()
+        self.addCleanup(llm_cache.clear)
+        replies = {'model-a': LLMError('Groq API error.', 503), 'model-b': '{"from": "b"}'}
+        for _ in range(2):
+            with self.fake_chat(replies):
+                result = call_groq('system', 'user', 'model-a', validate=is_json_output)
+            self.assertEqual(result, {'content': '{"from": "b"}'})
+            self.assertEqual([model for model, _thread in self.calls], ['model-a', 'model-b'])
+        with self.fake_chat({'model-a': '{"from": "a"}'}):
+            call_groq('system', 'user', 'model-a', validate=is_json_output)
+            self.assertEqual(call_groq('system', 'user', 'model-a')['cached'], True)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_shed_load_stops_the_chain(self):
+        with self.fake_chat({'model-a': LLMUnavailable(5), 'model-b': '{}'}):
+            with self.assertRaises(LLMUnavailable):
+                chat_with_fallback(self.messages, 'model-a')
+        self.assertEqual(len(self.calls), 1)
+
+    @override_settings(LLM_HEDGE_ENABLED=True)
+    def test_slow_call_is_hedged(self):
+        with self.fake_chat({'model-a': '"a"', 'model-b': '"b"'}, delays={'model-a': 0.5}):
+            data = chat_with_fallback(self.messages, 'model-a')
+        self.assertEqual(extract_content(data), '"b"')
+
+    @override_settings(LLM_HEDGE_ENABLED=True)
+    def test_hedges_are_capped_per_process(self):
+        no_slots = threading.BoundedSemaphore(1)
+        no_slots.acquire()
+        with mock.patch('profiles.llm._hedge_slots', no_slots):
+            with self.fake_chat({'model-a': '"a"', 'model-b': '"b"'}, delays={'model-a': 0.3}):
+                data = chat_with_fallback(self.messages, 'model-a')
+        self.assertEqual(extract_content(data), '"a"')
+        self.assertEqual(len(self.calls), 1)
+
+
+class ParseAndApplyTests(APITestCase):
+    def setUp(self):
+        self.user = UserAccount.objects.create_user('import@example.com', 'password')
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch('profiles.views.GROQ_API_KEY', 'test-key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_async_upload_counts_towards_completeness(self):
+        upload = SimpleUploadedFile(
+            'resume.docx',
+            b'PK resume',
+            content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/profiles/profile/parse_and_apply/',
+                {'resume_file': upload, 'async': 'true'},
+                format='multipart',
+            )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(GenerationJob.objects.get().kind, GenerationJob.Kind.RESUME_IMPORT)
+        profile = UserProfile.objects.get(user=self.user)
+        self.addCleanup(profile.resume_file.delete, save=False)
+        self.assertTrue(profile.resume_file)
+        self.assertEqual(profile.profile_completeness, profile.completeness_score())
+        self.assertGreater(profile.profile_completeness, 0)
+
+
+class CompletenessTests(APITestCase):
+    def setUp(self):
+        self.user = UserAccount.objects.create_user('score@example.com', 'password')
+
+    def stored_score(self) -> int:
+        return UserProfile.objects.get(user=self.user).profile_completeness
+
+    def test_field_change_sees_sections_written_since_load(self):
+        profile = UserProfile.objects.get(user=self.user)
+        # Another request adds a skill and commits after this one loaded the profile.
+        Skill.objects.create(profile=profile, name='Python')
+        UserProfile.objects.filter(pk=profile.pk).update(profile_completeness=15)
+
+        previous_points = profile.field_points()
+        with self.captureOnCommitCallbacks(execute=True):
+            with profile_writes():
+                profile.headline = 'Engineer'
+                profile.save()
+                mark_fields_changed(profile, previous_points)
+        self.assertEqual(self.stored_score(), 25)
+
+    def test_unscored_field_change_skips_the_recompute(self):
+        profile = UserProfile.objects.get(user=self.user)
+        previous_points = profile.field_points()
+        profile.phone = '555 0100'
+        profile.save()
+        with self.assertNumQueries(0):
+            with self.captureOnCommitCallbacks(execute=True):
+                mark_fields_changed(profile, previous_points)
+
+
+class ProfileWritesTests(APITestCase):
+    '''Follow-up writes are merged per profile and applied once, after commit.'''
+
+    def setUp(self):
+        self.user = UserAccount.objects.create_user('dirty@example.com', 'password')
+        self.profile = UserProfile.objects.get(user=self.user)
+
+    def reload(self) -> UserProfile:
+        return UserProfile.objects.get(pk=self.profile.pk)
+
+    def test_batch_applies_once(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with profile_writes():
+                for name in ('Python', 'Go', 'SQL'):
+                    Skill.objects.create(profile=self.profile, name=name)
+                # Nested blocks join the outer batch.
+                with profile_writes():
+                    mark_sections_changed(self.profile, {'skills': True})
+        self.assertEqual(len(callbacks), 1)
+        # One EXISTS query for the other sections, one UPDATE for version and score.
+        with self.assertNumQueries(2):
+            callbacks[0]()
+        profile = self.reload()
+        self.assertEqual(profile.content_version, self.profile.content_version + 1)
+        self.assertEqual(profile.profile_completeness, 15)
+
+    def test_failed_block_ignores_its_hints(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                with profile_writes(), transaction.atomic():
+                    Skill.objects.create(profile=self.profile, name='Python')
+                    mark_sections_changed(self.profile, {'skills': True})
+                    raise RuntimeError
+        self.assertFalse(Skill.objects.exists())
+        self.assertEqual(self.reload().profile_completeness, 0)
+
+
+class IncrementalJSONParserTests(SimpleTestCase):
+    document = (
+        '```json\n{"headline": "Eng \\"lead\\"", "skills": ["Py", "Go"], '
+        '"experiences": [{"company": "A", "bullets": ["x", "y"]}], "score": 87}\n```'
+    )
+
+    def test_values_are_reported_as_they_close(self):
+        parser = IncrementalJSONParser()
+        events = [event for char in self.document for event in parser.feed(char)]
+        self.assertEqual(events, [
+            (('headline',), 'Eng "lead"'),
+            (('skills', 0), 'Py'),
+            (('skills', 1), 'Go'),
+            (('skills',), ['Py', 'Go']),
+            (('experiences', 0, 'bullets'), ['x', 'y']),
+            (('experiences', 0), {'company': 'A', 'bullets': ['x', 'y']}),
+            (('experiences',), [{'company': 'A', 'bullets': ['x', 'y']}]),
+            (('score',), 87),
+        ])
+        self.assertTrue(parser.done)
+
+    def test_chunking_does_not_change_the_result(self):
+        whole = IncrementalJSONParser().feed(self.document)
+        parser = IncrementalJSONParser()
+        chunked = [
+            event
+            for start in range(0, len(self.document), 7)
+            for event in parser.feed(self.document[start:start + 7])
+        ]
+        self.assertEqual(chunked, whole)
+
+    def test_format_sse(self):
+        self.assertEqual(format_sse('field', {'a': 'é'}), 'event: field\ndata: {"a": "é"}\n\n')
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_calls_share_one_run(self):
+        flights = SingleFlight()
+        release = threading.Event()
+        runs = []
+
+        def fn():
+            runs.append(1)
+            release.wait(5)
+            return 'result'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flights.do('key', fn)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        while flights.coalesced < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(runs), results), (1, ['result'] * 4))
+        # Finished flights are forgotten, so the next call runs again.
+        self.assertEqual(flights.do('key', lambda: 'again'), 'again')
+
+    def test_errors_reach_every_waiter(self):
+        flights = SingleFlight()
+        with self.assertRaises(ValueError):
+            flights.do('key', mock.Mock(side_effect=ValueError))
+
+    def test_async_waiter_leaving_does_not_cancel_the_flight(self):
+        flights = AsyncSingleFlight()
+        runs = []
+
+        async def fn():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def main():
+            first = asyncio.ensure_future(flights.do('key', fn))
+            second = asyncio.ensure_future(flights.do('key', fn))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        self.assertEqual(asyncio.run(main()), 'result')
+        self.assertEqual(len(runs), 1)
+
+
+class KeyLockTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.lock = KeyLock(directory.name, timeout=0.2, poll_interval=0.01)
+
+    def test_second_holder_waits_for_release(self):
+        handle = self.lock.acquire('key')
+        self.assertIsNotNone(handle)
+        self.assertIsNone(self.lock.acquire('key'))
+        self.lock.release('key', handle)
+        handle = self.lock.acquire('key')
+        self.assertIsNotNone(handle)
+        self.lock.release('key', handle)
+
+    def test_keys_are_independent(self):
+        first = self.lock.acquire('a')
+        second = self.lock.acquire('b')
+        self.assertIsNotNone(second)
+        self.lock.release('a', first)
+        self.lock.release('b', second)
+
+
+class PromptBudgetTests(SimpleTestCase):
+    def test_compact_drops_empty_values_and_ids(self):
+        profile = {
+            'id': 7,
+            'summary': '  Builds   things \n\n\n  fast ',
+            'phone': None,
+            'skills': [{'id': 1, 'name': 'Go', 'order': 0}, {'name': ''}],
+            'links': {},
+        }
+        self.assertEqual(compact(profile), {
+            'summary': 'Builds things\n\nfast',
+            'skills': [{'name': 'Go'}],
+        })
+
+    def test_truncate_prefers_word_boundary(self):
+        self.assertEqual(truncate_to_tokens('alpha beta gamma', 3), 'alpha beta')
+        self.assertEqual(truncate_to_tokens('short', 3), 'short')
+        self.assertEqual(estimate_tokens(''), 0)
+        self.assertEqual(normalize_whitespace(None), '')
+
+    def test_within_budget_is_returned_untouched(self):
+        profile = {'skills': [{'name': 'Go'}]}
+        fitted, jd = fit_to_budget(profile, ' Senior   engineer ', 1000)
+        self.assertIs(fitted, profile)
+        self.assertEqual(jd, 'Senior engineer')
+
+    def test_low_priority_sections_are_trimmed_first(self):
+        profile = {
+            'experiences': [{'title': 'x' * 40}] * 4,
+            'skills': [{'name': 's' * 8}] * 20,
+            'achievements': [{'title': 'a' * 40}] * 5,
+        }
+        budget = estimate_tokens(dumps(profile)) - 20
+        fitted, jd = fit_to_budget(profile, 'jd', budget)
+        self.assertLess(len(fitted['achievements']), 5)
+        self.assertEqual(len(fitted['experiences']), 4)
+        self.assertEqual(len(fitted['skills']), 20)
+        self.assertEqual(len(profile['achievements']), 5)
+        self.assertLessEqual(estimate_tokens(dumps(fitted)) + estimate_tokens(jd), budget)
+
+    def test_job_description_keeps_its_minimum_share(self):
+        profile = {'experiences': [{'title': 'x' * 400}] * 10}
+        fitted, jd = fit_to_budget(profile, 'word ' * 400, 200)
+        self.assertGreaterEqual(estimate_tokens(jd), 200 * 0.4 - 2)
+        self.assertLessEqual(estimate_tokens(dumps(fitted)) + estimate_tokens(jd), 200)
+
+
+@override_settings(
+    LLM_THROTTLE_ENABLED=True,
+    LLM_THROTTLE_CACHE='default',
+    LLM_USER_TOKENS_PER_MINUTE=600,
+    LLM_GLOBAL_TOKENS_PER_MINUTE=900,
+)
+class TokenBucketThrottleTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+
+    def test_take_and_refund(self):
+        bucket = TokenBucket('user:1', 600)
+        self.assertEqual(bucket.take(500), 0)
+        # 100 left, refilling at 10 per second.
+        self.assertAlmostEqual(bucket.take(200), 10, delta=0.5)
+        bucket.refund(500)
+        self.assertEqual(bucket.take(600), 0)
+
+    def test_oversized_request_costs_a_full_bucket(self):
+        bucket = TokenBucket('user:1', 600)
+        self.assertEqual(bucket.take(10_000), 0)
+        self.assertGreater(bucket.take(1), 0)
+
+    def test_global_reject_refunds_the_user(self):
+        self.assertEqual(consume_llm_tokens(1, 500), 0)
+        self.assertEqual(consume_llm_tokens(2, 300), 0)
+        self.assertGreater(consume_llm_tokens(3, 500), 0)
+        # User 3 was refunded, so only the global bucket is short.
+        self.assertEqual(TokenBucket('user:3', 600).take(600), 0)
+
+    @override_settings(LLM_THROTTLE_ENABLED=False)
+    def test_disabled(self):
+        self.assertEqual(consume_llm_tokens(1, 10_000), 0)
+        self.assertEqual(consume_llm_tokens(1, 10_000), 0)
+
+    def test_llm_action_is_rejected_with_retry_after(self):
+        user = UserAccount.objects.create_user('throttle@example.com', 'password')
+        self.client.force_authenticate(user)
+        TokenBucket(f'user:{user.pk}', 600).take(600)
+        with mock.patch.object(llm_client, 'chat') as chat:
+            response = self.client.post(
+                '/profiles/profile/generate_resume/',
+                {'job_description': 'Backend engineer'},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        chat.assert_not_called()
+
+    def test_non_object_body_is_charged_the_base_cost(self):
+        user = UserAccount.objects.create_user('list-body@example.com', 'password')
+        self.client.force_authenticate(user)
+        response = self.client.post('/profiles/profile/generate_resume/', [], format='json')
+        self.assertEqual(response.status_code, 400)
+        # The charge for an empty job description was taken from the user's bucket.
+        self.assertGreater(TokenBucket(f'user:{user.pk}', 600).take(600), 0)
+
+
+class GenerationJobQueueTests(APITestCase):
+    def setUp(self):
+        self.user = UserAccount.objects.create_user('jobs@example.com', 'password')
+
+    def enqueue(self, kind=GenerationJob.Kind.RESUME) -> GenerationJob:
+        return jobs.enqueue_generation(self.user, kind, {'job_description': 'Backend engineer'})
+
+    def run_with(self, result, job=None) -> GenerationJob:
+        if isinstance(result, Exception):
+            patch = mock.patch.object(jobs, 'generate_document', side_effect=result)
+        else:
+            patch = mock.patch.object(jobs, 'generate_document', return_value=result)
+        with patch:
+            return jobs.run_job(job or jobs.claim_next_job())
+
+    def test_claim_takes_the_oldest_job_once(self):
+        first, second = self.enqueue(), self.enqueue()
+        claimed = jobs.claim_next_job()
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (first.pk, GenerationJob.Status.RUNNING, 1))
+        self.assertEqual(jobs.claim_next_job().pk, second.pk)
+        self.assertIsNone(jobs.claim_next_job())
+
+    def test_run_stores_the_result(self):
+        self.enqueue(GenerationJob.Kind.COVER_LETTER)
+        with mock.patch.object(jobs, 'generate_document', return_value=({'content': 'Dear team'}, 200)) as generate:
+            job = jobs.run_job(jobs.claim_next_job())
+        self.assertEqual(generate.call_args.args[:3], ('cover_letter', self.user.profile, 'Backend engineer'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.error), (GenerationJob.Status.DONE, {'content': 'Dear team'}, ''))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_crash_stores_a_generic_error(self):
+        self.enqueue()
+        with self.assertLogs('profiles.jobs', 'ERROR') as logs:
+            job = self.run_with(RuntimeError('secret connection string'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, GenerationJob.Status.FAILED)
+        self.assertEqual(job.error, 'Generation failed.')
+        self.assertNotIn('secret', str(job.result))
+        self.assertIn('secret connection string', logs.output[0])
+
+    def test_stale_running_jobs_are_requeued_or_failed(self):
+        retried, exhausted, fresh = self.enqueue(), self.enqueue(), self.enqueue()
+        long_ago = timezone.now() - timedelta(minutes=10)
+        GenerationJob.objects.filter(pk__in=[retried.pk, exhausted.pk]).update(
+            status=GenerationJob.Status.RUNNING, started_at=long_ago, attempts=1,
+        )
+        GenerationJob.objects.filter(pk=exhausted.pk).update(attempts=jobs.MAX_ATTEMPTS)
+        GenerationJob.objects.filter(pk=fresh.pk).update(
+            status=GenerationJob.Status.RUNNING, started_at=timezone.now(),
+        )
+        self.assertEqual(jobs.requeue_stale_jobs(300, jobs.MAX_ATTEMPTS), 2)
+        statuses = dict(GenerationJob.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {
+            retried.pk: GenerationJob.Status.PENDING,
+            exhausted.pk: GenerationJob.Status.FAILED,
+            fresh.pk: GenerationJob.Status.RUNNING,
+        })
+
+    def test_unavailable_upstream_requeues_with_backoff(self):
+        self.enqueue()
+        unavailable = ({'detail': 'Upstream unavailable.', 'retry_after': 1}, 503)
+        job = self.run_with(unavailable)
+        self.assertEqual(job.status, GenerationJob.Status.PENDING)
+        self.assertGreater(job.available_at, job.created_at)
+        # Not claimable again until the backoff has passed.
+        self.assertIsNone(jobs.claim_next_job())
+        GenerationJob.objects.update(available_at=None)
+        self.assertEqual(jobs.claim_next_job().attempts, 2)
+
+    def test_retries_stop_at_max_attempts(self):
+        self.enqueue()
+        unavailable = ({'detail': 'Upstream unavailable.'}, 503)
+        for attempt in range(1, jobs.MAX_ATTEMPTS + 1):
+            GenerationJob.objects.update(available_at=None)
+            job = self.run_with(unavailable)
+            self.assertEqual(job.attempts, attempt)
+        self.assertEqual(job.status, GenerationJob.Status.FAILED)
+        self.assertEqual(job.error, 'Upstream unavailable.')
+
+    def test_retry_delay_doubles_up_to_the_cap(self):
+        self.assertEqual(jobs.retry_delay(1), jobs.RETRY_BASE_DELAY)
+        self.assertEqual(jobs.retry_delay(2), jobs.RETRY_BASE_DELAY * 2)
+        self.assertEqual(jobs.retry_delay(30), jobs.RETRY_MAX_DELAY)
+        self.assertEqual(jobs.retry_delay(1, retry_after=60), 60)
+
+
+class GenerationWorkerTests(TransactionTestCase):
+    # The worker runs jobs on its own threads, which need committed rows.
+
+    def test_once_exits_while_jobs_wait_for_retry(self):
+        user = UserAccount.objects.create_user('worker@example.com', 'password')
+        jobs.enqueue_generation(user, GenerationJob.Kind.RESUME, {'job_description': 'Backend engineer'})
+        unavailable = ({'detail': 'Upstream unavailable.'}, 503)
+        with mock.patch.object(jobs, 'generate_document', return_value=unavailable) as generate:
+            call_command('run_generation_worker', once=True, poll_interval=0.01, stdout=mock.Mock())
+        generate.assert_called_once()
+        self.assertEqual(GenerationJob.objects.get().status, GenerationJob.Status.PENDING)
+
+
+# Routes the async LLM views the way profiles.urls does with ASYNC_LLM_VIEWS on.
+urlpatterns = [
+    path('profiles/profile/generate_resume/', async_views.generate_resume),
+    path('profiles/profile/parse_resume/', async_views.parse_resume),
+]
+
+
+@override_settings(
+    ROOT_URLCONF=__name__,
+    LLM_THROTTLE_ENABLED=True,
+    LLM_THROTTLE_CACHE='default',
+    LLM_USER_TOKENS_PER_MINUTE=6000,
+)
+class AsyncLLMViewTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+        llm_cache.clear()
+        self.addCleanup(llm_cache.clear)
+        self.user = UserAccount.objects.create_user('async@example.com', 'password')
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        patcher = mock.patch('profiles.generation.GROQ_API_KEY', 'test-key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def generate(self, body, **kwargs):
+        return await self.async_client.post(
+            '/profiles/profile/generate_resume/', body, content_type='application/json', **kwargs
+        )
+
+    async def test_requires_authentication(self):
+        response = await self.generate({'job_description': 'Backend engineer'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_throttle_is_charged_before_validation(self):
+        await sync_to_async(TokenBucket(f'user:{self.user.pk}', 6000).take)(6000)
+        # Like the DRF views, an invalid body is throttled rather than validated.
+        response = await self.generate({}, headers=self.headers)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    async def test_generates_a_resume(self):
+        reply = mock.AsyncMock(return_value=chat_response('{"summary": "Builds APIs"}'))
+        with mock.patch.object(async_llm_client, 'chat', reply):
+            response = await self.generate({'job_description': 'Backend engineer'}, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'summary': 'Builds APIs'})
+        reply.assert_awaited_once()
+        # The user's bucket was charged for the call.
+        self.assertGreater(await sync_to_async(TokenBucket(f'user:{self.user.pk}', 6000).take)(6000), 0)
+
+    async def test_non_object_body_is_rejected(self):
+        response = await self.generate([], headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    async def test_multipart_upload_requires_a_file(self):
+        response = await self.async_client.post(
+            '/profiles/profile/parse_resume/', {'note': 'no file'}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'detail': 'resume_file is required.'})
+
+
+@override_settings(GROQ_FALLBACK_MODELS=[], LLM_HEDGE_ENABLED=False)
+class GenerateBundleTests(APITestCase):
+    job_description = 'Backend engineer at Acme'
+
+    def setUp(self):
+        llm_cache.clear()
+        self.addCleanup(llm_cache.clear)
+        self.user = UserAccount.objects.create_user('bundle@example.com', 'password')
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch('profiles.generation.GROQ_API_KEY', 'test-key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('profiles.throttling.consume_llm_tokens', return_value=0)
+        self.throttle = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fake_chat(self, cover_letter):
+        self.kinds = []
+
+        def chat(messages, model, temperature, timeout):
+            kind = 'cover_letter' if 'cover letter writer' in messages[0]['content'] else 'resume'
+            self.kinds.append(kind)
+            reply = {'resume': '{"headline": "Engineer"}', 'cover_letter': cover_letter}[kind]
+            if isinstance(reply, Exception):
+                raise reply
+            return chat_response(reply)
+
+        return mock.patch.object(llm_client, 'chat', side_effect=chat)
+
+    def post(self):
+        return self.client.post(
+            '/profiles/profile/generate_bundle/', {'job_description': self.job_description}, format='json'
+        )
+
+    def test_returns_both_documents(self):
+        with self.fake_chat('{"body": "Dear team"}'):
+            response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'resume': {'headline': 'Engineer'},
+            'cover_letter': {'body': 'Dear team'},
+        })
+        self.assertEqual(sorted(self.kinds), ['cover_letter', 'resume'])
+
+    def test_partial_failure_names_the_failed_document(self):
+        with self.fake_chat(LLMError('Groq API error.', status_code=500)):
+            response = self.post()
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(response.data['failed'], 'cover_letter')
+        # The resume half was cached, so a retry only pays for the cover letter.
+        with self.fake_chat('{"body": "Dear team"}'):
+            response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.kinds, ['cover_letter'])
+
+    def test_is_charged_for_two_prompts(self):
+        with self.fake_chat('{"body": "Dear team"}'):
+            self.post()
+        self.throttle.assert_called_once_with(self.user.pk, generation_cost(self.job_description, 2))
+
+
+class BoundedUploadHandlerTests(APITestCase):
+    def parse(self, handler, content: bytes):
+        body = encode_multipart(BOUNDARY, {'resume_file': SimpleUploadedFile('resume.pdf', content)})
+        meta = {'CONTENT_TYPE': MULTIPART_CONTENT, 'CONTENT_LENGTH': str(len(body))}
+        return MultiPartParser(meta, io.BytesIO(body), [handler]).parse()
+
+    def test_oversize_upload_is_rejected_before_reading(self):
+        caches['default'].clear()
+        self.addCleanup(caches['default'].clear)
+        user = UserAccount.objects.create_user('upload@example.com', 'password')
+        self.client.force_authenticate(user)
+        size = MAX_RESUME_SIZE + BoundedResumeUploadHandler.overhead
+        upload = SimpleUploadedFile('resume.pdf', b'%PDF' + b'0' * size)
+        with mock.patch.object(BoundedResumeUploadHandler, 'receive_data_chunk') as receive:
+            response = self.client.post('/profiles/profile/parse_resume/', {'resume_file': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'detail': 'Resume file exceeds 5MB limit.'})
+        receive.assert_not_called()
+
+    def test_reading_stops_at_the_limit_and_removes_the_temp_file(self):
+        handler = BoundedResumeUploadHandler(max_size=1024)
+        opened = []
+        new_file = handler.new_file
+
+        def track(*args, **kwargs):
+            new_file(*args, **kwargs)
+            opened.append(handler.file)
+
+        with mock.patch.object(handler, 'new_file', side_effect=track):
+            # Small enough to pass the Content-Length check, so chunks are counted.
+            _data, files = self.parse(handler, b'0' * 10 * 1024)
+        self.assertTrue(handler.exceeded)
+        self.assertNotIn('resume_file', files)
+        self.assertTrue(opened[0].closed)
+        self.assertFalse(os.path.exists(opened[0].temporary_file_path()))
+
+    def test_upload_within_the_limit_is_kept(self):
+        handler = BoundedResumeUploadHandler(max_size=1024)
+        _data, files = self.parse(handler, b'0' * 512)
+        self.assertFalse(handler.exceeded)
+        self.assertEqual(files['resume_file'].size, 512)
+        files['resume_file'].close()
+
+
+class ProfilePayloadCacheTests(APITestCase):
+    def setUp(self):
+        llm_cache.clear()
+        self.addCleanup(llm_cache.clear)
+        profile_payload_cache.clear()
+        self.addCleanup(profile_payload_cache.clear)
+        self.user = UserAccount.objects.create_user('payload@example.com', 'password')
+        self.client.force_authenticate(self.user)
+        patcher = mock.patch('profiles.generation.GROQ_API_KEY', 'test-key')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def prompt_after(self, write) -> str:
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        reply = chat_response('{"headline": "Engineer"}')
+        with mock.patch.object(llm_client, 'chat', return_value=reply) as chat:
+            response = self.client.post(
+                '/profiles/profile/generate_resume/', {'job_description': 'Backend engineer'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        return chat.call_args.args[0][1]['content']
+
+    def test_section_edit_reaches_the_next_prompt(self):
+        skills = '/profiles/skills/'
+        prompt = self.prompt_after(lambda: self.client.post(skills, {'name': 'Django'}, format='json'))
+        self.assertIn('Django', prompt)
+        skill = Skill.objects.get()
+        prompt = self.prompt_after(
+            lambda: self.client.patch(f'{skills}{skill.pk}/', {'name': 'PostgreSQL'}, format='json')
+        )
+        self.assertIn('PostgreSQL', prompt)
+        self.assertNotIn('Django', prompt)
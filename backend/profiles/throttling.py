@@ -0,0 +1,131 @@
+'''Token-bucket throttles for endpoints that spend Groq tokens.'''
+
+import threading
+import time
+from collections.abc import Mapping
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from .prompts import estimate_tokens
+
+
+# Rough size of a generation system prompt plus a typical compacted profile.
+SYSTEM_PROMPT_TOKENS = 400
+PROFILE_TOKEN_ALLOWANCE = 1500
+
+# Actions on UserProfileViewSet that call the LLM, with how many prompts each sends.
+LLM_ACTIONS = {
+    'generate_resume': 1,
+    'generate_cover_letter': 1,
+    'generate_resume_stream': 1,
+    'generate_cover_letter_stream': 1,
+    'generate_bundle': 2,
+    'parse_resume': 1,
+    'parse_and_apply': 1,
+}
+
+# LLM actions that receive an upload; their cost must not depend on the body.
+UPLOAD_ACTIONS = frozenset({'parse_resume', 'parse_and_apply'})
+
+# Serializes bucket updates within a process; processes sharing LLM_THROTTLE_CACHE
+# update read-modify-write, so together they can overshoot by a request or two.
+_lock = threading.Lock()
+
+
+class TokenBucket:
+    '''Continuously refilling bucket stored as (tokens, timestamp) in a cache.'''
+
+    def __init__(self, key: str, per_minute: int, cache_alias: str = 'default'):
+        self.key = f'llm-bucket:{key}'
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.cache = caches[cache_alias]
+
+    def _level(self, now: float) -> float:
+        tokens, updated_at = self.cache.get(self.key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+    def take(self, cost: int) -> float:
+        '''Consume `cost` tokens; returns 0 on success, else seconds until they are available.'''
+        # A request larger than the whole bucket is charged a full bucket.
+        cost = min(cost, self.capacity)
+        now = time.time()
+        with _lock:
+            tokens = self._level(now)
+            if tokens < cost:
+                return (cost - tokens) / self.rate
+            self.cache.set(self.key, (tokens - cost, now), timeout=120)
+        return 0
+
+    def refund(self, cost: int) -> None:
+        now = time.time()
+        with _lock:
+            tokens = self._level(now)
+            self.cache.set(self.key, (min(self.capacity, tokens + cost), now), timeout=120)
+
+
+def consume_llm_tokens(user_id, cost: int) -> float:
+    '''Charge the user and global buckets; returns 0 if allowed, else a wait in seconds.'''
+    if not settings.LLM_THROTTLE_ENABLED or cost <= 0:
+        return 0
+    alias = settings.LLM_THROTTLE_CACHE
+    user_bucket = TokenBucket(f'user:{user_id}', settings.LLM_USER_TOKENS_PER_MINUTE, alias)
+    wait = user_bucket.take(cost)
+    if wait:
+        return wait
+    wait = TokenBucket('global', settings.LLM_GLOBAL_TOKENS_PER_MINUTE, alias).take(cost)
+    if wait:
+        # Not served, so don't count it against the user.
+        user_bucket.refund(cost)
+    return wait
+
+
+def generation_cost(job_description: str, prompts: int = 1) -> int:
+    '''Estimated prompt tokens for generating `prompts` documents from a job description.'''
+    jd_tokens = estimate_tokens((job_description or '').strip())
+    per_prompt = min(
+        settings.LLM_PROMPT_TOKEN_BUDGET,
+        jd_tokens + PROFILE_TOKEN_ALLOWANCE,
+    ) + SYSTEM_PROMPT_TOKENS
+    return per_prompt * prompts
+
+
+def resume_parse_cost() -> int:
+    # Charged before the upload is read, so assume a full-budget resume.
+    return settings.RESUME_PARSE_TOKEN_BUDGET + SYSTEM_PROMPT_TOKENS
+
+
+def action_cost(action: str | None, data=None) -> int:
+    '''Estimated prompt tokens charged for calling `action` with request body `data`.'''
+    prompts = LLM_ACTIONS.get(action, 0)
+    if not prompts:
+        return 0
+    if action in UPLOAD_ACTIONS:
+        return resume_parse_cost()
+    # Non-object bodies pay the base cost; validation rejects them.
+    data = data if isinstance(data, Mapping) else {}
+    return generation_cost(data.get('job_description'), prompts)
+
+
+class LLMTokenBucketThrottle(BaseThrottle):
+    '''Throttle LLM actions by estimated prompt tokens, per user and globally.'''
+
+    def __init__(self):
+        self._wait = None
+
+    def get_cost(self, request, view) -> int:
+        action = getattr(view, 'action', None)
+        if action not in LLM_ACTIONS or action in UPLOAD_ACTIONS:
+            # Only generation reads the body; uploads must not touch request.data
+            # before the upload handler is installed.
+            return action_cost(action)
+        return action_cost(action, request.data)
+
+    def allow_request(self, request, view) -> bool:
+        self._wait = consume_llm_tokens(request.user.pk, self.get_cost(request, view))
+        return not self._wait
+
+    def wait(self):
+        return self._wait
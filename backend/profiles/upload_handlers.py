@@ -0,0 +1,50 @@
+'''Upload handlers for resume files.'''
+
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+from .models import MAX_RESUME_SIZE
+
+
+class BoundedResumeUploadHandler(TemporaryFileUploadHandler):
+    '''Spool uploads to a temp file and stop reading once the size limit is crossed.
+
+    Requests whose Content-Length already exceeds the limit are rejected
+    before the body is read; otherwise the running size is checked per chunk,
+    so an oversized upload never sits fully in memory or on disk.
+    '''
+
+    # Allowance for multipart boundaries and small form fields around the file.
+    overhead = 64 * 1024
+
+    def __init__(self, request=None, max_size: int = MAX_RESUME_SIZE):
+        super().__init__(request)
+        self.max_size = max_size
+        self.exceeded = False
+        self._received = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length and content_length > self.max_size + self.overhead:
+            self.exceeded = True
+            # Short-circuit parsing: no fields, no files.
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, *args, **kwargs):
+        self._received = 0
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._received += len(raw_data)
+        if self._received > self.max_size:
+            self.exceeded = True
+            raise StopUpload(connection_reset=True)
+        return super().receive_data_chunk(raw_data, start)
+
+
+def install_resume_upload_handler(request) -> BoundedResumeUploadHandler:
+    '''Replace the request's upload handlers; call before touching request.FILES.'''
+    handler = BoundedResumeUploadHandler(request)
+    request.upload_handlers = [handler]
+    return handler
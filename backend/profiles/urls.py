@@ -1,8 +1,10 @@
 '''Profile API routes.'''
 
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from . import async_views
 from .views import (
     AchievementViewSet,
     CertificationViewSet,
@@ -20,6 +22,17 @@ router.register(r'educations', EducationViewSet, basename='educations')
 router.register(r'certifications', CertificationViewSet, basename='certifications')
 router.register(r'achievements', AchievementViewSet, basename='achievements')
 
-urlpatterns = [
+urlpatterns = []
+
+if settings.ASYNC_LLM_VIEWS:
+    # Native async LLM endpoints take precedence over the router's sync actions.
+    urlpatterns += [
+        path('profile/generate_resume/', async_views.generate_resume),
+        path('profile/generate_cover_letter/', async_views.generate_cover_letter),
+        path('profile/generate_bundle/', async_views.generate_bundle),
+        path('profile/parse_resume/', async_views.parse_resume),
+    ]
+
+urlpatterns += [
     path('', include(router.urls)),
 ]
@@ -1,94 +1,63 @@
 '''Profile APIs for managing user profile data and related collections.'''
 
-import json
-from io import BytesIO
-from os import getenv
-
 from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
+from .conditional import make_etag, not_modified, with_etag
+from .dirty import mark_fields_changed, mark_sections_changed, profile_writes
+from .generation import (
+    BUNDLE,
+    COVER_LETTER,
+    RESUME,
+    build_generation_request,
+    generate_bundle,
+    generate_document,
+    generation_params,
+    parse_bool,
+    stream_generation,
+)
+from .jobs import enqueue_generation
+from .llm import GROQ_API_KEY, retry_after_headers
+from .metrics import current_endpoint, labelled
 from .models import (
     Achievement,
     Certification,
     Education,
     Experience,
+    PROFILE_SECTIONS,
+    GenerationJob,
     Skill,
     UserProfile,
-    MAX_RESUME_SIZE,
 )
+from .onboarding import (
+    SECTIONS,
+    apply_onboarding,
+    apply_parsed_resume,
+    normalize_skills,
+    onboarding_summary,
+    parse_payload,
+    replace_section,
+)
+from .resume_parser import parse_resume_file, resume_digest, validate_resume_upload
 from .serializers import (
     AchievementSerializer,
     CertificationSerializer,
     EducationSerializer,
     ExperienceSerializer,
+    GenerationJobSerializer,
     SkillSerializer,
     UserProfileDetailSerializer,
     UserProfileSerializer,
 )
-
-
-GROQ_API_KEY = getenv('GROQ_API_KEY')
-GROQ_MODEL = getenv('GROQ_MODEL', 'llama-3.3-70b-versatile')
-
-def truncate_text(text: str, max_chars: int) -> str:
-    return text[:max_chars] if text and len(text) > max_chars else text
-
-def strip_code_fences(text: str) -> str:
-    text = text.strip()
-    if text.startswith("```"):
-        # remove first line (``` or ```json)
-        text = text.split("\n", 1)[1] if "\n" in text else ""
-    if text.endswith("```"):
-        text = text.rsplit("```", 1)[0]
-    return text.strip()
-
-def build_profile_payload(profile: UserProfile) -> dict:
-    data = UserProfileDetailSerializer(profile).data
-    # Remove fields not needed for generation.
-    data.pop('id', None)
-    data.pop('profile_completeness', None)
-    data.pop('updated_at', None)
-    data.pop('resume_file', None)
-    return data
-
-def call_groq(system_prompt: str, user_content: str, model: str) -> dict:
-    try:
-        import requests
-        response = requests.post(
-            'https://api.groq.com/openai/v1/chat/completions',
-            headers={
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {GROQ_API_KEY}',
-            },
-            json={
-                'model': model,
-                'temperature': 0.2,
-                'messages': [
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': user_content},
-                ],
-            },
-            timeout=60,
-        )
-    except Exception as exc:
-        return {'error': f'Groq request failed: {exc}', 'status': status.HTTP_502_BAD_GATEWAY}
-
-    if response.status_code >= 400:
-        return {
-            'error': 'Groq API error.',
-            'status': status.HTTP_502_BAD_GATEWAY,
-        }
-
-    data = response.json()
-    content = (
-        data.get('choices', [{}])[0]
-        .get('message', {})
-        .get('content', '')
-    )
-    return {'content': content}
+from .streaming import EventStreamRenderer, sse_stream
+from .throttling import LLMTokenBucketThrottle
+from .upload_handlers import install_resume_upload_handler
 
 
 class UserProfileViewSet(viewsets.ModelViewSet):
@@ -96,6 +65,21 @@ class UserProfileViewSet(viewsets.ModelViewSet):
     serializer_class = UserProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
     parser_classes = [JSONParser, FormParser, MultiPartParser]
+    # Charges only the LLM actions; everything else costs nothing.
+    throttle_classes = [LLMTokenBucketThrottle]
+
+    def initial(self, request, *args, **kwargs):
+        # Label any LLM calls made while handling this action; worker threads
+        # serve many requests, so finalize_response puts the old label back.
+        self._endpoint_token = current_endpoint.set(self.action or 'profile')
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_endpoint_token', None)
+        if token is not None:
+            self._endpoint_token = None
+            current_endpoint.reset(token)
+        return super().finalize_response(request, response, *args, **kwargs)
 
     def _get_profile_or_404(self, request):
         # Centralized helper to fetch the current user's profile.
@@ -110,8 +94,10 @@ class UserProfileViewSet(viewsets.ModelViewSet):
 
     def perform_update(self, serializer):
         '''Recalculate completeness after profile updates.'''
-        profile = serializer.save()
-        profile.update_profile_completeness()
+        previous_points = serializer.instance.field_points()
+        with profile_writes():
+            profile = serializer.save()
+            mark_fields_changed(profile, previous_points)
 
     @action(detail=False, methods=['get'])
     def me(self, request):
@@ -119,8 +105,14 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         profile = self._get_profile_or_404(request)
         if not profile:
             return Response({'detail': 'Profile not found.'}, status=404)
+        # content_version covers the fields and every section; completeness is stored separately.
+        etag = make_etag(request, profile.pk, profile.content_version, profile.profile_completeness)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        prefetch_related_objects([profile], *PROFILE_SECTIONS)
         serializer = UserProfileDetailSerializer(profile)
-        return Response(serializer.data)
+        return with_etag(Response(serializer.data), etag)
 
     @action(detail=False, methods=['patch'])
     def update_me(self, request):
@@ -130,8 +122,10 @@ class UserProfileViewSet(viewsets.ModelViewSet):
             return Response({'detail': 'Profile not found.'}, status=404)
         serializer = self.get_serializer(profile, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
-        profile = serializer.save()
-        profile.update_profile_completeness()
+        previous_points = profile.field_points()
+        with profile_writes():
+            profile = serializer.save()
+            mark_fields_changed(profile, previous_points)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
@@ -154,383 +148,189 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         if not profile:
             return Response({'detail': 'Profile not found.'}, status=404)
 
-        def parse_payload(value):
-            # Accept JSON strings or Python structures from multipart requests.
-            if value is None:
-                return None
-            if isinstance(value, str):
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    return None
-            return value
-
-        def normalize_skill_proficiency(value):
-            if value is None:
-                return ''
-            normalized = str(value).strip().lower()
-            if not normalized:
-                return ''
-            alias_map = {
-                'basic': 'beginner',
-                'beginner': 'beginner',
-                'intermediate': 'intermediate',
-                'advanced': 'advanced',
-                'expert': 'expert',
-            }
-            if normalized in alias_map:
-                return alias_map[normalized]
-            return value
-
-        def normalize_skills(payload):
-            if payload is None:
-                return None
-            if not isinstance(payload, list):
-                return payload
-            normalized_payload = []
-            for item in payload:
-                if not isinstance(item, dict):
-                    normalized_payload.append(item)
-                    continue
-                cleaned = dict(item)
-                cleaned['proficiency'] = normalize_skill_proficiency(item.get('proficiency'))
-                normalized_payload.append(cleaned)
-            return normalized_payload
-
-        profile_payload = parse_payload(request.data.get('profile'))
-        skills_payload = normalize_skills(parse_payload(request.data.get('skills')))
-        experiences_payload = parse_payload(request.data.get('experiences'))
-        educations_payload = parse_payload(request.data.get('educations'))
-        certifications_payload = parse_payload(request.data.get('certifications'))
-        achievements_payload = parse_payload(request.data.get('achievements'))
+        payload = {
+            key: parse_payload(request.data.get(key))
+            for key in ('profile', *SECTIONS)
+        }
+        payload['skills'] = normalize_skills(payload['skills'])
 
         resume_file = request.FILES.get('resume_file')
         if resume_file:
-            profile_payload['resume_file'] = resume_file
-
-        with transaction.atomic():
-            # Only update sections present in the request to avoid accidental data loss.
-            if profile_payload is not None:
-                profile_serializer = self.get_serializer(
-                    profile, data=profile_payload, partial=True
-                )
-                profile_serializer.is_valid(raise_exception=True)
-                profile_serializer.save()
-
-            if skills_payload is not None:
-                skills_serializer = SkillSerializer(data=skills_payload, many=True)
-                skills_serializer.is_valid(raise_exception=True)
-                Skill.objects.filter(profile=profile).delete()
-                skills_serializer.save(profile=profile)
-
-            if experiences_payload is not None:
-                experiences_serializer = ExperienceSerializer(
-                    data=experiences_payload, many=True
-                )
-                experiences_serializer.is_valid(raise_exception=True)
-                Experience.objects.filter(profile=profile).delete()
-                experiences_serializer.save(profile=profile)
-
-            if educations_payload is not None:
-                educations_serializer = EducationSerializer(
-                    data=educations_payload, many=True
-                )
-                educations_serializer.is_valid(raise_exception=True)
-                Education.objects.filter(profile=profile).delete()
-                educations_serializer.save(profile=profile)
-
-            if certifications_payload is not None:
-                certifications_serializer = CertificationSerializer(
-                    data=certifications_payload, many=True
-                )
-                certifications_serializer.is_valid(raise_exception=True)
-                Certification.objects.filter(profile=profile).delete()
-                certifications_serializer.save(profile=profile)
-
-            if achievements_payload is not None:
-                achievements_serializer = AchievementSerializer(
-                    data=achievements_payload, many=True
-                )
-                achievements_serializer.is_valid(raise_exception=True)
-                Achievement.objects.filter(profile=profile).delete()
-                achievements_serializer.save(profile=profile)
-
-            profile.update_profile_completeness()
+            payload['profile'] = {**(payload['profile'] or {}), 'resume_file': resume_file}
 
-        return Response(
-            {
-                'profile': UserProfileSerializer(profile).data,
-                'skills_count': Skill.objects.filter(profile=profile).count(),
-                'experiences_count': Experience.objects.filter(profile=profile).count(),
-                'educations_count': Education.objects.filter(profile=profile).count(),
-                'certifications_count': Certification.objects.filter(profile=profile).count(),
-                'achievements_count': Achievement.objects.filter(profile=profile).count(),
-            },
-            status=status.HTTP_200_OK,
-        )
+        counts = apply_onboarding(profile, payload)
+        return Response(onboarding_summary(profile, counts), status=status.HTTP_200_OK)
 
-    @action(detail=False, methods=['post'])
-    def parse_resume(self, request):
-        '''Accept a resume file and return parsed fields (LLM integration stub).'''
+    def _resume_upload(self, request):
+        # Validate a resume upload; returns (file, None) or (None, error response).
+        # Must run before request.FILES is first accessed.
+        upload_handler = install_resume_upload_handler(request._request)
         resume_file = request.FILES.get('resume_file')
+        if upload_handler.exceeded:
+            return None, Response({'detail': 'Resume file exceeds 5MB limit.'}, status=400)
         if not resume_file:
-            return Response({'detail': 'resume_file is required.'}, status=400)
+            return None, Response({'detail': 'resume_file is required.'}, status=400)
 
-        api_key = GROQ_API_KEY
-        model = GROQ_MODEL
-        allowed_mime_types = {
-            'application/pdf',
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        }
-
-        if not api_key:
-            return Response(
+        if not GROQ_API_KEY:
+            return None, Response(
                 {'detail': 'GROQ_API_KEY is not configured.'},
                 status=status.HTTP_501_NOT_IMPLEMENTED,
             )
 
-        if resume_file.size > MAX_RESUME_SIZE:
-            return Response(
-                {'detail': 'Resume file exceeds 5MB limit.'},
-                status=400,
-            )
-        if resume_file.content_type not in allowed_mime_types:
-            return Response(
-                {'detail': 'Unsupported resume file type.'},
-                status=400,
-            )
-
-        # Extract plain text from the resume before sending to the LLM.
-        resume_text = ''
-        file_bytes = resume_file.read()
-        file_stream = BytesIO(file_bytes)
-        try:
-            if resume_file.content_type == 'application/pdf':
-                from pypdf import PdfReader
-                reader = PdfReader(file_stream)
-                resume_text = '\n'.join(
-                    page.extract_text() or '' for page in reader.pages
-                ).strip()
-            else:
-                from docx import Document
-                doc = Document(file_stream)
-                resume_text = '\n'.join(
-                    para.text for para in doc.paragraphs if para.text
-                ).strip()
-        except Exception as exc:
-            return Response(
-                {'detail': f'Unable to read resume file: {exc}'},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        if not resume_text:
-            return Response(
-                {'detail': 'Resume text could not be extracted.'},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Limit prompt size to avoid oversized requests.
-        max_chars = 12000
-        if len(resume_text) > max_chars:
-            resume_text = resume_text[:max_chars]
-
-        system_prompt = (
-            'You are a resume parser. Extract structured data from the resume.\n'
-            'Return STRICT JSON only (no markdown). Keys:\n'
-            'profile, skills, experiences, educations, certifications, achievements.\n'
-            'Use this schema:\n'
-            'profile: {headline, summary, location, phone, email}\n'
-            'skills: [{name, proficiency, order}]\n'
-            'experiences: [{company, title, location, start_date, end_date, is_current, description, order}]\n'
-            'educations: [{school, degree, field_of_study, start_date, end_date, description, order}]\n'
-            'certifications: [{name, issuer, issue_date, expiration_date, credential_url, order}]\n'
-            'achievements: [{title, description, date, order}]\n'
-            'If a field is missing, use empty string, null, or empty list.'
-        )
+        error = validate_resume_upload(resume_file)
+        if error:
+            return None, Response({'detail': error}, status=400)
+        return resume_file, None
 
-        request_payload = {
-            'model': model,
-            'temperature': 0.2,
-            'messages': [
-                {'role': 'system', 'content': system_prompt},
-                {'role': 'user', 'content': resume_text},
-            ],
-        }
+    @action(detail=False, methods=['post'])
+    def parse_resume(self, request):
+        '''Accept a resume file and return parsed fields.'''
+        resume_file, error = self._resume_upload(request)
+        if error:
+            return error
 
-        try:
-            import requests
+        # Identical uploads reuse the previous extraction and parse.
+        digest = resume_digest(resume_file)
+        body, http_status = parse_resume_file(resume_file, resume_file.content_type, digest)
+        return Response(body, status=http_status, headers=retry_after_headers(body))
 
-            # Call Groq API to parse resume content into structured JSON.
-            response = requests.post(
-                'https://api.groq.com/openai/v1/chat/completions',
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer {api_key}',
-                },
-                json=request_payload,
-                timeout=60,
-            )
-        except Exception as exc:
-            return Response(
-                {'detail': f'Groq request failed: {exc}'},
-                status=status.HTTP_502_BAD_GATEWAY,
-            )
+    @action(detail=False, methods=['post'])
+    def parse_and_apply(self, request):
+        '''Store a resume, parse it and write every parsed section to the profile.
+
+        Pass async=true to get a 202 with a job to poll instead of waiting.
+        '''
+        resume_file, error = self._resume_upload(request)
+        if error:
+            return error
+        profile = self._get_profile_or_404(request)
+        if not profile:
+            return Response({'detail': 'Profile not found.'}, status=404)
 
-        if response.status_code >= 400:
-            return Response(
+        if parse_bool(request.data.get('async')):
+            # Stored now, so completeness counts the resume even if the import fails.
+            previous_points = profile.field_points()
+            with profile_writes():
+                profile.resume_file = resume_file
+                profile.save(update_fields=['resume_file', 'updated_at'])
+                mark_fields_changed(profile, previous_points)
+            job = enqueue_generation(
+                request.user,
+                GenerationJob.Kind.RESUME_IMPORT,
                 {
-                    'detail': 'Groq API error.',
-                    'status_code': response.status_code,
+                    'resume_file': profile.resume_file.name,
+                    'content_type': resume_file.content_type,
                 },
-                status=status.HTTP_502_BAD_GATEWAY,
             )
-
-        data = response.json()
-        text = (
-            data.get('choices', [{}])[0]
-            .get('message', {})
-            .get('content', '')
-        )
-
-        try:
-            clean = strip_code_fences(text)
-            parsed = json.loads(clean)
-        except json.JSONDecodeError:
             return Response(
-                {
-                    'detail': 'Model output was not valid JSON.',
-                    'raw_output': text,
-                },
-                status=status.HTTP_502_BAD_GATEWAY,
+                GenerationJobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED,
             )
 
-        return Response(parsed, status=status.HTTP_200_OK)
+        digest = resume_digest(resume_file)
+        body, http_status = parse_resume_file(resume_file, resume_file.content_type, digest)
+        if http_status == status.HTTP_200_OK:
+            body, http_status = apply_parsed_resume(profile, body, resume_file=resume_file)
+        return Response(body, status=http_status, headers=retry_after_headers(body))
 
-    @action(detail=False, methods=['post'])
-    def generate_resume(self, request):
-        '''Generate a structured resume draft from profile + job description.'''
+    def _generation_params(self, request):
+        # Validate a generation request; returns (params, None) or (None, error response).
         profile = self._get_profile_or_404(request)
         if not profile:
-            return Response({'detail': 'Profile not found.'}, status=404)
-
-        jd_text = (request.data.get('job_description') or '').strip()
-        if not jd_text:
-            return Response({'detail': 'job_description is required.'}, status=400)
-
-        if not GROQ_API_KEY:
+            return None, Response({'detail': 'Profile not found.'}, status=404)
+
+        params, error = generation_params(request.data)
+        if error:
+            return None, Response(*error)
+        return {'profile': profile, **params}, None
+
+    def _generate(self, request, kind):
+        # Shared flow for resume/cover letter/bundle generation (sync or queued).
+        params, error = self._generation_params(request)
+        if error:
+            return error
+
+        if params['async']:
+            job = enqueue_generation(
+                request.user,
+                kind,
+                {
+                    'job_description': params['job_description'],
+                    'template_style': params['template_style'],
+                    'regenerate': params['regenerate'],
+                },
+            )
             return Response(
-                {'detail': 'GROQ_API_KEY is not configured.'},
-                status=status.HTTP_501_NOT_IMPLEMENTED,
+                GenerationJobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED,
             )
 
-        template_style = (request.data.get('template_style') or 'modern').strip()
-        profile_payload = build_profile_payload(profile)
-        jd_text = truncate_text(jd_text, 6000)
-
-        system_prompt = (
-            'You are a resume writer and evaluator. Use the profile data and job description to craft a tailored resume.\n'
-            'Return STRICT JSON only (no markdown). Use this schema:\n'
-            '{\n'
-            '  "headline": string,\n'
-            '  "summary": string,\n'
-            '  "skills": [string],\n'
-            '  "experiences": [\n'
-            '    {\n'
-            '      "company": string,\n'
-            '      "title": string,\n'
-            '      "location": string,\n'
-            '      "start_date": string,\n'
-            '      "end_date": string|null,\n'
-            '      "is_current": boolean,\n'
-            '      "bullets": [string]\n'
-            '    }\n'
-            '  ],\n'
-            '  "education": [\n'
-            '    {"school": string, "degree": string, "field_of_study": string, "start_date": string|null, "end_date": string|null}\n'
-            '  ],\n'
-            '  "certifications": [string],\n'
-            '  "achievements": [string],\n'
-            '  "fit_score": number,\n'
-            '  "strengths": [string],\n'
-            '  "weaknesses": [string]\n'
-            '}\n'
-            'fit_score must be 0-100. strengths/weaknesses should each be at most 2 items.\n'
-            f'Template style: {template_style}. Prioritize relevance to the job description.'
+        args = (params['profile'], params['job_description'], params['template_style'])
+        if kind == BUNDLE:
+            body, http_status = generate_bundle(*args, use_cache=not params['regenerate'])
+        else:
+            body, http_status = generate_document(kind, *args, use_cache=not params['regenerate'])
+        return Response(body, status=http_status, headers=retry_after_headers(body))
+
+    def _generate_stream(self, request, kind):
+        # Stream completed JSON fields to the client as server-sent events.
+        params, error = self._generation_params(request)
+        if error:
+            return error
+
+        system_prompt, user_content = build_generation_request(
+            kind, params['profile'], params['job_description'], params['template_style']
         )
-
-        user_content = json.dumps(
-            {'profile': profile_payload, 'job_description': jd_text},
-            ensure_ascii=False,
+        # The body is produced after the view returns, so it carries its own label.
+        events = stream_generation(system_prompt, user_content, use_cache=not params['regenerate'])
+        response = StreamingHttpResponse(
+            labelled(sse_stream(events), self.action),
+            content_type='text/event-stream',
         )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
 
-        result = call_groq(system_prompt, user_content, GROQ_MODEL)
-        if 'error' in result:
-            return Response({'detail': result['error']}, status=result['status'])
-
-        text = strip_code_fences(result.get('content', ''))
-        try:
-            parsed = json.loads(text)
-        except json.JSONDecodeError:
-            return Response(
-                {'detail': 'Model output was not valid JSON.', 'raw_output': text},
-                status=status.HTTP_502_BAD_GATEWAY,
-            )
-
-        return Response(parsed, status=status.HTTP_200_OK)
+    @action(detail=False, methods=['post'])
+    def generate_resume(self, request):
+        '''Generate a structured resume draft from profile + job description.'''
+        return self._generate(request, RESUME)
 
     @action(detail=False, methods=['post'])
     def generate_cover_letter(self, request):
         '''Generate a structured cover letter draft from profile + job description.'''
-        profile = self._get_profile_or_404(request)
-        if not profile:
-            return Response({'detail': 'Profile not found.'}, status=404)
-
-        jd_text = (request.data.get('job_description') or '').strip()
-        if not jd_text:
-            return Response({'detail': 'job_description is required.'}, status=400)
-
-        if not GROQ_API_KEY:
-            return Response(
-                {'detail': 'GROQ_API_KEY is not configured.'},
-                status=status.HTTP_501_NOT_IMPLEMENTED,
-            )
+        return self._generate(request, COVER_LETTER)
 
-        template_style = (request.data.get('template_style') or 'modern').strip()
-        profile_payload = build_profile_payload(profile)
-        jd_text = truncate_text(jd_text, 6000)
-
-        system_prompt = (
-            'You are a cover letter writer. Use the profile data and job description to craft a tailored letter.\n'
-            'Return STRICT JSON only (no markdown). Use this schema:\n'
-            '{\n'
-            '  "subject": string,\n'
-            '  "greeting": string,\n'
-            '  "body_paragraphs": [string],\n'
-            '  "closing": string,\n'
-            '  "signature": string\n'
-            '}\n'
-            f'Template style: {template_style}. Keep it concise and role-specific.'
-        )
-
-        user_content = json.dumps(
-            {'profile': profile_payload, 'job_description': jd_text},
-            ensure_ascii=False,
-        )
-
-        result = call_groq(system_prompt, user_content, GROQ_MODEL)
-        if 'error' in result:
-            return Response({'detail': result['error']}, status=result['status'])
-
-        text = strip_code_fences(result.get('content', ''))
-        try:
-            parsed = json.loads(text)
-        except json.JSONDecodeError:
-            return Response(
-                {'detail': 'Model output was not valid JSON.', 'raw_output': text},
-                status=status.HTTP_502_BAD_GATEWAY,
-            )
+    @action(detail=False, methods=['post'])
+    def generate_bundle(self, request):
+        '''Generate a resume and cover letter together for one job description.'''
+        return self._generate(request, BUNDLE)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        renderer_classes=[JSONRenderer, EventStreamRenderer],
+    )
+    def generate_resume_stream(self, request):
+        '''Stream a resume draft as server-sent events while it is generated.'''
+        return self._generate_stream(request, RESUME)
+
+    @action(
+        detail=False,
+        methods=['post'],
+        renderer_classes=[JSONRenderer, EventStreamRenderer],
+    )
+    def generate_cover_letter_stream(self, request):
+        '''Stream a cover letter draft as server-sent events while it is generated.'''
+        return self._generate_stream(request, COVER_LETTER)
 
-        return Response(parsed, status=status.HTTP_200_OK)
+    @action(detail=False, methods=['get'], url_path=r'jobs/(?P<job_id>[0-9a-f-]+)')
+    def job_status(self, request, job_id=None):
+        '''Poll a queued generation job for its status and result.'''
+        job = GenerationJob.objects.filter(pk=job_id, user=request.user).first()
+        if not job:
+            return Response({'detail': 'Job not found.'}, status=404)
+        return Response(GenerationJobSerializer(job).data)
 
 
 class ProfileRelatedViewSet(viewsets.ModelViewSet):
@@ -542,22 +342,42 @@ class ProfileRelatedViewSet(viewsets.ModelViewSet):
         '''Restrict access to the current user's profile.'''
         return self.model.objects.filter(profile__user=self.request.user)
 
+    @property
+    def section(self) -> str:
+        # Related name on UserProfile, e.g. 'skills'.
+        return self.model._meta.get_field('profile').remote_field.related_name
+
+    def list(self, request, *args, **kwargs):
+        '''List items, or 304 if the profile is unchanged since the client's copy.'''
+        # Any write to a section bumps the owning profile's content_version.
+        version = (
+            UserProfile.objects.filter(user=request.user)
+            .values_list('pk', 'content_version')
+            .first()
+        )
+        etag = make_etag(request, self.section, *(version or ()))
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        return with_etag(super().list(request, *args, **kwargs), etag)
+
     def perform_create(self, serializer):
         '''Attach new items to the current user's profile.'''
         profile = self.request.user.profile
-        serializer.save(profile=profile)
-        profile.update_profile_completeness()
+        with profile_writes():
+            serializer.save(profile=profile)
+            mark_sections_changed(profile, {self.section: True})
 
     def perform_update(self, serializer):
-        '''Recalculate completeness after an item update.'''
-        instance = serializer.save()
-        instance.profile.update_profile_completeness()
+        '''Save an item; editing a row never changes which sections are non-empty.'''
+        serializer.save()
 
     def perform_destroy(self, instance):
         '''Recalculate completeness after an item deletion.'''
         profile = instance.profile
-        instance.delete()
-        profile.update_profile_completeness()
+        with profile_writes():
+            instance.delete()
+            mark_sections_changed(profile, {self.section: None})
 
     @action(detail=False, methods=['post'])
     def bulk(self, request):
@@ -565,10 +385,11 @@ class ProfileRelatedViewSet(viewsets.ModelViewSet):
         profile = request.user.profile
         serializer = self.get_serializer(data=request.data, many=True)
         serializer.is_valid(raise_exception=True)
-        self.model.objects.filter(profile=profile).delete()
-        serializer.save(profile=profile)
-        profile.update_profile_completeness()
-        return Response(serializer.data, status=201)
+        # One version bump and completeness update for the whole replace.
+        with profile_writes(), transaction.atomic():
+            items = replace_section(profile, self.model, serializer.validated_data)
+            mark_sections_changed(profile, {self.section: bool(items)})
+        return Response(self.get_serializer(items, many=True).data, status=201)
 
 
 class SkillViewSet(ProfileRelatedViewSet):
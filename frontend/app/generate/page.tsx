@@ -19,7 +19,13 @@ const templateOptions = [
   { value: 'creative', label: 'Creative' },
 ];
 
-type ResumeDraft = {
+type JobMetadata = {
+  job_title?: string;
+  company?: string;
+  summary_line?: string;
+};
+
+type ResumeDraft = JobMetadata & {
   headline?: string;
   summary?: string;
   skills?: string[];
@@ -46,7 +52,7 @@ type ResumeDraft = {
   achievements?: string[];
 };
 
-type CoverLetterDraft = {
+type CoverLetterDraft = JobMetadata & {
   subject?: string;
   greeting?: string;
   body_paragraphs?: string[];
@@ -128,8 +134,11 @@ const GeneratePageContent = () => {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
           draft_type: 'resume',
-          job_title: jobTitle,
-          company,
+          // Metadata comes back with the generated draft, so the API can
+          // save without a second LLM call to extract it.
+          job_title: jobTitle || resumeDraft.job_title || '',
+          company: company || resumeDraft.company || '',
+          summary_line: resumeDraft.summary_line || '',
           job_description: jobDescription,
           template_style: templateStyle,
           content: resumeDraft,